@@ -15,7 +15,7 @@ import uvicorn
 from .config import get_config, create_default_config
 from .database.service import get_database_service
 from .database.schema import GraphSchema
-from .parsers.incremental import IncrementalUpdater
+from .parsers.incremental import IncrementalUpdater, HASH_CACHE_FILENAME
 
 
 def setup_logging(level: str = "INFO"):
@@ -382,6 +382,10 @@ def reset(ctx):
             click.echo("Error: Failed to reset database schema", err=True)
             return
         
+        # Recorded hashes describe the dropped graph; without them the next
+        # update parses every file again
+        (Path(config.database.path).parent / HASH_CACHE_FILENAME).unlink(missing_ok=True)
+        
         click.echo("✅ Database reset successfully")
         click.echo("Run 'codebased update' to rebuild the graph")
         
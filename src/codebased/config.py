@@ -51,6 +51,8 @@ class ParsingConfig:
     include_docstrings: bool = True
     max_file_size: int = 1024 * 1024  # 1MB
     follow_symlinks: bool = False
+    parse_cache: bool = True  # Reuse parse results of unchanged files
+    parse_workers: int = 0  # Parser processes; 0 uses one per CPU
 
 
 @dataclass
@@ -215,7 +217,9 @@ class CodeBasedConfig:
                     exclude_patterns=parsing_data.get('exclude_patterns', config.parsing.exclude_patterns),
                     include_docstrings=parsing_data.get('include_docstrings', config.parsing.include_docstrings),
                     max_file_size=parsing_data.get('max_file_size', config.parsing.max_file_size),
-                    follow_symlinks=parsing_data.get('follow_symlinks', config.parsing.follow_symlinks)
+                    follow_symlinks=parsing_data.get('follow_symlinks', config.parsing.follow_symlinks),
+                    parse_cache=parsing_data.get('parse_cache', config.parsing.parse_cache),
+                    parse_workers=parsing_data.get('parse_workers', config.parsing.parse_workers)
                 )
             
             if 'database' in data:
@@ -298,7 +302,9 @@ class CodeBasedConfig:
                 'exclude_patterns': self.parsing.exclude_patterns,
                 'include_docstrings': self.parsing.include_docstrings,
                 'max_file_size': self.parsing.max_file_size,
-                'follow_symlinks': self.parsing.follow_symlinks
+                'follow_symlinks': self.parsing.follow_symlinks,
+                'parse_cache': self.parsing.parse_cache,
+                'parse_workers': self.parsing.parse_workers
             },
             'database': {
                 'path': self.database.path,
@@ -4,8 +4,9 @@ Kuzu graph database service for CodeBased.
 
 import os
 import logging
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 import kuzu
 
 logger = logging.getLogger(__name__)
@@ -29,6 +30,10 @@ class DatabaseService:
         self.db = None
         self.conn = None
         
+        # State of the explicit transaction opened by transaction(), if any
+        self._in_transaction = False
+        self._transaction_failed = False
+        
     def initialize(self) -> bool:
         """
         Initialize the database and create necessary directories.
@@ -103,6 +108,12 @@ class DatabaseService:
             if not self.connect():
                 return None
         
+        if self._transaction_failed:
+            # Kuzu already rolled the transaction back; running further
+            # statements would auto-commit them one by one
+            logger.debug(f"Skipping query in aborted transaction: {query[:200]}")
+            return None
+        
         try:
             # Execute query with parameters if provided
             if parameters:
@@ -145,6 +156,7 @@ class DatabaseService:
             logger.debug(f"Query: {query}")
             if parameters:
                 logger.debug(f"Parameters: {parameters}")
+            self._transaction_failed = self._in_transaction
             return None
     
     def execute_batch(self, queries: List[str]) -> bool:
@@ -161,6 +173,10 @@ class DatabaseService:
             if not self.connect():
                 return False
         
+        if self._transaction_failed:
+            logger.debug(f"Skipping batch of {len(queries)} queries in aborted transaction")
+            return False
+        
         try:
             # Execute queries sequentially (Kuzu handles transactions internally)
             failed_count = 0
@@ -168,6 +184,11 @@ class DatabaseService:
                 try:
                     result = self.conn.execute(query)
                 except Exception as e:
+                    if self._in_transaction:
+                        # The rest of the batch would run outside the transaction
+                        self._transaction_failed = True
+                        logger.error(f"Query {i+1} failed, transaction aborted: {e}")
+                        return False
                     failed_count += 1
                     if failed_count <= 3:  # Log first 3 failures
                         logger.error(f"Query {i+1} failed: {e}")
@@ -184,6 +205,48 @@ class DatabaseService:
             logger.error(f"Batch execution failed: {e}")
             return False
     
+    @contextmanager
+    def transaction(self) -> Iterator['DatabaseService']:
+        """
+        Run the queries issued inside the block in one write transaction.
+        
+        Kuzu rolls an explicit transaction back as soon as one of its
+        statements fails. Later queries in the block are then skipped, and
+        leaving the block raises instead of committing.
+        
+        Yields:
+            This service
+            
+        Raises:
+            RuntimeError: If the transaction could not be started or was
+                rolled back
+        """
+        if self._in_transaction:
+            # Nested blocks join the enclosing transaction
+            yield self
+            return
+        
+        if not self.conn:
+            if not self.connect():
+                raise RuntimeError("No database connection")
+        
+        self.conn.execute("BEGIN TRANSACTION")
+        self._in_transaction = True
+        self._transaction_failed = False
+        try:
+            yield self
+        except BaseException:
+            if not self._transaction_failed:
+                self.conn.execute("ROLLBACK")
+            raise
+        else:
+            if self._transaction_failed:
+                raise RuntimeError("Transaction rolled back after a failed query")
+            self.conn.execute("COMMIT")
+        finally:
+            self._in_transaction = False
+            self._transaction_failed = False
+    
     def clear_graph(self) -> bool:
         """
         Clear all data from the graph database.
@@ -4,14 +4,19 @@ Base parser infrastructure for CodeBased.
 
 import ast
 import os
+import re
+import sys
+import heapq
 import hashlib
 import logging
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Set, Generator, Tuple, Union
+from typing import List, Dict, Any, Optional, Set, Generator, Iterator, Tuple, Union, Pattern
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 from .file_types import get_file_type
+from .cache import ParseCache, PARSE_CACHE_VERSION
 
 try:
     import tree_sitter
@@ -22,10 +27,91 @@ except ImportError:
     Node = None
     Tree = None
 
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Prefixes marking content hashes computed with BLAKE3 or XXH3-128;
+# untagged hashes are SHA-256
+BLAKE3_HASH_PREFIX = "blake3:"
+XXH3_HASH_PREFIX = "xxh3:"
 
-@dataclass
+# Read size used when streaming files through a hasher
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Syntax trees kept per tree-sitter parser for incremental re-parsing. Only
+# a long-lived process that parses the same files again (the API server's
+# updater) gets hits, so the bound stays small.
+TREE_CACHE_SIZE = 16
+
+
+def hash_content(content: bytes) -> str:
+    """
+    Hash file content for change detection.
+    
+    Uses BLAKE3 when the ``blake3`` package is installed, XXH3-128 when
+    ``xxhash`` is, and SHA-256 otherwise. The hash only detects changes, so
+    a non-cryptographic hash is enough. BLAKE3 and XXH3 digests carry a
+    ``blake3:`` or ``xxh3:`` prefix so that hashes stored by a different
+    algorithm never compare equal.
+    
+    Args:
+        content: Raw file bytes
+        
+    Returns:
+        Hash string
+    """
+    if BLAKE3_AVAILABLE:
+        return BLAKE3_HASH_PREFIX + blake3.blake3(content).hexdigest()
+    if XXHASH_AVAILABLE:
+        return XXH3_HASH_PREFIX + xxhash.xxh3_128_hexdigest(content)
+    return hashlib.sha256(content).hexdigest()
+
+
+def hash_file(file_path: str) -> str:
+    """
+    Hash a file's content the same way as ``hash_content``, reading it in
+    fixed-size chunks instead of loading it into memory.
+    
+    Args:
+        file_path: Path to file
+        
+    Returns:
+        Hash string
+    """
+    if BLAKE3_AVAILABLE:
+        hasher, prefix = blake3.blake3(), BLAKE3_HASH_PREFIX
+    elif XXHASH_AVAILABLE:
+        hasher, prefix = xxhash.xxh3_128(), XXH3_HASH_PREFIX
+    else:
+        hasher, prefix = hashlib.sha256(), ""
+    buffer = memoryview(bytearray(HASH_CHUNK_SIZE))
+    with open(file_path, 'rb', buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            hasher.update(buffer[:size])
+    
+    return prefix + hasher.hexdigest()
+
+
+# Parsed entities and relationships are created per AST node; on Python 3.10+
+# they are slotted so instances carry no __dict__
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class ParsedEntity:
     """Represents a parsed code entity."""
     id: str
@@ -37,13 +123,26 @@ class ParsedEntity:
     metadata: Dict[str, Any]
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ParsedRelationship:
-    """Represents a relationship between parsed entities."""
-    from_id: str
-    to_id: str
+    """
+    Represents a relationship between parsed entities.
+
+    An endpoint that could not be resolved while parsing is left as ``None``
+    and described by ``unresolved_kind`` (e.g. ``"module"``, ``"template"``,
+    or ``None`` for a plain symbol) and ``unresolved_name``.
+    """
+    from_id: Optional[str]
+    to_id: Optional[str]
     relationship_type: str
     metadata: Dict[str, Any]
+    unresolved_name: Optional[str] = None
+    unresolved_kind: Optional[str] = None
+
+    @property
+    def is_resolved(self) -> bool:
+        """True if both endpoints refer to concrete entity IDs."""
+        return self.from_id is not None and self.to_id is not None
 
 
 @dataclass
@@ -71,12 +170,82 @@ class BaseParser(ABC):
         """
         self.config = config or {}
         self.errors: List[str] = []
+        
+        # Results of earlier parses, reused while a file is unchanged
+        self._parse_cache: Optional[ParseCache] = None
+        if self.config.get('parse_cache_path'):
+            from .. import __version__
+            self._parse_cache = ParseCache(self.config['parse_cache_path'],
+                                           f"{__version__}/{PARSE_CACHE_VERSION}")
 
     def can_parse(self, file_path: str) -> bool:
         """Return True if this parser can handle ``file_path``."""
         file_type = get_file_type(file_path)
         return file_type in self.SUPPORTED_FILE_TYPES
     
+    def get_cached_result(self, file_path: str) -> Optional[ParseResult]:
+        """
+        Return the cached parse result of an unchanged file.
+        
+        A result is only returned when a parse cache is configured and holds
+        an entry for the file's current modification time and size; the file
+        itself is not read.
+        
+        Args:
+            file_path: Path to file
+            
+        Returns:
+            Cached ParseResult, or None if the file has to be parsed
+        """
+        if self._parse_cache is None:
+            return None
+        
+        start_time = time.time()
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return None
+        
+        cached = self._parse_cache.get(file_path, self.__class__.__name__,
+                                       file_stat.st_mtime_ns, file_stat.st_size)
+        if cached is None:
+            return None
+        file_hash, entities, relationships = cached
+        return ParseResult(entities, relationships, file_hash, file_path, [],
+                           time.time() - start_time)
+    
+    def get_cached_result_for_content(self, file_path: str, file_hash: str,
+                                      file_stat: os.stat_result) -> Optional[ParseResult]:
+        """
+        Return the cached parse result of a file whose content is unchanged.
+        
+        Used once the file has been read and hashed, when the lookup by
+        modification time and size missed, e.g. after the file was touched.
+        
+        Args:
+            file_path: Path to file
+            file_hash: Content hash of the raw file bytes
+            file_stat: Current stat of the file
+            
+        Returns:
+            Cached ParseResult, or None if the file has to be parsed
+        """
+        if self._parse_cache is None:
+            return None
+        
+        start_time = time.time()
+        cached = self._parse_cache.get_by_hash(file_path, self.__class__.__name__, file_hash,
+                                               file_stat.st_mtime_ns, file_stat.st_size)
+        if cached is None:
+            return None
+        entities, relationships = cached
+        # The content is the same, but the file entity records when it changed
+        for entity in entities:
+            if entity.type == 'File' and 'modified_time' in entity.metadata:
+                entity.metadata['modified_time'] = int(file_stat.st_mtime)
+        return ParseResult(entities, relationships, file_hash, file_path, [],
+                           time.time() - start_time)
+    
     @abstractmethod
     def parse_file(self, file_path: str) -> ParseResult:
         """
@@ -192,22 +361,39 @@ class BaseParser(ABC):
     
     def _calculate_file_hash(self, file_path: str) -> str:
         """
-        Calculate SHA-256 hash of file content.
+        Calculate the content hash of a file (see ``hash_content``).
         
         Args:
             file_path: Path to file
             
         Returns:
-            Hexadecimal hash string
+            Hash string
         """
         try:
             with open(file_path, 'rb') as f:
                 content = f.read()
-            return hashlib.sha256(content).hexdigest()
+            return hash_content(content)
         except Exception as e:
             logger.error(f"Failed to calculate hash for {file_path}: {e}")
             return ""
     
+    @staticmethod
+    def _count_matches(pattern: Union[str, Pattern[str]], content: str) -> int:
+        """
+        Count non-overlapping matches of ``pattern`` in ``content``.
+        
+        Unlike ``len(re.findall(...))`` this does not build a list of the
+        matched strings.
+        
+        Args:
+            pattern: Regular expression or compiled pattern
+            content: Text to scan
+            
+        Returns:
+            Number of matches
+        """
+        return sum(1 for _ in re.finditer(pattern, content))
+    
     def _generate_entity_id(self, name: str, file_path: str, line_start: int, 
                            entity_type: str = "", line_end: int = None, parent_id: str = "") -> str:
         """
@@ -271,11 +457,69 @@ class TreeSitterParser(BaseParser):
     
     TREE_SITTER_LANGUAGE: str = ""  # Override in subclasses
     
+    # Schema properties of each relationship type, mapped to the metadata
+    # keys they are read from (first present wins) and their default
+    RELATIONSHIP_SCHEMA_PROPERTIES = {
+        'CALLS': {
+            'call_type': (('type',), 'function_call'),
+            'line_number': (('call_location', 'line_number'), 0)
+        },
+        'USES': {
+            'usage_type': (('type',), 'variable_access'),
+            'line_number': (('access_location', 'line_number'), 0)
+        },
+        'ACCESSES': {
+            'property_path': (('property_path',), ''),
+            'access_location': (('access_location', 'line_number'), 0)
+        },
+        'EXPORTS': {
+            'export_type': (('export_type',), 'named'),
+            'symbol': (('symbol', 'function_name'), '')
+        },
+        'IMPORTS': {
+            'import_type': (('import_type',), 'named')
+        },
+        'DECORATES': {
+            'decorator_name': (('decorator_name',), '')
+        },
+        'USES_TEMPLATE': {
+            'template_path': (('template_path',), ''),
+            'resolved_path': (('resolved_path',), ''),
+            'component_selector': (('component_selector',), '')
+        },
+        'USES_STYLES': {
+            'style_path': (('style_path',), ''),
+            'resolved_path': (('resolved_path',), ''),
+            'component_selector': (('component_selector',), '')
+        },
+        # Relationship types without extra properties
+        'IMPLEMENTS': {},
+        'EXTENDS': {},
+        'INHERITS': {}
+    }
+    
+    # Entity kinds whose <KIND>_CONTAINS_* relationships carry no properties
+    CONTAINER_TYPES = frozenset({'FILE', 'CLASS', 'MODULE', 'FUNCTION'})
+    
     def __init__(self, config: Dict[str, Any] = None):
         """Initialize tree-sitter parser."""
         super().__init__(config)
         self._language: Optional[Language] = None
         self._parser: Optional[Parser] = None
+        # UTF-8 bytes of the source being parsed, encoded once per source string
+        self._encoded_source: Optional[str] = None
+        self._encoded_source_bytes = b''
+        # (path, stat, content hash) of the file parse_file last opened
+        self._file_stat: Optional[Tuple[str, os.stat_result, str]] = None
+        
+        # Innermost function entity per line, for the last entity list
+        self._function_table_entities: Optional[List[ParsedEntity]] = None
+        self._function_table: List[Optional[ParsedEntity]] = []
+        
+        # Last (source bytes, tree) per file, least recently parsed first;
+        # a size of 0 turns incremental re-parsing off
+        self._tree_cache: 'OrderedDict[str, Tuple[bytes, Tree]]' = OrderedDict()
+        self._tree_cache_size: int = self.config.get('tree_cache_size', TREE_CACHE_SIZE)
         
         if not TREE_SITTER_AVAILABLE:
             raise ImportError("tree-sitter not available. Install with: pip install tree-sitter tree_sitter_languages")
@@ -297,12 +541,55 @@ class TreeSitterParser(BaseParser):
             logger.error(f"Failed to initialize tree-sitter parser for {self.TREE_SITTER_LANGUAGE}: {e}")
             raise
     
-    def _parse_source_code(self, source_code: str) -> Optional[Tree]:
+    def _normalize_relationship_metadata(self, relationship: ParsedRelationship) -> Dict[str, Any]:
+        """
+        Normalize relationship metadata to match database schema.
+        
+        Args:
+            relationship: Relationship with metadata to normalize
+            
+        Returns:
+            Dictionary with properties that match the schema
+        """
+        rel_type = relationship.relationship_type
+        metadata = relationship.metadata or {}
+        
+        schema_properties = self.RELATIONSHIP_SCHEMA_PROPERTIES.get(rel_type)
+        if schema_properties is not None:
+            properties = {}
+            for prop, (source_keys, default) in schema_properties.items():
+                # The first metadata key present provides the value
+                for key in source_keys:
+                    if key in metadata:
+                        properties[prop] = metadata[key]
+                        break
+                else:
+                    properties[prop] = default
+            return properties
+        
+        # Containment relationships (FILE_CONTAINS_*, CLASS_CONTAINS_*, etc.)
+        # have no additional properties in the schema
+        container, separator, _ = rel_type.partition('_CONTAINS_')
+        if separator and container in self.CONTAINER_TYPES:
+            return {}
+        
+        # For unknown relationship types, log warning and return empty dict
+        logger.warning(f"Unknown relationship type: {rel_type}")
+        return {}
+    
+    def _parse_source_code(self, source_code: str, file_path: Optional[str] = None) -> Optional[Tree]:
         """
         Parse source code with tree-sitter.
         
+        When the previous tree of the same file is cached, the change is
+        applied to it with ``Tree.edit`` and tree-sitter re-parses
+        incrementally, reusing the unchanged subtrees. The cache only pays
+        off in long-lived processes that parse the same files again, such
+        as the API server applying incremental updates.
+        
         Args:
             source_code: Source code to parse
+            file_path: Path of the parsed file, enables incremental re-parsing
             
         Returns:
             Parsed tree or None if parsing failed
@@ -311,19 +598,156 @@ class TreeSitterParser(BaseParser):
             return None
             
         try:
-            tree = self._parser.parse(source_code.encode('utf-8'))
+            source_bytes = self._get_source_bytes(source_code)
+            if file_path is None or not self._tree_cache_size:
+                return self._parser.parse(source_bytes)
+            
+            cached = self._tree_cache.pop(file_path, None)
+            if cached is None:
+                tree = self._parser.parse(source_bytes)
+            else:
+                old_bytes, old_tree = cached
+                if old_bytes == source_bytes:
+                    tree = old_tree
+                else:
+                    self._edit_tree(old_tree, old_bytes, source_bytes)
+                    tree = self._parser.parse(source_bytes, old_tree)
+                    if tree.root_node.has_error:
+                        # Error recovery may depend on the previous tree; keep
+                        # the result identical to a fresh parse
+                        tree = self._parser.parse(source_bytes)
+            
+            self._tree_cache[file_path] = (source_bytes, tree)
+            if len(self._tree_cache) > self._tree_cache_size:
+                self._tree_cache.popitem(last=False)
             return tree
         except Exception as e:
             logger.error(f"Tree-sitter parsing failed: {e}")
             return None
     
-    def _get_node_text(self, node: Node, source_code: str) -> str:
+    @staticmethod
+    def _edit_tree(tree: Tree, old_bytes: bytes, new_bytes: bytes) -> None:
+        """
+        Record the change from old_bytes to new_bytes on a tree.
+        
+        The change is described as a single edit spanning everything
+        between the common prefix and the common suffix of both versions.
+        
+        Args:
+            tree: Tree parsed from old_bytes
+            old_bytes: Previous source
+            new_bytes: Current source
+        """
+        old_view = memoryview(old_bytes)
+        new_view = memoryview(new_bytes)
+        limit = min(len(old_bytes), len(new_bytes))
+        
+        # Binary search the common prefix and suffix with slice comparisons
+        lo, hi = 0, limit
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if old_view[:mid] == new_view[:mid]:
+                lo = mid
+            else:
+                hi = mid - 1
+        start_byte = lo
+        
+        lo, hi = 0, limit - start_byte
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if old_view[len(old_bytes) - mid:] == new_view[len(new_bytes) - mid:]:
+                lo = mid
+            else:
+                hi = mid - 1
+        old_end_byte = len(old_bytes) - lo
+        new_end_byte = len(new_bytes) - lo
+        
+        def point(data: bytes, offset: int) -> Tuple[int, int]:
+            return data.count(b'\n', 0, offset), offset - (data.rfind(b'\n', 0, offset) + 1)
+        
+        tree.edit(
+            start_byte=start_byte,
+            old_end_byte=old_end_byte,
+            new_end_byte=new_end_byte,
+            start_point=point(old_bytes, start_byte),
+            old_end_point=point(old_bytes, old_end_byte),
+            new_end_point=point(new_bytes, new_end_byte),
+        )
+    
+    @staticmethod
+    def _count_lines(source_code: str) -> int:
+        """
+        Count source lines the way tree-sitter numbers rows, without
+        materializing the lines.
+        
+        Args:
+            source_code: Source text with normalized newlines
+            
+        Returns:
+            Number of lines; a trailing newline does not start a new line
+        """
+        if not source_code:
+            return 0
+        return source_code.count('\n') + (not source_code.endswith('\n'))
+    
+    def _stat_file(self, file_path: str) -> Optional[os.stat_result]:
+        """
+        Stat a file, reusing the stat taken when parse_file opened it.
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            Stat result, or None if the file cannot be accessed
+        """
+        if self._file_stat is not None and self._file_stat[0] == file_path:
+            return self._file_stat[1]
+        try:
+            return os.stat(file_path)
+        except OSError:
+            return None
+    
+    def _file_content_hash(self, file_path: str) -> str:
+        """
+        Get the content hash parse_file computed from the raw file bytes.
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            Content hash, or an empty string if the file is not being parsed
+        """
+        if self._file_stat is not None and self._file_stat[0] == file_path:
+            return self._file_stat[2]
+        return ''
+    
+    def _get_source_bytes(self, source_code: str) -> bytes:
+        """
+        Get the UTF-8 encoding of the source code.
+        
+        Tree-sitter offsets are byte offsets, so node text is sliced from
+        the encoded source; it is encoded once per source string rather
+        than once per node.
+        
+        Args:
+            source_code: Original source code
+            
+        Returns:
+            Encoded source code
+        """
+        if source_code is not self._encoded_source:
+            self._encoded_source_bytes = source_code.encode('utf-8')
+            self._encoded_source = source_code
+        return self._encoded_source_bytes
+    
+    def _get_node_text(self, node: Node, source_code: str, max_chars: Optional[int] = None) -> str:
         """
         Extract text content from a tree-sitter node.
         
         Args:
             node: Tree-sitter node
             source_code: Original source code
+            max_chars: Only decode up to this many characters
             
         Returns:
             Text content of the node
@@ -334,11 +758,162 @@ class TreeSitterParser(BaseParser):
         try:
             start_byte = node.start_byte
             end_byte = node.end_byte
-            return source_code.encode('utf-8')[start_byte:end_byte].decode('utf-8')
+            source_bytes = self._get_source_bytes(source_code)
+            if max_chars is not None:
+                # A UTF-8 character takes at most 4 bytes; only a character
+                # cut at the end of the window can be incomplete
+                end_byte = min(end_byte, start_byte + 4 * max_chars)
+                return source_bytes[start_byte:end_byte].decode('utf-8', 'ignore')[:max_chars]
+            return source_bytes[start_byte:end_byte].decode('utf-8')
         except Exception as e:
             logger.debug(f"Failed to extract node text: {e}")
             return ""
     
+    def _find_containing_function(self, node: Node, entities: List[ParsedEntity]) -> Optional[ParsedEntity]:
+        """
+        Find the function or method that contains the given node.
+        
+        Args:
+            node: Tree-sitter node
+            entities: Entities of the file being parsed
+            
+        Returns:
+            The smallest function, method or constructor spanning the node's
+            first line, or None
+        """
+        return self._find_function_at_line(self._get_node_line_info(node)[0], entities)
+    
+    def _find_function_at_line(self, line: int, entities: List[ParsedEntity]) -> Optional[ParsedEntity]:
+        """
+        Find the function or method containing a line, for callers that already know it.
+        
+        Args:
+            line: 1-indexed line number
+            entities: Entities of the file being parsed
+            
+        Returns:
+            The smallest function, method or constructor spanning the line, or None
+        """
+        try:
+            table = self._get_function_table(entities)
+            if 0 <= line < len(table):
+                return table[line]
+        except Exception as e:
+            logger.debug(f"Failed to find containing function: {e}")
+        
+        return None
+    
+    def _get_function_table(self, entities: List[ParsedEntity]) -> List[Optional[ParsedEntity]]:
+        """
+        Get the innermost function entity of every line, built once per entity list.
+        
+        Function boundaries are swept in order while a heap holds the
+        functions spanning the current line, ordered by span and then by
+        position in ``entities``, so the table holds the smallest containing
+        function and the first one listed among equally small ones. The
+        innermost function only changes where a function starts or ends, so
+        the lines between two boundaries are filled with one slice assignment.
+        
+        Args:
+            entities: Entities of the file being parsed
+            
+        Returns:
+            List indexed by line number; lines past the last function are absent
+        """
+        if entities is self._function_table_entities:
+            return self._function_table
+        
+        functions = sorted(((entity.line_start, index, entity) for index, entity in enumerate(entities)
+                            if entity.type in ('Function', 'Method', 'Constructor')),
+                           key=lambda item: item[:2])
+        table: List[Optional[ParsedEntity]] = []
+        if functions:
+            table = [None] * (max(entity.line_end for _, _, entity in functions) + 1)
+            boundaries = sorted({start for start, _, _ in functions} |
+                                {entity.line_end + 1 for _, _, entity in functions})
+            active: List[Tuple[int, int, ParsedEntity]] = []
+            next_function = 0
+            for position, line in enumerate(boundaries[:-1]):
+                while next_function < len(functions) and functions[next_function][0] <= line:
+                    _, index, entity = functions[next_function]
+                    heapq.heappush(active, (entity.line_end - entity.line_start, index, entity))
+                    next_function += 1
+                while active and active[0][2].line_end < line:
+                    heapq.heappop(active)
+                if active:
+                    next_line = boundaries[position + 1]
+                    table[line:next_line] = [active[0][2]] * (next_line - line)
+        
+        self._function_table = table
+        self._function_table_entities = entities
+        return table
+    
+    def _get_node_bytes(self, node: Node, source_code: str) -> bytes:
+        """
+        Get the raw UTF-8 bytes of a node without decoding them.
+        
+        Checks for ASCII tokens give the same answers on the bytes as on the
+        decoded text, since multi-byte UTF-8 sequences contain no ASCII bytes.
+        
+        Args:
+            node: Tree-sitter node
+            source_code: Original source code
+            
+        Returns:
+            Encoded text of the node
+        """
+        return self._get_source_bytes(source_code)[node.start_byte:node.end_byte]
+    
+    def _get_node_header_bytes(self, node: Node, source_code: str) -> bytes:
+        """
+        Get the raw UTF-8 bytes of a node up to its name.
+        
+        For declarations this is where keywords and modifiers such as
+        ``static`` or ``async`` are written, so checking them does not scan
+        the body, nor match words inside parameters or the body.
+        
+        Args:
+            node: Tree-sitter node
+            source_code: Original source code
+            
+        Returns:
+            Encoded text before the node's name field, or the whole node
+            if it has no name
+        """
+        name = node.child_by_field_name('name')
+        end_byte = name.start_byte if name is not None else node.end_byte
+        return self._get_source_bytes(source_code)[node.start_byte:end_byte]
+    
+    def _get_string_contents(self, node: Node, source_code: str) -> str:
+        """
+        Get the contents of a string literal node without its quotes.
+        
+        Args:
+            node: Tree-sitter string node
+            source_code: Original source code
+            
+        Returns:
+            Text between the opening and closing quote
+        """
+        return self._get_source_bytes(source_code)[node.start_byte + 1:node.end_byte - 1].decode('utf-8')
+    
+    @staticmethod
+    def _find_child_of_type(node: Node, node_type: str) -> Optional[Node]:
+        """
+        Find the first direct child of a node with the given type.
+        
+        Args:
+            node: Tree-sitter node
+            node_type: Child node type to look for
+            
+        Returns:
+            Matching child node or None
+        """
+        for child in node.children:
+            if child.type == node_type:
+                return child
+        return None
+    
     def _get_node_line_info(self, node: Node) -> Tuple[int, int]:
         """
         Get line start and end information for a node.
@@ -353,25 +928,40 @@ class TreeSitterParser(BaseParser):
             return (1, 1)
         
         try:
-            # Tree-sitter uses 0-indexed lines, convert to 1-indexed
-            # Handle both object and tuple return types for compatibility
-            start_point = node.start_point
-            end_point = node.end_point
-            
-            if hasattr(start_point, 'row'):
-                # Object with row/column attributes
-                start_line = start_point.row + 1
-                end_line = end_point.row + 1
-            else:
-                # Tuple format (row, column)
-                start_line = start_point[0] + 1
-                end_line = end_point[0] + 1
-                
-            return (start_line, end_line)
+            # Tree-sitter uses 0-indexed rows, convert to 1-indexed. Points
+            # are (row, column) tuples, or a Point named tuple in newer
+            # bindings, so indexing works for both
+            return (node.start_point[0] + 1, node.end_point[0] + 1)
         except Exception as e:
             logger.debug(f"Failed to get line info for node: {e}")
             return (1, 1)
     
+    def _walk(self, root: Node) -> Iterator[Node]:
+        """
+        Yield a node and all its descendants in document order.
+        
+        Driven by a tree cursor, so no Python frame or children list is
+        created per node. A compiled tree-sitter Query capturing only the
+        interesting node types is slower than this walk plus a type check,
+        since the bindings build a Node and a tuple for every capture.
+
+        Args:
+            root: Node to start from
+            
+        Yields:
+            Tree-sitter nodes in pre-order
+        """
+        cursor = root.walk()
+        while True:
+            yield cursor.node
+            if cursor.goto_first_child():
+                continue
+            # Climb until a node with an unvisited sibling; the cursor
+            # cannot leave the subtree of the node it was created from
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return
+    
     def _traverse_tree(self, node: Node, source_code: str, entities: List[ParsedEntity], 
                       relationships: List[ParsedRelationship], file_path: str) -> None:
         """
@@ -385,9 +975,10 @@ class TreeSitterParser(BaseParser):
             file_path: Path to source file
         """
         # This is meant to be overridden by specific language parsers
-        # Default implementation just traverses children
-        for child in node.children:
-            self._traverse_tree(child, source_code, entities, relationships, file_path)
+        # Default implementation just traverses the subtree, iteratively so
+        # deeply nested sources cannot hit the recursion limit
+        for _ in self._walk(node):
+            pass
     
     @abstractmethod
     def _extract_entities_from_node(self, node: Node, source_code: str, file_path: str) -> List[ParsedEntity]:
@@ -423,10 +1014,36 @@ class TreeSitterParser(BaseParser):
         """
         pass
     
+    def _parse_tree(self, root_node: Node, source_code: str,
+                    file_path: str) -> Tuple[List[ParsedEntity], List[ParsedRelationship]]:
+        """
+        Extract entities and relationships from a parsed tree.
+        
+        Runs the entity pass and then the relationship pass; parsers that
+        collect both in a single traversal override this.
+        
+        Args:
+            root_node: Root of the parsed tree
+            source_code: Original source code
+            file_path: Path to source file
+            
+        Returns:
+            Tuple of (entities, relationships)
+        """
+        entities = self._extract_entities_from_node(root_node, source_code, file_path)
+        relationships = self._extract_relationships_from_node(root_node, source_code, entities, file_path)
+        return entities, relationships
+    
     def parse_file(self, file_path: str) -> ParseResult:
         """
         Parse a file using tree-sitter.
         
+        The file is read once for hashing and parsing. When a parse cache
+        is configured and holds a result for the file's modification time
+        and size, the cached result and hash are returned without reading
+        the file; failing that, a result cached for the same content is
+        returned without parsing it.
+        
         Args:
             file_path: Path to file to parse
             
@@ -439,21 +1056,45 @@ class TreeSitterParser(BaseParser):
         errors = []
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                source_code = f.read()
+            parser_name = self.__class__.__name__
+            
+            cached = self.get_cached_result(file_path)
+            if cached is not None:
+                return cached
+            
+            with open(file_path, 'rb', buffering=0) as f:
+                raw = f.read()
+                file_stat = os.fstat(f.fileno())
+            file_hash = hash_content(raw)
+            self._file_stat = (file_path, file_stat, file_hash)
             
-            file_hash = self._calculate_file_hash(file_path)
+            cached = self.get_cached_result_for_content(file_path, file_hash, file_stat)
+            if cached is not None:
+                return cached
+            
+            # Same text as reading in text mode: lenient decoding, universal newlines
+            source_code = raw.decode('utf-8', errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
             
             # Parse with tree-sitter
-            tree = self._parse_source_code(source_code)
+            tree = self._parse_source_code(source_code, file_path)
             if tree is None:
                 errors.append("Failed to parse with tree-sitter")
                 return ParseResult(entities, relationships, file_hash, file_path, errors, time.time() - start_time)
             
             # Extract entities and relationships from AST
-            root_node = tree.root_node
-            entities = self._extract_entities_from_node(root_node, source_code, file_path)
-            relationships = self._extract_relationships_from_node(root_node, source_code, entities, file_path)
+            entities, relationships = self._parse_tree(tree.root_node, source_code, file_path)
+            
+            # Entities are tied to their file through file_id = File.id, which
+            # is how changed and deleted files are removed from the graph
+            file_id = next((entity.id for entity in entities if entity.type == 'File'), None)
+            if file_id is not None:
+                for entity in entities:
+                    if entity.type != 'File':
+                        entity.metadata['file_id'] = file_id
+            
+            if self._parse_cache is not None:
+                self._parse_cache.put(file_path, parser_name, file_hash, file_stat.st_mtime_ns,
+                                      file_stat.st_size, entities, relationships)
             
         except Exception as e:
             error_msg = f"Failed to parse {file_path}: {e}"
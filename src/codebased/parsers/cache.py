@@ -0,0 +1,181 @@
+"""
+Persistent parse result cache for CodeBased.
+"""
+
+import os
+import pickle
+import sqlite3
+import logging
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cache file created next to the graph database
+PARSE_CACHE_FILENAME = "parse_cache.sqlite"
+# Bump when the layout of cached parse results changes
+PARSE_CACHE_VERSION = 7
+# Bump when the cache table changes; older tables are dropped on open
+PARSE_CACHE_SCHEMA = 2
+
+
+class ParseCache:
+    """
+    SQLite cache of extracted entities and relationships per file.
+
+    Each file keeps one row holding the pickled result of its last parse and
+    the content hash it was parsed at. Rows are looked up by the file's
+    modification time and size, like the stat signatures of incremental
+    updates, so a hit needs neither reading nor hashing the file. Files
+    whose stat changed but whose content did not, such as touched or
+    re-checked-out files, are still found by their content hash.
+    The database runs in WAL mode so parser worker processes can read and
+    write it concurrently.
+    """
+
+    def __init__(self, path: str, version: str):
+        """
+        Initialize parse cache.
+
+        Args:
+            path: Path to the SQLite cache file
+            version: Version of the code producing the results; rows written
+                by another version are ignored
+        """
+        self.path = path
+        self.version = version
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = False
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the cache database on first use."""
+        if self._conn is not None or self._disabled:
+            return self._conn
+
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != PARSE_CACHE_SCHEMA:
+                conn.execute("DROP TABLE IF EXISTS parse_cache")
+                conn.execute(f"PRAGMA user_version = {PARSE_CACHE_SCHEMA}")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS parse_cache (
+                    path TEXT PRIMARY KEY,
+                    parser TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    hash TEXT NOT NULL,
+                    result BLOB NOT NULL
+                )
+            """)
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error as e:
+            logger.warning(f"Parse cache disabled, cannot open {self.path}: {e}")
+            self._disabled = True
+
+        return self._conn
+
+    def get(self, file_path: str, parser: str, mtime_ns: int,
+            size: int) -> Optional[Tuple[str, List[Any], List[Any]]]:
+        """
+        Look up the cached parse result of a file.
+
+        Args:
+            file_path: Path to the parsed file
+            parser: Name of the parser class
+            mtime_ns: Modification time of the file in nanoseconds
+            size: Size of the file in bytes
+
+        Returns:
+            Tuple of (content hash, entities, relationships), or None on a miss
+        """
+        conn = self._connect()
+        if conn is None:
+            return None
+
+        try:
+            row = conn.execute(
+                "SELECT hash, result FROM parse_cache "
+                "WHERE path = ? AND parser = ? AND version = ? AND mtime_ns = ? AND size = ?",
+                (file_path, parser, self.version, mtime_ns, size)
+            ).fetchone()
+            if row is None:
+                return None
+            entities, relationships = pickle.loads(row[1])
+            return row[0], entities, relationships
+        except Exception as e:
+            logger.debug(f"Parse cache lookup failed for {file_path}: {e}")
+            return None
+
+    def get_by_hash(self, file_path: str, parser: str, file_hash: str, mtime_ns: int,
+                    size: int) -> Optional[Tuple[List[Any], List[Any]]]:
+        """
+        Look up the cached parse result of a file by its content hash.
+
+        On a hit the row is updated to the file's current modification time
+        and size, so later lookups succeed without reading the file.
+
+        Args:
+            file_path: Path to the parsed file
+            parser: Name of the parser class
+            file_hash: Content hash of the file
+            mtime_ns: Modification time of the file in nanoseconds
+            size: Size of the file in bytes
+
+        Returns:
+            Tuple of (entities, relationships), or None on a miss
+        """
+        conn = self._connect()
+        if conn is None:
+            return None
+
+        try:
+            row = conn.execute(
+                "SELECT result FROM parse_cache "
+                "WHERE path = ? AND parser = ? AND version = ? AND hash = ?",
+                (file_path, parser, self.version, file_hash)
+            ).fetchone()
+            if row is None:
+                return None
+            entities, relationships = pickle.loads(row[0])
+            conn.execute(
+                "UPDATE parse_cache SET mtime_ns = ?, size = ? WHERE path = ?",
+                (mtime_ns, size, file_path)
+            )
+            conn.commit()
+            return entities, relationships
+        except Exception as e:
+            logger.debug(f"Parse cache lookup failed for {file_path}: {e}")
+            return None
+
+    def put(self, file_path: str, parser: str, file_hash: str, mtime_ns: int, size: int,
+            entities: List[Any], relationships: List[Any]) -> None:
+        """
+        Store the parse result of a file, replacing any previous one.
+
+        Args:
+            file_path: Path to the parsed file
+            parser: Name of the parser class
+            file_hash: Content hash of the file
+            mtime_ns: Modification time of the file in nanoseconds
+            size: Size of the file in bytes
+            entities: Extracted entities
+            relationships: Extracted relationships
+        """
+        conn = self._connect()
+        if conn is None:
+            return
+
+        try:
+            result = pickle.dumps((entities, relationships), protocol=pickle.HIGHEST_PROTOCOL)
+            conn.execute(
+                "INSERT OR REPLACE INTO parse_cache (path, parser, version, mtime_ns, size, hash, result) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (file_path, parser, self.version, mtime_ns, size, file_hash, result)
+            )
+            conn.commit()
+        except Exception as e:
+            logger.debug(f"Parse cache update failed for {file_path}: {e}")
@@ -9,7 +9,7 @@ import re
 from pathlib import Path
 from typing import List, Dict, Any, Set
 
-from .base import BaseParser, ParsedEntity, ParsedRelationship, ParseResult
+from .base import BaseParser, ParsedEntity, ParsedRelationship, ParseResult, hash_content
 
 logger = logging.getLogger(__name__)
 
@@ -35,13 +35,17 @@ class CSSParser(BaseParser):
         errors = []
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Read, stat and hash the file through a single descriptor
+            with open(file_path, 'rb', buffering=0) as f:
+                file_stats = os.fstat(f.fileno())
+                raw = f.read()
+            # Same text as reading in text mode: strict UTF-8, universal newlines
+            content = raw.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
 
-            file_hash = self._calculate_file_hash(file_path)
+            file_hash = hash_content(raw)
             
             # Create File entity with enhanced metadata
-            file_entity = self._create_css_file_entity(file_path, content)
+            file_entity = self._create_css_file_entity(file_path, content, file_stats)
             entities.append(file_entity)
 
             # Extract CSS features and relationships
@@ -56,10 +60,10 @@ class CSSParser(BaseParser):
         parse_time = time.time() - start_time
         return ParseResult(entities, relationships, file_hash, file_path, errors, parse_time)
 
-    def _create_css_file_entity(self, file_path: str, content: str) -> ParsedEntity:
+    def _create_css_file_entity(self, file_path: str, content: str,
+                                file_stats: os.stat_result) -> ParsedEntity:
         """Create a File entity for a CSS file with enhanced metadata."""
         lines = content.splitlines()
-        file_stats = os.stat(file_path)
         path_obj = Path(file_path)
         
         # Determine CSS preprocessor type
@@ -136,7 +140,7 @@ class CSSParser(BaseParser):
         metadata['selectors'] = list(selectors)[:20]  # First 20 selectors
         
         # Count CSS rules/declarations
-        rule_count = len(re.findall(r'\{[^}]*\}', content))
+        rule_count = self._count_matches(r'\{[^}]*\}', content)
         metadata['rule_count'] = rule_count
         
         # Extract imports
@@ -219,11 +223,11 @@ class CSSParser(BaseParser):
         features = {}
         
         # Host selectors
-        host_selectors = len(re.findall(r':host', content))
+        host_selectors = content.count(':host')
         features['host_selectors'] = host_selectors
         
         # Deep selectors
-        deep_selectors = len(re.findall(r'::ng-deep', content))
+        deep_selectors = content.count('::ng-deep')
         features['deep_selectors'] = deep_selectors
         
         # Material component usage
@@ -255,10 +259,12 @@ class CSSParser(BaseParser):
         for import_path in imports:
             relationships.append(ParsedRelationship(
                 from_id=file_entity.id,
-                to_id=f"unresolved:style_{import_path}",
+                to_id=None,
                 relationship_type="IMPORTS_STYLE",
                 metadata={
                     'import_path': import_path,
                     'import_type': 'css_import'
-                }
+                },
+                unresolved_name=import_path,
+                unresolved_kind="style"
             ))
@@ -4,18 +4,84 @@ Entity and relationship extraction coordination for CodeBased.
 
 import logging
 import os
+import re
 import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Set, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 from .base import ParseResult, ParsedEntity, ParsedRelationship
+from .cache import PARSE_CACHE_FILENAME
+from .file_types import get_file_type
 from .registry import PARSER_REGISTRY
 from ..database.service import DatabaseService
 from ..config import CodeBasedConfig
 
 logger = logging.getLogger(__name__)
 
+# Well-known npm packages imported by bare name, never resolved to project files
+_EXTERNAL_MODULES = frozenset({'rxjs', 'lodash', 'moment', 'axios'})
+# Scoped packages and explicit node_modules paths are external too
+_EXTERNAL_PREFIX_RE = re.compile(r'@|node_modules')
+
+# Below this many files, parsing in-process beats starting a worker pool
+MIN_FILES_FOR_PROCESS_POOL = 4
+
+# Parsers owned by a pool worker process, built once by _init_worker
+_WORKER_PARSERS: Dict[str, Any] = {}
+
+
+def _init_worker(parser_config: Dict[str, Any]) -> None:
+    """
+    Build one instance of every registered parser for this worker process.
+    
+    Args:
+        parser_config: Parser configuration shared by all parsers
+    """
+    global _WORKER_PARSERS
+    _WORKER_PARSERS = {}
+    # Workers exit with their pool and never parse a file twice, so keeping
+    # syntax trees for incremental re-parsing would only hold memory
+    parser_config = dict(parser_config, tree_cache_size=0)
+    for name, parser_cls in PARSER_REGISTRY.items():
+        try:
+            _WORKER_PARSERS[name] = parser_cls(parser_config)
+        except Exception as e:  # pragma: no cover - initialization failure
+            logger.error(f"Failed to initialize parser '{name}': {e}")
+
+
+def _parse_worker(batch: List[Tuple[int, str, str]]) -> List[Tuple[int, ParseResult]]:
+    """
+    Parse a batch of files with this worker's parser instances.
+    
+    Args:
+        batch: Tuples of (task index, parser name, file path)
+        
+    Returns:
+        Tuples of (task index, parse result), with an error result for
+        each file whose parsing raised
+    """
+    return [(index, _parse_with(_WORKER_PARSERS[parser_name], file_path))
+            for index, parser_name, file_path in batch]
+
+
+def _parse_with(parser: Any, file_path: str) -> ParseResult:
+    """
+    Parse a file, turning an unexpected exception into an error result.
+    
+    Args:
+        parser: Parser instance to use
+        file_path: Path to file
+        
+    Returns:
+        Parse result
+    """
+    try:
+        return parser.parse_file(file_path)
+    except Exception as e:
+        logger.error(f"Failed to parse {file_path}: {e}")
+        return ParseResult([], [], "", file_path, [str(e)], 0.0)
+
 
 class EntityExtractor:
     """Coordinates entity extraction from source code."""
@@ -40,6 +106,14 @@ class EntityExtractor:
             except Exception as e:  # pragma: no cover - initialization failure
                 logger.error(f"Failed to initialize parser '{name}': {e}")
         
+        self._parser_names: Dict[Any, str] = {parser: name for name, parser in self.parsers.items()}
+        
+        # File type -> parser name, first registered parser wins as in can_parse
+        self._file_type_to_parser: Dict[str, str] = {}
+        for name, parser in self.parsers.items():
+            for file_type in parser.SUPPORTED_FILE_TYPES:
+                self._file_type_to_parser.setdefault(file_type, name)
+        
         # Symbol registry for cross-file resolution
         self.symbol_registry: Dict[str, ParsedEntity] = {}
         self.unresolved_references: List[Tuple[ParsedRelationship, str]] = []
@@ -51,7 +125,9 @@ class EntityExtractor:
             'exclude_patterns': self.config.parsing.exclude_patterns,
             'max_file_size': self.config.parsing.max_file_size,
             'follow_symlinks': self.config.parsing.follow_symlinks,
-            'include_docstrings': self.config.parsing.include_docstrings
+            'include_docstrings': self.config.parsing.include_docstrings,
+            'parse_cache_path': (str(Path(self.config.database.path).parent / PARSE_CACHE_FILENAME)
+                                 if self.config.parsing.parse_cache else None)
         }
     
     def extract_from_directory(self, directory_path: str) -> Dict[str, Any]:
@@ -122,10 +198,7 @@ class EntityExtractor:
         parse_results = []
         
         # Find all parseable files
-        all_files = []
-        for parser in self.parsers.values():
-            for file_path in parser._find_parseable_files(directory_path):
-                all_files.append(str(file_path))
+        all_files = [file_path for file_path, _, _ in self.iter_parseable_entries(directory_path)]
         
         # Deduplicate files to prevent multiple parsers processing the same file
         unique_files = list(set(all_files))
@@ -133,10 +206,11 @@ class EntityExtractor:
         
         # Pass 1: Extract entities and build symbol registry
         logger.info("Starting Pass 1: Entity extraction and symbol registration")
-        pass1_results = self._extract_entities_parallel(unique_files)
+        pass1_results = []
         
-        # Build symbol registry from all entities
-        for result in pass1_results:
+        # Register symbols as results arrive, while workers are still parsing
+        for result in self.iter_extract_entities(unique_files):
+            pass1_results.append(result)
             for entity in result.entities:
                 self._register_symbol(entity)
         
@@ -150,41 +224,153 @@ class EntityExtractor:
         
         return pass2_results
     
-    def _extract_entities_parallel(self, file_paths: List[str]) -> List[ParseResult]:
+    def iter_parseable_entries(self, directory_path: str) -> Iterator[Tuple[str, os.stat_result, Any]]:
+        """
+        Walk a directory once and yield every file a registered parser handles.
+        
+        Applies the same exclusion, size and symlink rules as
+        ``BaseParser._find_parseable_files``, but uses ``os.scandir`` so the
+        directory is listed once for all parsers and each file is stat'ed once.
+        
+        Args:
+            directory_path: Root directory to walk
+            
+        Yields:
+            Tuples of (file path, stat result, parser)
+        """
+        if not self.parsers:
+            return
+        
+        parser_config = self._get_parser_config()
+        exclude_patterns = parser_config.get('exclude_patterns') or []
+        max_file_size = parser_config.get('max_file_size', 1024 * 1024)
+        follow_symlinks = parser_config.get('follow_symlinks', False)
+        should_exclude = next(iter(self.parsers.values()))._should_exclude
+        
+        pending_dirs = [Path(directory_path)]
+        while pending_dirs:
+            current_dir = pending_dirs.pop()
+            try:
+                with os.scandir(current_dir) as scanner:
+                    entries = list(scanner)
+            except OSError as e:
+                logger.debug(f"Cannot scan {current_dir}: {e}")
+                continue
+            
+            subdirs = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                
+                if is_dir:
+                    if (not should_exclude(entry.name, exclude_patterns)
+                            and (follow_symlinks or not entry.is_symlink())):
+                        subdirs.append(current_dir / entry.name)
+                    continue
+                
+                file_path = str(current_dir / entry.name)
+                if should_exclude(file_path, exclude_patterns):
+                    continue
+                
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if stat.st_size > max_file_size:
+                    logger.debug(f"Skipping large file: {file_path}")
+                    continue
+                
+                parser_name = self._file_type_to_parser.get(get_file_type(file_path))
+                if parser_name:
+                    yield file_path, stat, self.parsers[parser_name]
+            
+            # Visit subdirectories top-down in listing order, like os.walk
+            pending_dirs.extend(reversed(subdirs))
+    
+    def _extract_entities_parallel(self, file_paths: List[str],
+                                   known_parsers: Optional[Dict[str, Any]] = None) -> List[ParseResult]:
         """
         Extract entities from files in parallel.
         
         Args:
             file_paths: List of file paths to parse
+            known_parsers: Optional mapping of file path to the parser already
+                chosen for it (e.g. by ``iter_parseable_entries``)
             
         Returns:
-            List of parse results
+            List of parse results, in the order of ``file_paths``
         """
-        results = []
-        max_workers = min(4, len(file_paths))  # Limit concurrent parsers
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit parsing tasks
-            future_to_file = {}
-            for file_path in file_paths:
-                parser = self._get_parser_for_file(file_path)
-                if parser:
-                    future = executor.submit(parser.parse_file, file_path)
-                    future_to_file[future] = file_path
-            
-            # Collect results
-            for future in as_completed(future_to_file):
-                file_path = future_to_file[future]
-                try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    logger.error(f"Failed to parse {file_path}: {e}")
-                    # Create error result
-                    error_result = ParseResult([], [], "", file_path, [str(e)], 0.0)
-                    results.append(error_result)
+        indexed = sorted(self._iter_indexed_results(file_paths, known_parsers), key=lambda item: item[0])
+        return [result for _, result in indexed]
+    
+    def iter_extract_entities(self, file_paths: List[str],
+                              known_parsers: Optional[Dict[str, Any]] = None) -> Iterator[ParseResult]:
+        """
+        Extract entities from files in parallel, yielding results as they complete.
         
-        return results
+        Cached results of unchanged files come first, then the parsed files
+        in completion order, so callers can consume results while worker
+        processes are still parsing.
+        
+        Args:
+            file_paths: List of file paths to parse
+            known_parsers: Optional mapping of file path to the parser already
+                chosen for it (e.g. by ``iter_parseable_entries``)
+            
+        Yields:
+            Parse results, in no particular order
+        """
+        for _, result in self._iter_indexed_results(file_paths, known_parsers):
+            yield result
+    
+    def _iter_indexed_results(self, file_paths: List[str],
+                              known_parsers: Optional[Dict[str, Any]]) -> Iterator[Tuple[int, ParseResult]]:
+        """
+        Parse files and yield (task index, result) pairs in completion order.
+        
+        Args:
+            file_paths: List of file paths to parse
+            known_parsers: Optional mapping of file path to its parser
+            
+        Yields:
+            Tuples of (task index, parse result)
+        """
+        known_parsers = known_parsers or {}
+        tasks = []
+        for file_path in file_paths:
+            parser = known_parsers.get(file_path)
+            parser_name = self._parser_names.get(parser) if parser else self._get_parser_name_for_file(file_path)
+            if parser_name:
+                tasks.append((parser_name, file_path))
+        
+        # Unchanged files are served from the parse cache here, so only the
+        # files that really need parsing are shipped to worker processes
+        pending = []
+        for index, (parser_name, file_path) in enumerate(tasks):
+            result = self.parsers[parser_name].get_cached_result(file_path)
+            if result is None:
+                pending.append((index, parser_name, file_path))
+            else:
+                yield index, result
+        
+        if len(pending) < MIN_FILES_FOR_PROCESS_POOL:
+            for index, parser_name, file_path in pending:
+                yield index, _parse_with(self.parsers[parser_name], file_path)
+            return
+        
+        max_workers = min(self.config.parsing.parse_workers or os.cpu_count() or 1, len(pending))
+        chunksize = max(1, min(16, len(pending) // (max_workers * 4)))
+        
+        # Each worker builds its parsers once and reuses them for every batch
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_worker,
+                                 initargs=(self._get_parser_config(),)) as executor:
+            futures = [executor.submit(_parse_worker, pending[start:start + chunksize])
+                       for start in range(0, len(pending), chunksize)]
+            for future in as_completed(futures):
+                yield from future.result()
     
     def _resolve_relationships(self, parse_results: List[ParseResult]) -> List[ParseResult]:
         """
@@ -197,43 +383,79 @@ class EntityExtractor:
             Updated parse results with resolved relationships
         """
         resolved_results = []
-        
         for result in parse_results:
-            resolved_relationships = []
+            # Results without unresolved references are passed through as-is
+            if not any(rel.to_id is None for rel in result.relationships):
+                resolved_results.append(result)
+                continue
             
-            for relationship in result.relationships:
-                # Check if relationship needs resolution
-                if relationship.to_id.startswith("unresolved:"):
-                    resolved_id = self._resolve_symbol_reference(relationship.to_id, relationship.metadata)
-                    if resolved_id:
-                        # Create resolved relationship
-                        resolved_rel = ParsedRelationship(
-                            from_id=relationship.from_id,
-                            to_id=resolved_id,
-                            relationship_type=relationship.relationship_type,
-                            metadata=relationship.metadata
-                        )
-                        resolved_relationships.append(resolved_rel)
-                    else:
-                        # Keep unresolved for external dependencies
-                        resolved_relationships.append(relationship)
-                else:
-                    # Already resolved
-                    resolved_relationships.append(relationship)
-            
-            # Create updated result
-            resolved_result = ParseResult(
+            resolved_results.append(ParseResult(
                 entities=result.entities,
-                relationships=resolved_relationships,
+                relationships=[self._resolve_relationship(rel) for rel in result.relationships],
                 file_hash=result.file_hash,
                 file_path=result.file_path,
                 errors=result.errors,
                 parse_time=result.parse_time
-            )
-            resolved_results.append(resolved_result)
+            ))
         
         return resolved_results
     
+    def _resolve_relationships_delta(self, parse_results: List[ParseResult],
+                                     touched_paths: Set[str]) -> List[ParseResult]:
+        """
+        Resolve relationships for an incremental delta.
+        
+        Registry entries from touched (added, modified or removed) files are
+        replaced by the entities of the new parse results, so the delta is
+        resolved against the current version of the changed files while
+        entries for unchanged files are kept as they are.
+        
+        Args:
+            parse_results: Results for the added and modified files
+            touched_paths: Paths of every file in the delta
+            
+        Returns:
+            Updated parse results with resolved relationships
+        """
+        if touched_paths:
+            self.symbol_registry = {
+                key: entity for key, entity in self.symbol_registry.items()
+                if entity.file_path not in touched_paths
+            }
+        
+        for result in parse_results:
+            for entity in result.entities:
+                self._register_symbol(entity)
+        
+        return self._resolve_relationships(parse_results)
+    
+    def _resolve_relationship(self, relationship: ParsedRelationship) -> ParsedRelationship:
+        """
+        Resolve a single relationship against the symbol registry.
+        
+        Args:
+            relationship: Relationship from the first pass
+            
+        Returns:
+            A resolved copy, or the original relationship if it is already
+            resolved or refers to an external dependency
+        """
+        if relationship.to_id is not None:
+            return relationship
+        
+        resolved_id = self._resolve_symbol_reference(relationship.unresolved_name,
+                                                     relationship.unresolved_kind,
+                                                     relationship.metadata)
+        if not resolved_id:
+            return relationship
+        
+        return ParsedRelationship(
+            from_id=relationship.from_id,
+            to_id=resolved_id,
+            relationship_type=relationship.relationship_type,
+            metadata=relationship.metadata
+        )
+    
     def _register_symbol(self, entity: ParsedEntity) -> None:
         """
         Register entity in symbol registry with enhanced lookup patterns.
@@ -336,49 +558,47 @@ class EntityExtractor:
                 if self._is_more_specific(entity, existing):
                     self.symbol_registry[key] = entity
     
-    def _resolve_symbol_reference(self, unresolved_ref: str, metadata: Dict[str, Any] = None) -> Optional[str]:
+    def _resolve_symbol_reference(self, symbol_name: Optional[str], kind: Optional[str] = None,
+                                  metadata: Dict[str, Any] = None) -> Optional[str]:
         """
         Resolve an unresolved symbol reference using enhanced lookup patterns.
         
         Args:
-            unresolved_ref: Unresolved reference (e.g., "unresolved:module_angular/core")
+            symbol_name: Unresolved name (e.g., "@angular/core" or "MyClass")
+            kind: Reference kind (e.g., "module", "template"), or None for plain symbols
             metadata: Optional metadata from relationship for context
             
         Returns:
             Resolved entity ID or None
         """
-        if not unresolved_ref.startswith("unresolved:"):
-            return unresolved_ref
+        if not symbol_name:
+            return None
         
-        symbol_name = unresolved_ref[11:]  # Remove "unresolved:" prefix
         metadata = metadata or {}
         
         # Handle different types of unresolved references
-        if symbol_name.startswith("module_"):
+        if kind == "module":
             # Module import resolution
-            module_path = symbol_name[7:]  # Remove "module_" prefix
-            return self._resolve_module_reference(module_path)
+            return self._resolve_module_reference(symbol_name)
             
-        elif symbol_name.startswith("template_"):
+        elif kind == "template":
             # Template file resolution
-            template_path = symbol_name[9:]  # Remove "template_" prefix
             component_file_path = metadata.get('component_file_path')
-            return self._resolve_template_reference(template_path, component_file_path)
+            return self._resolve_template_reference(symbol_name, component_file_path)
             
-        elif symbol_name.startswith("style_"):
+        elif kind == "style":
             # Style file resolution
-            style_path = symbol_name[6:]  # Remove "style_" prefix
             component_file_path = metadata.get('component_file_path')
-            return self._resolve_style_reference(style_path, component_file_path)
-            
-        elif symbol_name.startswith("export_"):
-            # Export resolution - these remain external for now
-            return None
+            return self._resolve_style_reference(symbol_name, component_file_path)
             
-        elif symbol_name.startswith("external_"):
-            # External symbol resolution - these remain external for now
+        elif kind in ("export", "external"):
+            # Export/external symbol resolution - these remain external for now
             return None
         
+        elif kind:
+            # Other kinds are looked up by their kind-qualified name
+            symbol_name = f"{kind}_{symbol_name}"
+        
         # Direct entity name lookup
         if symbol_name in self.symbol_registry:
             return self.symbol_registry[symbol_name].id
@@ -401,9 +621,7 @@ class EntityExtractor:
             Resolved File entity ID or None
         """
         # Skip external npm modules (start with @ or known libraries)
-        if (module_path.startswith('@') or 
-            module_path in ['rxjs', 'lodash', 'moment', 'axios'] or
-            module_path.startswith('node_modules')):
+        if module_path in _EXTERNAL_MODULES or _EXTERNAL_PREFIX_RE.match(module_path):
             return None
         
         # Try direct module lookup
@@ -637,9 +855,27 @@ class EntityExtractor:
         Returns:
             Parser instance or None
         """
-        for parser in self.parsers.values():
+        parser_name = self._get_parser_name_for_file(file_path)
+        return self.parsers[parser_name] if parser_name else None
+    
+    def _get_parser_name_for_file(self, file_path: str) -> Optional[str]:
+        """
+        Get the registry name of the parser for a file.
+        
+        Args:
+            file_path: Path to file
+            
+        Returns:
+            Parser name or None
+        """
+        parser_name = self._file_type_to_parser.get(get_file_type(file_path))
+        if parser_name:
+            return parser_name
+        
+        # Unknown file type: fall back to asking each parser
+        for name, parser in self.parsers.items():
             if parser.can_parse(file_path):
-                return parser
+                return name
         return None
     
     def _get_entity_name_by_id(self, entity_id: str) -> Optional[str]:
@@ -688,199 +924,273 @@ class EntityExtractor:
         """
         Store parse results in database.
         
+        Entities are inserted with one ``UNWIND $rows ... MERGE`` statement
+        per label and property set, and relationships likewise per type, so
+        the number of round-trips scales with labels rather than records.
+        Rows are grouped lazily and flushed one batch at a time.
+        
         Args:
             parse_results: Results to store
         """
         logger.info("Storing extraction results in database...")
         
         try:
-            # Prepare batch queries for entities
-            entity_queries = []
-            relationship_queries = []
+            seen_entity_ids: Set[str] = set()
+            
+            # A single writer keeps the connection used serially and runs
+            # batches in submission order, so every entity is written before
+            # the relationships that reference it
+            with ThreadPoolExecutor(max_workers=1) as writer:
+                entity_count = self._execute_in_batches(
+                    writer,
+                    self._iter_unwind_batches(self._iter_entity_rows(parse_results, seen_entity_ids),
+                                              self._create_entity_unwind_query),
+                    "entity")
+                relationship_count = self._execute_in_batches(
+                    writer,
+                    self._iter_unwind_batches(self._iter_relationship_rows(parse_results),
+                                              self._create_relationship_unwind_query),
+                    "relationship")
+            
+            logger.info(f"Deduplicating entities: {sum(len(r.entities) for r in parse_results)} total -> {len(seen_entity_ids)} unique")
+            logger.info(f"Stored {entity_count} entities and {relationship_count} relationships")
             
-            # Deduplicate entities by ID before creating queries
-            seen_entity_ids = set()
-            unique_entities = []
-            for result in parse_results:
-                for entity in result.entities:
-                    if entity.id not in seen_entity_ids:
-                        seen_entity_ids.add(entity.id)
-                        unique_entities.append(entity)
+        except Exception as e:
+            logger.error(f"Failed to store results in database: {e}")
+    
+    def _iter_entity_rows(self, parse_results: List[ParseResult],
+                          seen_entity_ids: Set[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield insert rows for entities, skipping duplicate IDs.
+        
+        Args:
+            parse_results: Results to store
+            seen_entity_ids: IDs already emitted; updated in place
             
-            logger.info(f"Deduplicating entities: {sum(len(r.entities) for r in parse_results)} total -> {len(unique_entities)} unique")
+        Yields:
+            (node label, property row) tuples
+        """
+        for result in parse_results:
+            for entity in result.entities:
+                if entity.id in seen_entity_ids:
+                    continue
+                seen_entity_ids.add(entity.id)
+                properties = self._entity_properties(entity)
+                if properties:
+                    yield entity.type, properties
+    
+    def _iter_relationship_rows(self, parse_results: List[ParseResult]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield insert rows for resolved relationships.
+        
+        Each row carries the endpoint IDs as ``from_id`` and ``to_id`` next
+        to the relationship properties.
+        
+        Args:
+            parse_results: Results to store
             
-            for entity in unique_entities:
-                query = self._create_entity_insert_query(entity)
-                if query:
-                    entity_queries.append(query)
+        Yields:
+            (relationship type, property row) tuples
+        """
+        for result in parse_results:
+            # Get the parser for this file to access normalization
+            parser = self._get_parser_for_file(result.file_path)
+            for relationship in result.relationships:
+                relationship = self._normalize_relationship(relationship, parser)
+                properties = self._relationship_properties(relationship)
+                if properties is None:
+                    logger.debug(f"No row generated for relationship: {relationship.relationship_type} from {relationship.from_id} to {relationship.to_id}")
+                    continue
+                row = {'from_id': relationship.from_id, 'to_id': relationship.to_id}
+                row.update(properties)
+                yield relationship.relationship_type, row
+    
+    def _iter_unwind_batches(self, rows: Iterable[Tuple[str, Dict[str, Any]]],
+                             build_query: Callable[[str, Tuple[str, ...]], str]
+                             ) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Group rows into ``UNWIND`` batches of the configured size.
+        
+        Rows are grouped by label and property names, so every row of a
+        batch binds the same columns and no column is entirely null.
+        
+        Args:
+            rows: (label, property row) tuples
+            build_query: Builds the UNWIND query for a label and its columns
             
-            # Process relationships separately to maintain parser access
-            for result in parse_results:
-                # Get the parser for this file to access normalization
-                parser = self._get_parser_for_file(result.file_path)
-                
-                # Store relationships
-                for relationship in result.relationships:
-                    # Normalize relationship if parser has the method
-                    if parser and hasattr(parser, '_normalize_relationship_metadata'):
-                        normalized_rel = ParsedRelationship(
-                            from_id=relationship.from_id,
-                            to_id=relationship.to_id,
-                            relationship_type=relationship.relationship_type,
-                            metadata=parser._normalize_relationship_metadata(relationship)
-                        )
-                        query = self._create_relationship_insert_query(normalized_rel)
-                    else:
-                        query = self._create_relationship_insert_query(relationship)
-                    if query:
-                        relationship_queries.append(query)
-                    else:
-                        logger.debug(f"No query generated for relationship: {relationship.relationship_type} from {relationship.from_id[:8]}... to {relationship.to_id[:8]}...")
-            
-            # Execute in batches
-            batch_size = self.config.database.batch_size
-            
-            # Insert entities in batches with retry logic
-            for i in range(0, len(entity_queries), batch_size):
-                batch = entity_queries[i:i + batch_size]
-                if not self.db_service.execute_batch(batch):
-                    logger.error(f"Failed to insert entity batch {i // batch_size + 1}")
-                    # Try individual insertion for failed batch
-                    success_count = 0
-                    for query in batch:
-                        try:
-                            if self.db_service.execute_query(query):
-                                success_count += 1
-                        except Exception as e:
-                            logger.debug(f"Individual entity query failed: {e}")
-                    logger.info(f"Recovered {success_count}/{len(batch)} entities from failed batch")
-            
-            # Insert relationships in batches with retry logic
-            logger.info(f"Inserting {len(relationship_queries)} relationships in batches")
-            for i in range(0, len(relationship_queries), batch_size):
-                batch = relationship_queries[i:i + batch_size]
-                # Log first query for debugging
-                if i == 0 and batch:
-                    logger.debug(f"Sample relationship query: {batch[0][:200]}...")
-                if not self.db_service.execute_batch(batch):
-                    logger.error(f"Failed to insert relationship batch {i // batch_size + 1}")
-                    # Try individual insertion for failed batch
-                    success_count = 0
-                    for query in batch:
-                        try:
-                            if self.db_service.execute_query(query):
-                                success_count += 1
-                        except Exception as e:
-                            logger.debug(f"Individual relationship query failed: {e}")
-                    logger.info(f"Recovered {success_count}/{len(batch)} relationships from failed batch")
-            
-            logger.info(f"Stored {len(entity_queries)} entities and {len(relationship_queries)} relationships")
+        Yields:
+            (query, rows) tuples
+        """
+        batch_size = self.config.database.batch_size
+        groups: Dict[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        
+        for label, row in rows:
+            key = (label, tuple(row))
+            group = groups.setdefault(key, [])
+            group.append(row)
+            if len(group) >= batch_size:
+                yield build_query(*key), group
+                groups[key] = []
+        
+        for key, group in groups.items():
+            if group:
+                yield build_query(*key), group
+    
+    def _execute_in_batches(self, writer: ThreadPoolExecutor,
+                            batches: Iterable[Tuple[str, List[Dict[str, Any]]]], label: str) -> int:
+        """
+        Execute UNWIND batches on the writer thread.
+        
+        The next batch is built while the previous one is being written;
+        at most one batch is in flight at a time.
+        
+        Args:
+            writer: Single-threaded executor that owns database writes
+            batches: (query, rows) tuples
+            label: Kind of record being inserted, used in log messages
             
-        except Exception as e:
-            logger.error(f"Failed to store results in database: {e}")
+        Returns:
+            Number of rows submitted
+        """
+        pending = None
+        row_count = 0
+        batch_number = 0
+        
+        for query, rows in batches:
+            batch_number += 1
+            row_count += len(rows)
+            if pending is not None:
+                pending.result()
+            pending = writer.submit(self._execute_batch, query, rows, batch_number, label)
+        
+        if pending is not None:
+            pending.result()
+        return row_count
+    
+    def _execute_batch(self, query: str, rows: List[Dict[str, Any]], batch_number: int, label: str) -> None:
+        """
+        Execute one UNWIND batch, retrying one row at a time if it fails.
+        
+        A failing row (e.g. a duplicate primary key) aborts the whole
+        statement, so the retry keeps the remaining rows of the batch.
+        
+        Args:
+            query: UNWIND query over ``$rows``
+            rows: Parameter rows for the query
+            batch_number: 1-based batch index, used in log messages
+            label: Kind of record being inserted, used in log messages
+        """
+        if self.db_service.execute_query(query, {'rows': rows}) is not None:
+            return
+        
+        logger.error(f"Failed to insert {label} batch {batch_number}")
+        # Try individual insertion for failed batch
+        success_count = 0
+        for row in rows:
+            try:
+                if self.db_service.execute_query(query, {'rows': [row]}) is not None:
+                    success_count += 1
+            except Exception as e:
+                logger.debug(f"Individual {label} insert failed: {e}")
+        logger.info(f"Recovered {success_count}/{len(rows)} {label} rows from failed batch")
     
-    def _escape_cypher_string(self, value: str) -> str:
+    def _normalize_relationship(self, relationship: ParsedRelationship, parser: Optional[Any]) -> ParsedRelationship:
         """
-        Escape special characters for Cypher queries.
+        Normalize relationship metadata with the parser that produced it.
         
         Args:
-            value: String value to escape
+            relationship: Relationship to store
+            parser: Parser that produced the relationship, if known
             
         Returns:
-            Escaped string safe for Cypher queries
+            Relationship with normalized metadata
         """
-        if not isinstance(value, str):
-            return str(value)
+        # Normalize relationship if parser has the method
+        if parser and hasattr(parser, '_normalize_relationship_metadata'):
+            relationship = ParsedRelationship(
+                from_id=relationship.from_id,
+                to_id=relationship.to_id,
+                relationship_type=relationship.relationship_type,
+                metadata=parser._normalize_relationship_metadata(relationship),
+                unresolved_name=relationship.unresolved_name,
+                unresolved_kind=relationship.unresolved_kind
+            )
+        return relationship
+    
+    def _create_entity_unwind_query(self, label: str, columns: Tuple[str, ...]) -> str:
+        """
+        Create an UNWIND query inserting one node per row.
         
-        # Escape in order: backslashes first, then quotes, then other special chars
-        escaped = (value
-                  .replace('\\', '\\\\')  # Escape backslashes first
-                  .replace('"', '\\"')    # Escape double quotes
-                  .replace("'", "\\'")    # Escape single quotes
-                  .replace('\n', '\\n')   # Escape newlines
-                  .replace('\r', '\\r')   # Escape carriage returns
-                  .replace('\t', '\\t'))  # Escape tabs
+        Nodes are merged on their ID and their properties are always set,
+        so an entity already in the graph is updated to the current parse
+        instead of failing the statement and the transaction it runs in.
         
-        return escaped
+        Args:
+            label: Node table to insert into
+            columns: Property names bound from each row; includes ``id``
+            
+        Returns:
+            Cypher query string
+        """
+        assignments = ', '.join(f'n.{column} = row.{column}' for column in columns if column != 'id')
+        set_clause = f" SET {assignments}" if assignments else ''
+        return f"UNWIND $rows AS row MERGE (n:{label} {{id: row.id}}){set_clause}"
     
-    def _sanitize_external_entity_name(self, name: str, entity_type: str = None) -> str:
+    def _create_relationship_unwind_query(self, relationship_type: str, columns: Tuple[str, ...]) -> str:
         """
-        Sanitize external entity names to prevent collisions.
+        Create an UNWIND query inserting one relationship per row.
         
         Args:
-            name: The entity name to sanitize
-            entity_type: Optional entity type for context
+            relationship_type: Relationship table to insert into
+            columns: Row fields; ``from_id`` and ``to_id`` select the endpoints
             
         Returns:
-            Sanitized name that won't cause ID collisions
-        """
-        if not name:
-            return "unknown"
-        
-        # Handle very long names (like chained D3.js calls)
-        if len(name) > 100:
-            # Create hash suffix to maintain uniqueness
-            import hashlib
-            hash_suffix = hashlib.md5(name.encode()).hexdigest()[:8]
-            # Keep meaningful prefix and add hash
-            truncated = name[:90]
-            # Clean up truncation point
-            if '.' in truncated[-10:]:
-                truncated = truncated[:truncated.rfind('.')]
-            return f"{truncated}...{hash_suffix}"
-        
-        return name
-
-    def _create_entity_insert_query(self, entity: ParsedEntity) -> Optional[str]:
+            Cypher query string
+        """
+        properties = [f'{column}: row.{column}' for column in columns
+                      if column not in ('from_id', 'to_id')]
+        props_str = ' {' + ', '.join(properties) + '}' if properties else ''
+        return (f"UNWIND $rows AS row "
+                f"MATCH (from_node {{id: row.from_id}}), (to_node {{id: row.to_id}}) "
+                f"CREATE (from_node)-[:{relationship_type}{props_str}]->(to_node)")
+    
+    def _entity_properties(self, entity: ParsedEntity) -> Optional[Dict[str, Any]]:
         """
-        Create Cypher query to insert entity.
+        Build the schema properties stored for an entity.
         
         Args:
             entity: Entity to insert
             
         Returns:
-            Cypher query string or None
+            Property dictionary in insertion order, or None
         """
         try:
-            # Escape string values using improved escaping
-            def escape_string(value):
-                if isinstance(value, str):
-                    escaped = self._escape_cypher_string(value)
-                    return f'"{escaped}"'
-                return str(value)
-            
-            # Sanitize external entity names to prevent collisions
-            entity_name = entity.name
-            if entity.type in ['ExternalFunction', 'ExternalProperty', 'ExternalModule', 
-                               'ExternalExport', 'ExternalSymbol', 'ExternalReference']:
-                entity_name = self._sanitize_external_entity_name(entity_name, entity.type)
-            
             # Build property list based on entity type
-            properties = [
-                f'id: {escape_string(entity.id)}',
-                f'name: {escape_string(entity_name)}'
-            ]
+            properties = {
+                'id': entity.id,
+                'name': entity.name
+            }
             
             # Add type-specific properties
             if entity.type == 'File':
-                properties.append(f'path: {escape_string(entity.file_path)}')
+                properties['path'] = entity.file_path
                 # Debug logging for File entities
-                logger.debug(f"Creating File entity query: id={entity.id}, name={entity_name}, path={entity.file_path}")
+                logger.debug(f"Creating File entity row: id={entity.id}, name={entity.name}, path={entity.file_path}")
             else:
                 # Get the file_id from entity metadata
                 file_id = entity.metadata.get('file_id', '')
                 if file_id:
-                    properties.append(f'file_id: {escape_string(file_id)}')
+                    properties['file_id'] = file_id
             
             # Add line information based on entity type
             if entity.type in ['Module', 'Class', 'Function']:
                 if hasattr(entity, 'line_start') and entity.line_start is not None:
-                    properties.append(f'line_start: {entity.line_start}')
+                    properties['line_start'] = entity.line_start
                 if hasattr(entity, 'line_end') and entity.line_end is not None:
-                    properties.append(f'line_end: {entity.line_end}')
+                    properties['line_end'] = entity.line_end
             elif entity.type in ['Import', 'Variable']:
                 if hasattr(entity, 'line_start') and entity.line_start is not None:
-                    properties.append(f'line_number: {entity.line_start}')
+                    properties['line_number'] = entity.line_start
             
             # Add metadata properties that match the schema
             schema_properties = {
@@ -896,72 +1206,35 @@ class EntityExtractor:
             allowed_props = schema_properties.get(entity.type, [])
             for key, value in entity.metadata.items():
                 if value is not None and key in allowed_props:
-                    if isinstance(value, bool):
-                        properties.append(f'{key}: {str(value).lower()}')
-                    elif isinstance(value, (int, float)):
-                        properties.append(f'{key}: {value}')
-                    else:
-                        properties.append(f'{key}: {escape_string(str(value))}')
+                    properties[key] = self._property_value(value)
             
-            props_str = ', '.join(properties)
-            query = f"CREATE (:{entity.type} {{{props_str}}})"
-            
-            return query
+            return properties
             
         except Exception as e:
-            logger.error(f"Failed to create entity query for {entity.name}: {e}")
+            logger.error(f"Failed to build entity properties for {entity.name}: {e}")
             return None
     
-    def _create_relationship_insert_query(self, relationship: ParsedRelationship) -> Optional[str]:
+    def _property_value(self, value: Any) -> Any:
+        """Keep booleans and numbers as is; store everything else as a string."""
+        if isinstance(value, (bool, int, float)):
+            return value
+        return str(value)
+    
+    def _relationship_properties(self, relationship: ParsedRelationship) -> Optional[Dict[str, Any]]:
         """
-        Create Cypher query to insert relationship.
+        Build the properties stored on a relationship.
         
         Args:
             relationship: Relationship to insert
             
         Returns:
-            Cypher query string or None
+            Property dictionary, or None if the relationship is not stored
         """
-        try:
-            # Skip unresolved relationships
-            if (relationship.from_id.startswith("unresolved:") or 
-                relationship.to_id.startswith("unresolved:")):
-                logger.debug(f"Skipping unresolved relationship: {relationship.relationship_type} from {relationship.from_id} to {relationship.to_id}")
-                return None
-            
-            # Escape string values using improved escaping
-            def escape_string(value):
-                if isinstance(value, str):
-                    escaped = self._escape_cypher_string(value)
-                    return f'"{escaped}"'
-                return str(value)
-            
-            # Build relationship properties
-            properties = []
-            for key, value in relationship.metadata.items():
-                if value is not None:
-                    if isinstance(value, bool):
-                        properties.append(f'{key}: {str(value).lower()}')
-                    elif isinstance(value, (int, float)):
-                        properties.append(f'{key}: {value}')
-                    else:
-                        properties.append(f'{key}: {escape_string(str(value))}')
-            
-            props_str = '{' + ', '.join(properties) + '}' if properties else ''
-            
-            # Create relationship query using Kuzu syntax
-            # All our relationship tables are now single-pair, so we can use CREATE
-            # Format the query on a single line to avoid parsing issues
-            from_id_escaped = escape_string(relationship.from_id)
-            to_id_escaped = escape_string(relationship.to_id)
-            
-            if props_str:
-                query = f"MATCH (from_node {{id: {from_id_escaped}}}), (to_node {{id: {to_id_escaped}}}) CREATE (from_node)-[:{relationship.relationship_type} {props_str}]->(to_node)"
-            else:
-                query = f"MATCH (from_node {{id: {from_id_escaped}}}), (to_node {{id: {to_id_escaped}}}) CREATE (from_node)-[:{relationship.relationship_type}]->(to_node)"
-            
-            return query.strip()
-            
-        except Exception as e:
-            logger.error(f"Failed to create relationship query: {e}")
-            return None
\ No newline at end of file
+        # Skip unresolved relationships
+        if not relationship.is_resolved:
+            logger.debug(f"Skipping unresolved relationship: {relationship.relationship_type} "
+                         f"({relationship.unresolved_kind or 'symbol'}: {relationship.unresolved_name})")
+            return None
+        
+        return {key: self._property_value(value)
+                for key, value in relationship.metadata.items() if value is not None}
@@ -2,7 +2,7 @@
 File type detection for CodeBased.
 """
 
-from pathlib import Path
+import os
 from typing import Dict, Optional
 
 # Mapping of file extensions to file types
@@ -20,6 +20,8 @@ FILE_TYPE_PATTERNS: Dict[str, str] = {
     ".component.scss": "angular_style",
     ".component.sass": "angular_style",
 }
+# All pattern suffixes, to rule out every pattern with a single endswith call
+_PATTERN_SUFFIXES = tuple(FILE_TYPE_PATTERNS)
 
 # Basic extension mapping
 FILE_TYPE_MAPPINGS: Dict[str, str] = {
@@ -54,19 +56,23 @@ def get_file_type(file_path: str) -> Optional[str]:
     Returns:
         The file type as a string, or None if the file type is not supported.
     """
-    path = Path(file_path)
-    name_lower = path.name.lower()
+    # Plain string operations: this runs for every file seen during discovery
+    name = os.path.basename(file_path)
+    name_lower = name.lower()
 
     # Check specific patterns first
-    for pattern, ftype in FILE_TYPE_PATTERNS.items():
-        if name_lower.endswith(pattern):
-            return ftype
+    if name_lower.endswith(_PATTERN_SUFFIXES):
+        for pattern, ftype in FILE_TYPE_PATTERNS.items():
+            if name_lower.endswith(pattern):
+                return ftype
 
-    extension = path.suffix.lower()
+    # Same suffix as Path.suffix: none for dotfiles or names ending in a dot
+    dot = name_lower.rfind('.')
+    extension = name_lower[dot:] if 0 < dot < len(name_lower) - 1 else ''
 
     # Handle files with no extension like 'Dockerfile'
-    if not extension and path.name in FILE_TYPE_MAPPINGS:
-        return FILE_TYPE_MAPPINGS[path.name]
+    if not extension and name in FILE_TYPE_MAPPINGS:
+        return FILE_TYPE_MAPPINGS[name]
 
     if extension in FILE_TYPE_MAPPINGS:
         return FILE_TYPE_MAPPINGS[extension]
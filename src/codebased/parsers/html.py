@@ -9,7 +9,7 @@ import re
 from pathlib import Path
 from typing import List, Dict, Any
 
-from .base import BaseParser, ParsedEntity, ParsedRelationship, ParseResult
+from .base import BaseParser, ParsedEntity, ParsedRelationship, ParseResult, hash_content
 
 logger = logging.getLogger(__name__)
 
@@ -35,13 +35,16 @@ class HTMLParser(BaseParser):
         errors = []
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Read, stat and hash the file through a single descriptor
+            with open(file_path, 'rb') as f:
+                file_stats = os.fstat(f.fileno())
+                raw = f.read()
+            content = raw.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
 
-            file_hash = self._calculate_file_hash(file_path)
+            file_hash = hash_content(raw)
             
             # Create File entity with enhanced metadata
-            file_entity = self._create_html_file_entity(file_path, content)
+            file_entity = self._create_html_file_entity(file_path, content, file_stats)
             entities.append(file_entity)
 
             # Extract Angular template features
@@ -56,10 +59,10 @@ class HTMLParser(BaseParser):
         parse_time = time.time() - start_time
         return ParseResult(entities, relationships, file_hash, file_path, errors, parse_time)
 
-    def _create_html_file_entity(self, file_path: str, content: str) -> ParsedEntity:
+    def _create_html_file_entity(self, file_path: str, content: str,
+                                 file_stats: os.stat_result) -> ParsedEntity:
         """Create a File entity for an HTML file with enhanced metadata."""
-        lines = content.splitlines()
-        file_stats = os.stat(file_path)
+        line_count = content.count('\n') + (1 if content and not content.endswith('\n') else 0)
         path_obj = Path(file_path)
         
         # Detect if this is an Angular template
@@ -69,7 +72,7 @@ class HTMLParser(BaseParser):
             'full_path': file_path,
             'extension': path_obj.suffix,
             'size': file_stats.st_size,
-            'lines_of_code': len(lines),
+            'lines_of_code': line_count,
             'language': 'html',
             'framework': 'angular' if is_angular_template else None,
             'is_template': True,
@@ -82,29 +85,31 @@ class HTMLParser(BaseParser):
 
         return ParsedEntity(
             id=self._generate_entity_id(path_obj.name, file_path, 1, 
-                                       entity_type="File", line_end=len(lines)),
+                                       entity_type="File", line_end=line_count),
             name=path_obj.name,
             type="File",
             file_path=file_path,
             line_start=1,
-            line_end=len(lines),
+            line_end=line_count,
             metadata=metadata
         )
 
     def _detect_angular_template(self, content: str) -> bool:
         """Detect if HTML content contains Angular template syntax."""
+        # Each pattern is paired with a literal every match must contain, so
+        # plain HTML is ruled out by substring checks before any regex runs.
         angular_patterns = [
-            r'\*ng[A-Z][a-zA-Z]*',  # *ngIf, *ngFor, etc.
-            r'\[.*?\]',             # Property binding [property]
-            r'\(.*?\)',             # Event binding (event)
-            r'\{\{.*?\}\}',         # Interpolation {{value}}
-            r'#[a-zA-Z][a-zA-Z0-9]*',  # Template reference variables #var
-            r'mat-[a-z-]+',         # Angular Material components
-            r'app-[a-z-]+',         # Custom Angular components
+            ('*ng', r'\*ng[A-Z][a-zA-Z]*'),   # *ngIf, *ngFor, etc.
+            ('[', r'\[.*?\]'),               # Property binding [property]
+            ('(', r'\(.*?\)'),               # Event binding (event)
+            ('{{', r'\{\{.*?\}\}'),          # Interpolation {{value}}
+            ('#', r'#[a-zA-Z][a-zA-Z0-9]*'),  # Template reference variables #var
+            ('mat-', r'mat-[a-z-]+'),         # Angular Material components
+            ('app-', r'app-[a-z-]+'),         # Custom Angular components
         ]
         
-        for pattern in angular_patterns:
-            if re.search(pattern, content):
+        for marker, pattern in angular_patterns:
+            if marker in content and re.search(pattern, content):
                 return True
         return False
 
@@ -119,15 +124,15 @@ class HTMLParser(BaseParser):
         metadata['angular_directives'] = list(directives)
         
         # Count property bindings
-        property_bindings = len(re.findall(r'\[.*?\]', content))
+        property_bindings = self._count_matches(r'\[.*?\]', content)
         metadata['property_bindings'] = property_bindings
         
         # Count event bindings
-        event_bindings = len(re.findall(r'\(.*?\)', content))
+        event_bindings = self._count_matches(r'\(.*?\)', content)
         metadata['event_bindings'] = event_bindings
         
         # Count interpolations
-        interpolations = len(re.findall(r'\{\{.*?\}\}', content))
+        interpolations = self._count_matches(r'\{\{.*?\}\}', content)
         metadata['interpolations'] = interpolations
         
         # Extract custom component usage
@@ -148,18 +153,23 @@ class HTMLParser(BaseParser):
                                 relationships: List[ParsedRelationship]) -> None:
         """Extract Angular template features and create relationships."""
         
+        if '<app-' not in content:
+            return
+
         # Extract custom component dependencies
         custom_components = re.findall(r'<(app-[a-z-]+)', content)
         for component_tag in set(custom_components):
             # Create relationship to potential component
             relationships.append(ParsedRelationship(
                 from_id=file_entity.id,
-                to_id=f"unresolved:angular_component_{component_tag}",
+                to_id=None,
                 relationship_type="USES_COMPONENT",
                 metadata={
                     'component_tag': component_tag,
                     'usage_type': 'template_reference'
-                }
+                },
+                unresolved_name=component_tag,
+                unresolved_kind="angular_component"
             ))
         
         # Note: Additional relationships like template variable usage,
@@ -3,20 +3,30 @@ Incremental update system for CodeBased using file hashing.
 """
 
 import os
+import json
 import time
-import hashlib
 import logging
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
 
 from .extractor import EntityExtractor
-from .base import ParseResult
-from .registry import get_parser
+from .base import ParseResult, BLAKE3_AVAILABLE, BLAKE3_HASH_PREFIX, hash_file
 from ..database.service import DatabaseService
 from ..config import CodeBasedConfig
 
+if BLAKE3_AVAILABLE:
+    import blake3
+
 logger = logging.getLogger(__name__)
 
+# Local store of file hashes, kept next to the graph database
+HASH_CACHE_FILENAME = "file_hashes.json"
+HASH_CACHE_VERSION = 1
+
+# Files above this size are hashed with BLAKE3's multi-threaded mmap path
+LARGE_FILE_HASH_THRESHOLD = 1024 * 1024
+
 
 class IncrementalUpdater:
     """Manages incremental updates of the code graph."""
@@ -35,6 +45,19 @@ class IncrementalUpdater:
         
         # Hash storage for change detection
         self.file_hashes: Dict[str, str] = {}
+        # (st_mtime_ns, st_size) recorded alongside each hash; a file whose
+        # stat signature is unchanged is not re-hashed
+        self.file_stats: Dict[str, Tuple[int, int]] = {}
+        # Stat signatures and parsers observed by the running _detect_changes walk
+        self._detected_stats: Dict[str, Tuple[int, int]] = {}
+        self._detected_parsers: Dict[str, Any] = {}
+        # Files whose hash or stat signature still has to be written back
+        self._dirty_files: Set[str] = set()
+        # Set when files were dropped, so the local hash cache is rewritten
+        self._hash_cache_dirty = False
+        # False until hashes were read from or written to the hash cache; the
+        # graph may then already hold files that look new
+        self._hash_cache_loaded = False
         self._load_file_hashes()
     
     def update_graph(self, directory_path: str = None) -> Dict[str, Any]:
@@ -74,11 +97,17 @@ class IncrementalUpdater:
             changes = self._detect_changes(directory_path)
             results.update(changes)
             
-            # Process changes
-            if changes['added'] or changes['modified'] or changes['removed']:
-                self._process_changes(changes, results)
-            else:
+            if not (changes['added'] or changes['modified'] or changes['removed']):
                 logger.info("No changes detected - skipping update")
+                results['files_unchanged'] = changes['unchanged']
+                # Only touched files have new stat signatures to persist
+                if self._dirty_files:
+                    self._save_file_hashes()
+                results['update_time'] = time.time() - start_time
+                return results
+            
+            # Process changes
+            self._process_changes(changes, results)
             
             # Update file hashes
             self._save_file_hashes()
@@ -89,6 +118,9 @@ class IncrementalUpdater:
         except Exception as e:
             logger.error(f"Incremental update failed: {e}")
             results['errors'].append(str(e))
+        finally:
+            # The walk is only needed while this update records stat signatures
+            self._forget_detected_walk()
         
         return results
     
@@ -117,6 +149,8 @@ class IncrementalUpdater:
             
             # Clear file hashes
             self.file_hashes.clear()
+            self.file_stats.clear()
+            self._hash_cache_dirty = True
             
             # Perform full extraction
             extraction_results = self.extractor.extract_from_directory(directory_path)
@@ -125,6 +159,10 @@ class IncrementalUpdater:
             for result in extraction_results['parse_results']:
                 if result.file_hash:
                     self.file_hashes[result.file_path] = result.file_hash
+                    stat_signature = self._stat_signature(result.file_path)
+                    if stat_signature:
+                        self.file_stats[result.file_path] = stat_signature
+                    self._dirty_files.add(result.file_path)
             
             # Save updated hashes
             self._save_file_hashes()
@@ -172,44 +210,59 @@ class IncrementalUpdater:
             'added': [],
             'modified': [],
             'removed': [],
-            'unchanged': [],
+            'unchanged': 0,  # only ever counted, so not listed
             'total_files': 0
         }
         
         directory_path = Path(directory_path)
-        current_files = set()
         
-        # Find all current parseable files
-        for parser in self.extractor.parsers.values():
-            for file_path in parser._find_parseable_files(directory_path):
-                file_path_str = str(file_path)
-                current_files.add(file_path_str)
-                
-                # Calculate current file hash
-                current_hash = self._calculate_file_hash(file_path_str)
-                
-                if file_path_str not in self.file_hashes:
-                    # New file
-                    changes['added'].append(file_path_str)
-                elif self.file_hashes[file_path_str] != current_hash:
-                    # Modified file
-                    changes['modified'].append(file_path_str)
-                else:
-                    # Unchanged file
-                    changes['unchanged'].append(file_path_str)
-        
-        # Find removed files
-        for stored_file in self.file_hashes:
-            if stored_file not in current_files:
-                changes['removed'].append(stored_file)
+        # Union of all parseable files, each seen once with the stat taken
+        # by the walk; parsers never re-list or re-hash the same file
+        self._detected_stats = {}
+        self._detected_parsers = {}
+        for file_path, stat, parser in self.extractor.iter_parseable_entries(directory_path):
+            self._detected_stats[file_path] = (stat.st_mtime_ns, stat.st_size)
+            self._detected_parsers[file_path] = parser
+        current_files = self._detected_stats
+        
+        # Classify by set algebra on the path key views: new and removed files
+        # need no hashing at all, only files known on both sides are compared
+        current_paths = current_files.keys()
+        stored_paths = self.file_hashes.keys()
+        changes['added'] = sorted(current_paths - stored_paths)
+        changes['removed'] = sorted(stored_paths - current_paths)
+        common_paths = current_paths & stored_paths
+        
+        # Hash known files whose mtime or size changed; hashing releases the
+        # GIL, so the reads and digests overlap across threads
+        files_to_hash = sorted(
+            file_path for file_path in common_paths
+            if self.file_stats.get(file_path) != current_files[file_path]
+        )
+        current_hashes = {}
+        if files_to_hash:
+            max_workers = min(32, os.cpu_count() or 1, len(files_to_hash))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                current_hashes = dict(zip(files_to_hash,
+                                          executor.map(self._calculate_file_hash, files_to_hash)))
         
+        for file_path_str, current_hash in current_hashes.items():
+            if self.file_hashes[file_path_str] != current_hash:
+                # Modified file
+                changes['modified'].append(file_path_str)
+            else:
+                # Touched but unchanged file: remember the new signature
+                self.file_stats[file_path_str] = current_files[file_path_str]
+                self._dirty_files.add(file_path_str)
+        
+        changes['unchanged'] = len(common_paths) - len(changes['modified'])
         changes['total_files'] = len(current_files)
         
         logger.info(f"Change detection completed: "
                    f"{len(changes['added'])} added, "
                    f"{len(changes['modified'])} modified, "
                    f"{len(changes['removed'])} removed, "
-                   f"{len(changes['unchanged'])} unchanged")
+                   f"{changes['unchanged']} unchanged")
         
         return changes
     
@@ -217,62 +270,105 @@ class IncrementalUpdater:
         """
         Process detected changes and update the graph.
         
+        Files are parsed first; the graph is then updated for the whole
+        delta inside one database transaction.
+        
         Args:
             changes: Change information from detection
             results: Results dictionary to update
         """
-        # Remove entities from removed files
-        if changes['removed']:
-            logger.info(f"Processing {len(changes['removed'])} removed files...")
-            self._remove_files_from_graph(changes['removed'], results)
-        
-        # Process added and modified files
+        added_files = set(changes['added'])
         files_to_parse = changes['added'] + changes['modified']
+        stale_files = changes['removed'] + changes['modified']
+        if not self._hash_cache_loaded:
+            # Without recorded hashes every file looks new, but an earlier run
+            # may have stored it; drop its old subgraph like a modified file's
+            stale_files += changes['added']
+        
+        # Parse added and modified files before opening the write transaction
+        parse_results = []
         if files_to_parse:
             logger.info(f"Processing {len(files_to_parse)} added/modified files...")
             
-            # Remove old entities from modified files
-            if changes['modified']:
-                self._remove_files_from_graph(changes['modified'], results)
-            
-            # Parse and add new entities
-            parse_results = []
-            for file_path in files_to_parse:
-                parser = self.extractor._get_parser_for_file(file_path)
-                if parser:
-                    try:
-                        result = parser.parse_file(file_path)
-                        parse_results.append(result)
-                        
-                        # Update file hash
-                        if result.file_hash:
-                            self.file_hashes[file_path] = result.file_hash
-                            
-                    except Exception as e:
-                        logger.error(f"Failed to parse {file_path}: {e}")
-                        results['errors'].append(f"Parse error in {file_path}: {e}")
-            
-            # Resolve relationships using two-pass system
-            if parse_results:
-                resolved_results = self.extractor._resolve_relationships(parse_results)
-                self.extractor._store_results(resolved_results)
-                
-                # Update statistics
-                for result in resolved_results:
-                    if result.file_path in changes['added']:
-                        results['entities_added'] += len(result.entities)
-                        results['relationships_added'] += len(result.relationships)
-                    else:  # Modified
-                        results['entities_updated'] += len(result.entities)
-                        results['relationships_updated'] += len(result.relationships)
+            # Parse in worker processes, reusing the parsers picked during the walk
+            parse_results = self.extractor._extract_entities_parallel(files_to_parse,
+                                                                      self._detected_parsers)
+            for result in parse_results:
+                for error in result.errors:
+                    results['errors'].append(f"Parse error in {result.file_path}: {error}")
+        
+        try:
+            # Deletes and inserts share one commit instead of one per statement
+            with self.db_service.transaction():
+                delta = self._apply_changes(stale_files, parse_results, added_files)
+        except Exception as e:
+            logger.warning(f"Transactional update failed ({e}); applying changes query by query")
+            delta = self._apply_changes(stale_files, parse_results, added_files)
+        
+        for key, value in delta.items():
+            results[key] += value
+        
+        # Record hashes only once the new subgraph has been written
+        for result in parse_results:
+            if result.file_hash:
+                file_path = result.file_path
+                self.file_hashes[file_path] = result.file_hash
+                if file_path in self._detected_stats:
+                    self.file_stats[file_path] = self._detected_stats[file_path]
+                self._dirty_files.add(file_path)
         
         # Update counts
         results['files_added'] = len(changes['added'])
         results['files_modified'] = len(changes['modified'])
         results['files_removed'] = len(changes['removed'])
-        results['files_unchanged'] = len(changes['unchanged'])
+        results['files_unchanged'] = changes['unchanged']
         results['total_files'] = changes['total_files']
     
+    def _apply_changes(self, stale_files: List[str], parse_results: List[ParseResult],
+                       added_files: Set[str]) -> Dict[str, Any]:
+        """
+        Replace the subgraph of stale files and store the parsed delta.
+        
+        Args:
+            stale_files: Removed and modified files whose nodes are dropped
+            parse_results: Parse results of added and modified files
+            added_files: Paths of newly added files
+            
+        Returns:
+            Entity/relationship counters and errors for the update results
+        """
+        delta = {
+            'entities_added': 0,
+            'entities_updated': 0,
+            'entities_removed': 0,
+            'relationships_added': 0,
+            'relationships_updated': 0,
+            'relationships_removed': 0,
+            'errors': []
+        }
+        
+        # Drop the stale subgraph of removed and modified files as one delta
+        if stale_files:
+            logger.info(f"Removing {len(stale_files)} removed/modified files from the graph...")
+            self._remove_files_from_graph(stale_files, delta)
+        
+        # Resolve and store the whole delta in one pass
+        if parse_results:
+            resolved_results = self.extractor._resolve_relationships_delta(
+                parse_results, set(stale_files) | added_files)
+            self.extractor._store_results(resolved_results)
+            
+            # Update statistics
+            for result in resolved_results:
+                if result.file_path in added_files:
+                    delta['entities_added'] += len(result.entities)
+                    delta['relationships_added'] += len(result.relationships)
+                else:  # Modified
+                    delta['entities_updated'] += len(result.entities)
+                    delta['relationships_updated'] += len(result.relationships)
+        
+        return delta
+    
     def _remove_files_from_graph(self, file_paths: List[str], results: Dict[str, Any]) -> None:
         """
         Remove entities and relationships for given files from the graph.
@@ -281,100 +377,161 @@ class IncrementalUpdater:
             file_paths: List of file paths to remove
             results: Results dictionary to update
         """
-        for file_path in file_paths:
-            try:
-                # Get entities to remove
-                entities_query = f"""
-                MATCH (n {{file_path: "{file_path}"}})
-                RETURN n.id AS id, 'Entity' AS type
+        if not file_paths:
+            return
+        
+        try:
+            # Entities are tied to their file through file_id = File.id
+            file_rows = self.db_service.execute_query(
+                "MATCH (f:File) WHERE f.path IN $paths RETURN f.id AS id",
+                {'paths': file_paths}
+            )
+            if file_rows is None:
+                raise RuntimeError("file lookup query failed")
+            file_ids = [row['id'] for row in file_rows]
+            
+            if file_ids:
+                # Count what is about to go, then drop the File nodes and their
+                # entities together with all their relationships in one statement
+                count_query = """
+                MATCH (n) WHERE n.id IN $file_ids OR n.file_id IN $file_ids
+                OPTIONAL MATCH (n)-[r]-()
+                RETURN count(DISTINCT n.id) AS entities, count(DISTINCT id(r)) AS relationships
                 """
+                counts = self.db_service.execute_query(count_query, {'file_ids': file_ids})
                 
-                entities_result = self.db_service.execute_query(entities_query)
-                if entities_result:
-                    entity_ids = [entity['id'] for entity in entities_result]
-                    
-                    # Remove relationships first
-                    if entity_ids:
-                        for entity_id in entity_ids:
-                            rel_query = f"""
-                            MATCH (n {{id: "{entity_id}"}})-[r]-()
-                            DELETE r
-                            """
-                            self.db_service.execute_query(rel_query)
-                            results['relationships_removed'] += 1
-                    
-                    # Remove entities
-                    for entity_id in entity_ids:
-                        entity_query = f"""
-                        MATCH (n {{id: "{entity_id}"}})
-                        DELETE n
-                        """
-                        self.db_service.execute_query(entity_query)
-                        results['entities_removed'] += 1
+                delete_query = "MATCH (n) WHERE n.id IN $file_ids OR n.file_id IN $file_ids DETACH DELETE n"
+                if self.db_service.execute_query(delete_query, {'file_ids': file_ids}) is None:
+                    raise RuntimeError("delete query failed")
                 
-                # Remove from file hashes
-                if file_path in self.file_hashes:
-                    del self.file_hashes[file_path]
+                if counts:
+                    results['entities_removed'] += counts[0].get('entities', 0)
+                    results['relationships_removed'] += counts[0].get('relationships', 0)
+            
+            # Remove from file hashes
+            for file_path in file_paths:
+                self.file_hashes.pop(file_path, None)
+                self.file_stats.pop(file_path, None)
+                self._dirty_files.discard(file_path)
+            self._hash_cache_dirty = True
                 
-            except Exception as e:
-                logger.error(f"Failed to remove {file_path} from graph: {e}")
-                results['errors'].append(f"Removal error for {file_path}: {e}")
+        except Exception as e:
+            logger.error(f"Failed to remove {len(file_paths)} files from graph: {e}")
+            results['errors'].append(f"Removal error for {', '.join(file_paths)}: {e}")
     
     def _calculate_file_hash(self, file_path: str) -> str:
         """
-        Calculate SHA-256 hash of file content.
+        Calculate the content hash of a file.
+        
+        Matches the hashes parsers report in ``ParseResult.file_hash``.
+        Large files are hashed from a memory map on all cores when BLAKE3
+        is available.
         
         Args:
             file_path: Path to file
             
         Returns:
-            Hexadecimal hash string
+            Hash string
         """
         try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
-            return hashlib.sha256(content).hexdigest()
+            if BLAKE3_AVAILABLE and os.path.getsize(file_path) > LARGE_FILE_HASH_THRESHOLD:
+                hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+                hasher.update_mmap(file_path)
+                return BLAKE3_HASH_PREFIX + hasher.hexdigest()
+            return hash_file(file_path)
         except Exception as e:
             logger.error(f"Failed to calculate hash for {file_path}: {e}")
             return ""
     
+    def _stat_signature(self, file_path: str) -> Optional[Tuple[int, int]]:
+        """
+        Get the (mtime in nanoseconds, size) signature of a file.
+        
+        Args:
+            file_path: Path to file
+            
+        Returns:
+            Stat signature, or None if the file cannot be stat'ed
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            logger.debug(f"Failed to stat {file_path}: {e}")
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    @property
+    def _hash_cache_path(self) -> Path:
+        """Local file holding hashes and stat signatures, next to the database."""
+        return Path(self.config.database.path).parent / HASH_CACHE_FILENAME
+    
     def _load_file_hashes(self) -> None:
-        """Load file hashes from database."""
+        """
+        Load file hashes and stat signatures from the local hash cache.
+        
+        The cache is the only store of hashes. When it is missing or
+        unreadable, every file is parsed again on the next update.
+        """
+        self._hash_cache_loaded = self._load_hash_cache()
+    
+    def _load_hash_cache(self) -> bool:
+        """
+        Load hashes and stat signatures from the local hash cache.
+        
+        Returns:
+            bool: True if the cache was read successfully
+        """
+        cache_path = self._hash_cache_path
         try:
-            query = "MATCH (f:File) RETURN f.path AS path, f.hash AS hash"
-            result = self.db_service.execute_query(query)
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != HASH_CACHE_VERSION:
+                return False
             
-            if result:
-                # Handle both dictionary and list-like result formats
-                self.file_hashes = {}
-                for row in result:
-                    if isinstance(row, dict):
-                        path = row.get('path')
-                        hash_val = row.get('hash')
-                    else:
-                        # Assume list-like access [path, hash]
-                        try:
-                            path = row[0] if len(row) > 0 else None
-                            hash_val = row[1] if len(row) > 1 else None
-                        except (IndexError, TypeError):
-                            continue
-                    
-                    if path and hash_val:
-                        self.file_hashes[path] = hash_val
-                        
-                logger.debug(f"Loaded {len(self.file_hashes)} file hashes from database")
-            else:
-                logger.debug("No file hashes found in database")
-                
+            file_hashes = {}
+            file_stats = {}
+            for path, (mtime_ns, size, hash_val) in data['files'].items():
+                file_hashes[path] = hash_val
+                if mtime_ns is not None and size is not None:
+                    file_stats[path] = (mtime_ns, size)
+        except FileNotFoundError:
+            return False
         except Exception as e:
-            logger.error(f"Failed to load file hashes: {e}")
-            self.file_hashes = {}
+            logger.warning(f"Ignoring unreadable hash cache {cache_path}: {e}")
+            return False
+        
+        self.file_hashes = file_hashes
+        self.file_stats = file_stats
+        logger.debug(f"Loaded {len(self.file_hashes)} file hashes from {cache_path}")
+        return True
+    
+    def _write_hash_cache(self) -> None:
+        """Atomically rewrite the local hash cache from the in-memory state."""
+        cache_path = self._hash_cache_path
+        files = {
+            path: [*self.file_stats.get(path, (None, None)), hash_val]
+            for path, hash_val in self.file_hashes.items()
+        }
+        
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': HASH_CACHE_VERSION, 'files': files}, f, separators=(',', ':'))
+        os.replace(tmp_path, cache_path)
     
     def _save_file_hashes(self) -> None:
-        """Save file hashes to database."""
+        """
+        Persist hashes and stat signatures of files hashed during this run.
+        
+        Rewrites the local hash cache when any file was hashed or dropped.
+        """
         try:
-            # File entities should already be created with hashes
-            # This is mainly for backup/verification
+            if self._dirty_files or self._hash_cache_dirty:
+                self._write_hash_cache()
+                self._hash_cache_dirty = False
+                self._hash_cache_loaded = True
+            
+            self._dirty_files.clear()
             logger.debug(f"File hashes tracked for {len(self.file_hashes)} files")
             
         except Exception as e:
@@ -419,6 +576,11 @@ class IncrementalUpdater:
                 'tracked_files': 0
             }
     
+    def _forget_detected_walk(self) -> None:
+        """Drop the stats and parsers recorded by the last _detect_changes run."""
+        self._detected_stats = {}
+        self._detected_parsers = {}
+    
     def cleanup_orphaned_entities(self) -> Dict[str, int]:
         """
         Remove entities that reference non-existent files.
@@ -430,46 +592,41 @@ class IncrementalUpdater:
         cleanup_stats = {'entities_removed': 0, 'relationships_removed': 0}
         
         try:
-            # Find entities with file paths that no longer exist
-            query = """
-            MATCH (n)
-            WHERE exists(n.file_path) AND n.file_path IS NOT NULL
-            RETURN DISTINCT n.file_path AS file_path
-            """
+            # Find the files the graph knows about; entities hang off them by file_id
+            query = "MATCH (f:File) RETURN f.path AS file_path"
             
             result = self.db_service.execute_query(query)
             if result:
-                existing_files = set()
-                for parser in self.extractor.parsers.values():
-                    directory_path = Path(self.config.project_root)
-                    for file_path in parser._find_parseable_files(directory_path):
-                        existing_files.add(str(file_path))
+                existing_files = {file_path for file_path, _, _ in
+                                  self.extractor.iter_parseable_entries(Path(self.config.project_root))}
                 
-                orphaned_files = []
-                for row in result:
-                    file_path = row['file_path']
-                    if file_path not in existing_files and not Path(file_path).exists():
-                        orphaned_files.append(file_path)
+                # The walk is authoritative, as in _detect_changes: a file it
+                # does not list is orphaned, no per-file stat needed
+                orphaned_files = sorted({row['file_path'] for row in result} - existing_files)
                 
-                # Remove orphaned entities
+                # Remove orphaned files and their entities in a single statement
                 if orphaned_files:
                     logger.info(f"Found {len(orphaned_files)} orphaned files")
+                    remove_query = """
+                    MATCH (f:File) WHERE f.path IN $paths
+                    WITH collect(f.id) AS file_ids
+                    MATCH (n) WHERE n.id IN file_ids OR n.file_id IN file_ids
+                    DETACH DELETE n
+                    RETURN count(n) AS removed
+                    """
+                    
+                    removed = self.db_service.execute_query(remove_query, {'paths': orphaned_files})
+                    if removed is None:
+                        raise RuntimeError("orphan delete query failed")
+                    if removed:
+                        cleanup_stats['entities_removed'] += removed[0].get('removed', 0)
+                    
+                    # Remove from file hashes
                     for file_path in orphaned_files:
-                        # Remove entities and relationships for this file
-                        remove_query = f"""
-                        MATCH (n {{file_path: "{file_path}"}})
-                        DETACH DELETE n
-                        """
-                        
-                        entities_before = self.db_service.get_stats()['nodes']
-                        self.db_service.execute_query(remove_query)
-                        entities_after = self.db_service.get_stats()['nodes']
-                        
-                        cleanup_stats['entities_removed'] += entities_before - entities_after
-                        
-                        # Remove from file hashes
-                        if file_path in self.file_hashes:
-                            del self.file_hashes[file_path]
+                        self.file_hashes.pop(file_path, None)
+                        self.file_stats.pop(file_path, None)
+                        self._dirty_files.discard(file_path)
+                    self._hash_cache_dirty = True
                 
                 logger.info(f"Cleanup completed: removed {cleanup_stats['entities_removed']} orphaned entities")
             
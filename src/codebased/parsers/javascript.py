@@ -3,10 +3,16 @@ JavaScript parser for CodeBased using tree-sitter.
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+import time
+import re
+import sys
+import zlib
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
-from .base import TreeSitterParser, ParsedEntity, ParsedRelationship, ParseResult
+from .base import TreeSitterParser, ParsedEntity, ParsedRelationship
 try:
     from tree_sitter import Node
 except ImportError:
@@ -14,6 +20,32 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Distinct decorator and parameter texts remembered per parser process
+METADATA_CACHE_SIZE = 4096
+
+# Angular decorator configuration patterns
+_RE_SELECTOR = re.compile(r'selector\s*:\s*[\'"]([^\'"]+)[\'"]')
+_RE_TEMPLATE_URL = re.compile(r'templateUrl\s*:\s*[\'"]([^\'"]+)[\'"]')
+_RE_STYLE_URLS = re.compile(r'styleUrls\s*:\s*\[(.*?)\]', re.DOTALL)
+_RE_PROVIDED_IN = re.compile(r'providedIn\s*:\s*[\'"]([^\'"]+)[\'"]')
+_RE_QUOTED = re.compile(r'[\'"]([^\'"]+)[\'"]')
+# @NgModule properties and the metadata flags they set
+_NGMODULE_PROPERTIES = (
+    ('declarations', 'hasDeclarations'),
+    ('imports', 'hasImports'),
+    ('providers', 'hasProviders'),
+    ('exports', 'hasExports'),
+)
+# All @Component properties in one alternation, named by the matched property
+_RE_COMPONENT_CONFIG = re.compile(
+    r'selector\s*:\s*[\'"](?P<selector>[^\'"]+)[\'"]'
+    r'|templateUrl\s*:\s*[\'"](?P<templateUrl>[^\'"]+)[\'"]'
+    r'|template\s*:\s*[\'"`](?P<template>[^\'"`]*)[\'"`]'
+    r'|styleUrls\s*:\s*\[(?P<styleUrls>.*?)\]'
+    r'|styles\s*:\s*\[(?P<styles>.*?)\]',
+    re.DOTALL
+)
+
 
 class JavaScriptParser(TreeSitterParser):
     """JavaScript parser using tree-sitter."""
@@ -26,14 +58,12 @@ class JavaScriptParser(TreeSitterParser):
         'class_declaration': 'Class',
         'function_declaration': 'Function',
         'function': 'Function',
-        'arrow_function': 'Function',
         'method_definition': 'Method',
         'variable_declaration': 'Variable',
         'lexical_declaration': 'Variable',  # let/const declarations
         'import_statement': 'Import',
         'export_statement': 'Export',
         'generator_function_declaration': 'Function',
-        'async_function_declaration': 'Function',
         'object_pattern': 'ObjectPattern',
         'array_pattern': 'ArrayPattern',
         'decorator': 'Decorator',
@@ -56,6 +86,73 @@ class JavaScriptParser(TreeSitterParser):
         'Output': 'AngularOutput'
     }
 
+    # Node types that produce relationships, mapped to their extractor method
+    RELATIONSHIP_EXTRACTORS = {
+        'class_declaration': '_extract_class_relationships',
+        'decorator': '_extract_angular_decorator_relationships',
+        'import_statement': '_extract_import_export_relationships',
+        'export_statement': '_extract_import_export_relationships',
+        'call_expression': '_extract_function_call_relationships',
+        'member_expression': '_extract_property_access_relationships'
+    }
+
+    # Node types of identifiers naming a declaration
+    NAME_NODE_TYPES = frozenset({'identifier', 'property_identifier'})
+
+    # Node types the tree walk has to look at; everything else is skipped
+    # after a single set lookup. Anonymous tokens are skipped as well: the
+    # 'function' keyword shares its type name with function expressions.
+    WALKED_NODE_TYPES = frozenset(ENTITY_NODE_TYPES) | frozenset(RELATIONSHIP_EXTRACTORS)
+
+    # Unresolved names longer than this are truncated and given a hash suffix
+    MAX_EXTERNAL_NAME_LENGTH = 100
+
+    def __init__(self, config: Dict[str, Any] = None):
+        """Initialize JavaScript parser."""
+        super().__init__(config)
+        # Class entities of the last entity list, ordered by start line
+        self._class_index_entities: Optional[List[ParsedEntity]] = None
+        self._class_index: Tuple[List[int], List[ParsedEntity]] = ([], [])
+
+    def _parse_tree(self, root_node: Node, source_code: str,
+                    file_path: str) -> Tuple[List[ParsedEntity], List[ParsedRelationship]]:
+        """
+        Extract entities and relationships in a single walk of the tree.
+        
+        Relationship nodes are collected during the entity walk and handled
+        once all entities are known, since relationships may point at
+        entities declared later in the file. Over-long unresolved names are
+        shortened here, so results served from the parse cache carry the
+        same names as fresh ones.
+        """
+        entities = []
+        by_id: Dict[str, ParsedEntity] = {}
+        by_name: Dict[str, List[ParsedEntity]] = {}
+        relationship_nodes = []
+        
+        def add_entity(entity: ParsedEntity) -> None:
+            entities.append(entity)
+            by_id[entity.id] = entity
+            by_name.setdefault(entity.name, []).append(entity)
+        
+        add_entity(self._create_file_entity(file_path, source_code))
+        walked_types = self.WALKED_NODE_TYPES
+        for node in self._walk(root_node):
+            node_type = node.type
+            if node_type not in walked_types or not node.is_named:
+                continue
+            if node_type in self.ENTITY_NODE_TYPES:
+                entity = self._create_entity_from_node(node, source_code, file_path)
+                if entity:
+                    add_entity(entity)
+            if node_type in self.RELATIONSHIP_EXTRACTORS:
+                relationship_nodes.append(node)
+        
+        relationships = self._extract_relationships_from_nodes(relationship_nodes, source_code,
+                                                               entities, file_path, by_id, by_name)
+        self._sanitize_unresolved_names(relationships)
+        return entities, relationships
+
     def _extract_entities_from_node(self, node: Node, source_code: str, file_path: str) -> List[ParsedEntity]:
         """Extract JavaScript entities from tree-sitter AST."""
         entities = []
@@ -63,156 +160,78 @@ class JavaScriptParser(TreeSitterParser):
         # Add file entity
         entities.append(self._create_file_entity(file_path, source_code))
         
-        # Traverse tree and extract entities
-        self._traverse_for_entities(node, source_code, file_path, entities)
+        # Walk tree and extract entities
+        for child in self._walk(node):
+            if child.type in self.ENTITY_NODE_TYPES and child.is_named:
+                entity = self._create_entity_from_node(child, source_code, file_path)
+                if entity:
+                    entities.append(entity)
         
         return entities
 
     def _extract_relationships_from_node(self, node: Node, source_code: str, 
                                        entities: List[ParsedEntity], file_path: str) -> List[ParsedRelationship]:
         """Extract JavaScript relationships from tree-sitter AST."""
-        relationships = []
-        
-        # Create entity lookup for relationships
-        entity_lookup = {entity.name: entity for entity in entities}
-        
-        # Traverse tree and extract relationships
-        self._traverse_for_relationships(node, source_code, file_path, entities, relationships, entity_lookup)
-        
-        return relationships
+        relationship_nodes = [child for child in self._walk(node)
+                              if child.type in self.RELATIONSHIP_EXTRACTORS]
+        return self._extract_relationships_from_nodes(relationship_nodes, source_code, entities, file_path)
     
-    def _normalize_relationship_metadata(self, relationship: ParsedRelationship) -> Dict[str, Any]:
+    def _extract_relationships_from_nodes(self, nodes: List[Node], source_code: str,
+                                          entities: List[ParsedEntity], file_path: str,
+                                          by_id: Optional[Dict[str, ParsedEntity]] = None,
+                                          by_name: Optional[Dict[str, List[ParsedEntity]]] = None
+                                          ) -> List[ParsedRelationship]:
         """
-        Normalize JavaScript relationship metadata to match database schema.
+        Extract relationships from nodes in document order, dispatching on node type.
         
-        Args:
-            relationship: Relationship with metadata to normalize
-            
-        Returns:
-            Dictionary with properties that match the schema
+        Entities are looked up by id, or by name where one name may belong to
+        several entities; both lookups are built here unless the caller
+        already collected them while creating the entities.
         """
-        rel_type = relationship.relationship_type
-        metadata = relationship.metadata or {}
-        
-        # Mapping for each relationship type based on schema definitions
-        if rel_type == "CALLS":
-            # Schema: call_type STRING, line_number INT64
-            return {
-                'call_type': metadata.get('type', 'function_call'),
-                'line_number': metadata.get('call_location', metadata.get('line_number', 0))
-            }
-        
-        elif rel_type == "USES":
-            # Schema: usage_type STRING, line_number INT64
-            return {
-                'usage_type': metadata.get('type', 'variable_access'),
-                'line_number': metadata.get('access_location', metadata.get('line_number', 0))
-            }
-        
-        elif rel_type == "ACCESSES":
-            # Schema: property_path STRING, access_location INT64
-            return {
-                'property_path': metadata.get('property_path', ''),
-                'access_location': metadata.get('access_location', metadata.get('line_number', 0))
-            }
-        
-        elif rel_type == "EXPORTS":
-            # Schema: export_type STRING, symbol STRING
-            return {
-                'export_type': metadata.get('export_type', 'named'),
-                'symbol': metadata.get('symbol', metadata.get('function_name', ''))
-            }
-        
-        elif rel_type == "IMPORTS":
-            # Schema: import_type STRING
-            return {
-                'import_type': metadata.get('import_type', 'named')
-            }
-        
-        elif rel_type == "DECORATES":
-            # Schema: decorator_name STRING
-            return {
-                'decorator_name': metadata.get('decorator_name', '')
-            }
-        
-        elif rel_type == "USES_TEMPLATE":
-            # Schema: template_path STRING, resolved_path STRING, component_selector STRING
-            return {
-                'template_path': metadata.get('template_path', ''),
-                'resolved_path': metadata.get('resolved_path', ''),
-                'component_selector': metadata.get('component_selector', '')
-            }
-        
-        elif rel_type == "USES_STYLES":
-            # Schema: style_path STRING, resolved_path STRING, component_selector STRING
-            return {
-                'style_path': metadata.get('style_path', ''),
-                'resolved_path': metadata.get('resolved_path', ''),
-                'component_selector': metadata.get('component_selector', '')
-            }
+        relationships = []
         
-        # For containment relationships (FILE_CONTAINS_*, CLASS_CONTAINS_*, etc.)
-        # these don't have additional properties in the schema, so return empty dict
-        elif rel_type.startswith("FILE_CONTAINS_") or rel_type.startswith("CLASS_CONTAINS_") or \
-             rel_type.startswith("MODULE_CONTAINS_") or rel_type.startswith("FUNCTION_CONTAINS_"):
-            return {}
+        if by_id is None or by_name is None:
+            by_id = {}
+            by_name = {}
+            for entity in entities:
+                by_id[entity.id] = entity
+                by_name.setdefault(entity.name, []).append(entity)
         
-        # For relationship types without extra properties (IMPLEMENTS, EXTENDS, INHERITS)
-        elif rel_type in ["IMPLEMENTS", "EXTENDS", "INHERITS"]:
-            return {}
+        extractors = {node_type: getattr(self, method_name)
+                      for node_type, method_name in self.RELATIONSHIP_EXTRACTORS.items()}
+        for node in nodes:
+            extractors[node.type](node, source_code, file_path, entities, relationships, by_id, by_name)
         
-        # For unknown relationship types, log warning and return empty dict
-        else:
-            logger.warning(f"Unknown relationship type: {rel_type}")
-            return {}
-
+        return relationships
+    
     def _create_file_entity(self, file_path: str, source_code: str) -> ParsedEntity:
         """Create entity for the file itself."""
-        lines = source_code.splitlines()
-        filename = str(Path(file_path).name)
+        line_count = self._count_lines(source_code)
         file_path_obj = Path(file_path)
+        filename = file_path_obj.name
         
-        # Get file metadata
-        import os
-        import time
-        import hashlib
-        
-        file_stats = os.stat(file_path) if os.path.exists(file_path) else None
+        file_stats = self._stat_file(file_path)
         file_size = file_stats.st_size if file_stats else 0
         modified_time = int(file_stats.st_mtime) if file_stats else int(time.time())
         
-        # Generate file hash
-        file_hash = hashlib.md5(source_code.encode()).hexdigest()
-        
         return ParsedEntity(
             id=self._generate_entity_id(filename, file_path, 1, entity_type="File"),
             name=filename,
             type="File",
             file_path=file_path,
             line_start=1,
-            line_end=len(lines),
+            line_end=line_count,
             metadata={
                 'extension': file_path_obj.suffix,
                 'size': file_size,
                 'modified_time': modified_time,
-                'hash': file_hash,
-                'lines_of_code': len(lines),
+                'hash': self._file_content_hash(file_path),
+                'lines_of_code': line_count,
                 'full_path': file_path,
                 'language': 'javascript'
             }
         )
 
-    def _traverse_for_entities(self, node: Node, source_code: str, file_path: str, entities: List[ParsedEntity]) -> None:
-        """Traverse AST and extract entities."""
-        if node.type in self.ENTITY_NODE_TYPES:
-            entity = self._create_entity_from_node(node, source_code, file_path)
-            if entity:
-                entities.append(entity)
-        
-        # Recursively process children
-        for child in node.children:
-            self._traverse_for_entities(child, source_code, file_path, entities)
-
     def _create_entity_from_node(self, node: Node, source_code: str, file_path: str) -> Optional[ParsedEntity]:
         """Create entity from a tree-sitter node."""
         try:
@@ -227,15 +246,10 @@ class JavaScriptParser(TreeSitterParser):
                 return None
             
             start_line, end_line = self._get_node_line_info(node)
-            node_text = self._get_node_text(node, source_code)
             
             # Extract additional metadata based on node type
             metadata = self._extract_node_metadata(node, source_code, entity_type)
-            metadata.update({
-                'node_type': node.type,
-                'code_snippet': node_text[:500],  # Limit snippet size
-                'language': 'javascript'
-            })
+            metadata['node_type'] = node.type
             
             return ParsedEntity(
                 id=self._generate_entity_id(name, file_path, start_line),
@@ -279,8 +293,7 @@ class JavaScriptParser(TreeSitterParser):
                     line_end=end_line,
                     metadata={
                         'decorator_name': decorator_name,
-                        'node_type': node.type,
-                        'language': 'javascript'
+                        'node_type': node.type
                     }
                 )
             
@@ -289,7 +302,6 @@ class JavaScriptParser(TreeSitterParser):
             metadata.update({
                 'decorator_name': decorator_name,
                 'node_type': node.type,
-                'language': 'javascript',
                 'framework': 'angular'
             })
             
@@ -331,92 +343,75 @@ class JavaScriptParser(TreeSitterParser):
         
         return metadata
     
-    def _extract_component_config(self, decorator_text: str) -> Dict[str, Any]:
-        """Extract @Component decorator configuration."""
+    @staticmethod
+    @lru_cache(maxsize=METADATA_CACHE_SIZE)
+    def _extract_component_config(decorator_text: str) -> Dict[str, Any]:
+        """Extract @Component decorator configuration; cached, so callers must not mutate the result."""
         config = {}
         
-        # Extract selector
-        import re
-        selector_match = re.search(r'selector\s*:\s*[\'"]([^\'"]+)[\'"]', decorator_text)
-        if selector_match:
-            config['selector'] = selector_match.group(1)
-        
-        # Extract templateUrl
-        template_url_match = re.search(r'templateUrl\s*:\s*[\'"]([^\'"]+)[\'"]', decorator_text)
-        if template_url_match:
-            config['templateUrl'] = template_url_match.group(1)
-        
-        # Extract template (inline)
-        template_match = re.search(r'template\s*:\s*[\'"`]([^\'"`]*)[\'"`]', decorator_text, re.DOTALL)
-        if template_match:
-            config['template'] = template_match.group(1)[:200]  # Limit length
-        
-        # Extract styleUrls
-        style_urls_match = re.search(r'styleUrls\s*:\s*\[(.*?)\]', decorator_text, re.DOTALL)
-        if style_urls_match:
-            style_urls_text = style_urls_match.group(1)
-            # Extract individual URLs
-            url_matches = re.findall(r'[\'"]([^\'"]+)[\'"]', style_urls_text)
-            config['styleUrls'] = url_matches
-        
-        # Extract styles (inline)
-        styles_match = re.search(r'styles\s*:\s*\[(.*?)\]', decorator_text, re.DOTALL)
-        if styles_match:
-            config['hasInlineStyles'] = True
+        # Scan the decorator once; the first occurrence of each property wins
+        for match in _RE_COMPONENT_CONFIG.finditer(decorator_text):
+            key = match.lastgroup
+            if key == 'styles':
+                config['hasInlineStyles'] = True
+            elif key in config:
+                continue
+            elif key == 'template':
+                config['template'] = match.group(key)[:200]  # Limit length
+            elif key == 'styleUrls':
+                # Extract individual URLs
+                config['styleUrls'] = _RE_QUOTED.findall(match.group(key))
+            else:
+                config[key] = match.group(key)
         
         return config
     
-    def _extract_injectable_config(self, decorator_text: str) -> Dict[str, Any]:
-        """Extract @Injectable decorator configuration."""
+    @staticmethod
+    @lru_cache(maxsize=METADATA_CACHE_SIZE)
+    def _extract_injectable_config(decorator_text: str) -> Dict[str, Any]:
+        """Extract @Injectable decorator configuration; cached, so callers must not mutate the result."""
         config = {}
         
         # Extract providedIn
-        import re
-        provided_in_match = re.search(r'providedIn\s*:\s*[\'"]([^\'"]+)[\'"]', decorator_text)
+        provided_in_match = _RE_PROVIDED_IN.search(decorator_text)
         if provided_in_match:
             config['providedIn'] = provided_in_match.group(1)
         
         return config
     
-    def _extract_directive_config(self, decorator_text: str) -> Dict[str, Any]:
-        """Extract @Directive decorator configuration."""
+    @staticmethod
+    @lru_cache(maxsize=METADATA_CACHE_SIZE)
+    def _extract_directive_config(decorator_text: str) -> Dict[str, Any]:
+        """Extract @Directive decorator configuration; cached, so callers must not mutate the result."""
         config = {}
         
         # Extract selector
-        import re
-        selector_match = re.search(r'selector\s*:\s*[\'"]([^\'"]+)[\'"]', decorator_text)
+        selector_match = _RE_SELECTOR.search(decorator_text)
         if selector_match:
             config['selector'] = selector_match.group(1)
         
         return config
     
-    def _extract_module_config(self, decorator_text: str) -> Dict[str, Any]:
-        """Extract @NgModule decorator configuration."""
+    @staticmethod
+    @lru_cache(maxsize=METADATA_CACHE_SIZE)
+    def _extract_module_config(decorator_text: str) -> Dict[str, Any]:
+        """Extract @NgModule decorator configuration; cached, so callers must not mutate the result."""
         config = {}
         
-        # Extract basic module properties
-        import re
-        
-        # Check for declarations
-        if 'declarations' in decorator_text:
-            config['hasDeclarations'] = True
-        
-        # Check for imports
-        if 'imports' in decorator_text:
-            config['hasImports'] = True
-        
-        # Check for providers
-        if 'providers' in decorator_text:
-            config['hasProviders'] = True
-        
-        # Check for exports
-        if 'exports' in decorator_text:
-            config['hasExports'] = True
+        # Flag each NgModule property that appears in the decorator
+        for prop, flag in _NGMODULE_PROPERTIES:
+            if prop in decorator_text:
+                config[flag] = True
         
         return config
 
     def _extract_name_from_node(self, node: Node, source_code: str) -> str:
         """Extract the name/identifier from a node."""
+        # Declarations expose their identifier as the 'name' field
+        name_node = node.child_by_field_name('name')
+        if name_node is not None and name_node.type in self.NAME_NODE_TYPES:
+            return self._get_node_text(name_node, source_code)
+        
         # Look for identifier child nodes
         for child in node.children:
             if child.type == 'identifier':
@@ -426,6 +421,11 @@ class JavaScriptParser(TreeSitterParser):
         
         # Handle variable declarations
         if node.type in ['variable_declaration', 'lexical_declaration']:
+            declarator = node.child_by_field_name('declarator')
+            name_node = declarator.child_by_field_name('name') if declarator is not None else None
+            if name_node is not None and name_node.type == 'identifier':
+                return self._get_node_text(name_node, source_code)
+            
             for child in node.children:
                 if child.type == 'variable_declarator':
                     for grandchild in child.children:
@@ -434,8 +434,6 @@ class JavaScriptParser(TreeSitterParser):
         
         # Handle arrow functions assigned to variables
         if node.type == 'arrow_function':
-            # Look for parent assignment
-            node_text = self._get_node_text(node, source_code)
             # Use line number for deterministic naming
             start_line = node.start_point[0]
             end_line = node.end_point[0]
@@ -517,13 +515,13 @@ class JavaScriptParser(TreeSitterParser):
                 metadata.update(param_features)
         
         # Check function type with enhanced detection
-        node_text = self._get_node_text(node, source_code)
-        metadata['is_async'] = 'async' in node_text or node.type in ['async_function_declaration', 'async_function']
+        node_text = self._get_node_bytes(node, source_code)
+        metadata['is_async'] = b'async' in node_text or node.type in ['async_function_declaration', 'async_function']
         metadata['is_generator'] = node.type in ['generator_function_declaration', 'generator_function']
         metadata['is_arrow'] = node.type == 'arrow_function'
         
         # Detect modern JavaScript patterns
-        if '=>' in node_text:
+        if b'=>' in node_text:
             metadata['function_style'] = 'arrow'
         elif node.type in ['async_function_declaration', 'async_function']:
             metadata['function_style'] = 'async'
@@ -534,8 +532,10 @@ class JavaScriptParser(TreeSitterParser):
         
         return metadata
     
-    def _analyze_parameters(self, param_text: str) -> Dict[str, Any]:
-        """Analyze function parameters for modern JavaScript features."""
+    @staticmethod
+    @lru_cache(maxsize=METADATA_CACHE_SIZE)
+    def _analyze_parameters(param_text: str) -> Dict[str, Any]:
+        """Analyze function parameters for modern JavaScript features; cached, so callers must not mutate the result."""
         features = {}
         
         # Count parameters
@@ -564,16 +564,17 @@ class JavaScriptParser(TreeSitterParser):
         """Extract metadata specific to method definitions."""
         metadata = {}
         
-        node_text = self._get_node_text(node, source_code)
+        # Modifiers and the get/set keyword precede the method name
+        node_text = self._get_node_header_bytes(node, source_code)
         
         # Check if static
-        metadata['is_static'] = 'static' in node_text
-        metadata['is_async'] = 'async' in node_text
+        metadata['is_static'] = b'static' in node_text
+        metadata['is_async'] = b'async' in node_text
         
         # Check method kind
-        if 'get ' in node_text:
+        if b'get ' in node_text:
             metadata['method_kind'] = 'getter'
-        elif 'set ' in node_text:
+        elif b'set ' in node_text:
             metadata['method_kind'] = 'setter'
         else:
             metadata['method_kind'] = 'method'
@@ -584,38 +585,44 @@ class JavaScriptParser(TreeSitterParser):
         """Extract metadata for variable declarations with modern JS support."""
         metadata = {}
         
-        node_text = self._get_node_text(node, source_code)
+        # Only ASCII tokens are checked, so the text is never decoded
+        node_text = self._get_node_bytes(node, source_code)
         
         # Determine declaration type
-        if node_text.startswith('const'):
+        if node_text.startswith(b'const'):
             metadata['declaration_type'] = 'const'
-        elif node_text.startswith('let'):
+        elif node_text.startswith(b'let'):
             metadata['declaration_type'] = 'let'
-        elif node_text.startswith('var'):
+        elif node_text.startswith(b'var'):
             metadata['declaration_type'] = 'var'
         
+        # Count each marker once and derive every flag from the counts
+        arrow_count = node_text.count(b'=>')
+        brace_count = node_text.count(b'{')
+        has_bracket = b'[' in node_text
+        
         # Enhanced assignment analysis
-        if '=>' in node_text:
+        if arrow_count:
             metadata['is_arrow_function_assignment'] = True
-        elif 'function' in node_text:
+        elif b'function' in node_text:
             metadata['is_function_assignment'] = True
-        elif 'async' in node_text:
+        elif b'async' in node_text:
             metadata['is_async_assignment'] = True
         
         # Check for destructuring
-        metadata['has_destructuring'] = '{' in node_text or '[' in node_text
+        metadata['has_destructuring'] = brace_count > 0 or has_bracket
         
         # Check for object/array literals
-        if node_text.count('{') > node_text.count('=>'):  # Avoid counting arrow functions
+        if brace_count > arrow_count:  # Avoid counting arrow functions
             metadata['is_object_literal'] = True
-        if node_text.count('[') > 0:
+        if has_bracket:
             metadata['has_array_syntax'] = True
         
         # Check for template literals
-        metadata['has_template_literal'] = '`' in node_text
+        metadata['has_template_literal'] = b'`' in node_text
         
         # Check for spread operator
-        metadata['has_spread_operator'] = '...' in node_text
+        metadata['has_spread_operator'] = b'...' in node_text
         
         # Estimate complexity based on modern JS features
         complexity = 0
@@ -631,55 +638,33 @@ class JavaScriptParser(TreeSitterParser):
         """Extract metadata for import/export statements."""
         metadata = {}
         
-        node_text = self._get_node_text(node, source_code)
+        node_text = self._get_node_bytes(node, source_code)
         
         # Extract module path
-        if 'from' in node_text:
-            parts = node_text.split('from')
-            if len(parts) > 1:
-                module_path = parts[1].strip().strip('\'"')
-                metadata['module_path'] = module_path
-                metadata['is_relative'] = module_path.startswith('.')
+        source_node = node.child_by_field_name('source')
+        if source_node is not None:
+            module_path = self._get_string_contents(source_node, source_code)
+            metadata['module_path'] = module_path
+            metadata['is_relative'] = module_path.startswith('.')
         
         # Check if default import/export
-        metadata['is_default'] = 'default' in node_text
+        metadata['is_default'] = b'default' in node_text
         
         # Check if namespace import
-        metadata['is_namespace'] = '*' in node_text
+        metadata['is_namespace'] = b'*' in node_text
         
         return metadata
 
-    def _traverse_for_relationships(self, node: Node, source_code: str, file_path: str,
-                                  entities: List[ParsedEntity], relationships: List[ParsedRelationship],
-                                  entity_lookup: Dict[str, ParsedEntity]) -> None:
-        """Traverse AST and extract relationships."""
-        
-        # Look for specific relationship patterns
-        if node.type == 'class_declaration':
-            self._extract_class_relationships(node, source_code, file_path, entities, relationships, entity_lookup)
-        elif node.type == 'decorator':
-            self._extract_angular_decorator_relationships(node, source_code, file_path, entities, relationships, entity_lookup)
-        elif node.type in ['import_statement', 'export_statement']:
-            self._extract_import_export_relationships(node, source_code, file_path, entities, relationships, entity_lookup)
-        elif node.type == 'call_expression':
-            self._extract_function_call_relationships(node, source_code, file_path, entities, relationships, entity_lookup)
-        elif node.type == 'member_expression':
-            self._extract_property_access_relationships(node, source_code, file_path, entities, relationships, entity_lookup)
-        
-        # Recursively process children
-        for child in node.children:
-            self._traverse_for_relationships(child, source_code, file_path, entities, relationships, entity_lookup)
-
     def _extract_angular_decorator_relationships(self, node: Node, source_code: str, file_path: str,
                                               entities: List[ParsedEntity], relationships: List[ParsedRelationship],
-                                              entity_lookup: Dict[str, ParsedEntity]) -> None:
+                                              by_id: Dict[str, ParsedEntity],
+                                              by_name: Dict[str, List[ParsedEntity]]) -> None:
         """Extract Angular decorator relationships for templates and styles."""
         try:
-            node_text = self._get_node_text(node, source_code)
-            
-            # Check if this is a @Component decorator
-            if not node_text.startswith('@Component'):
+            # Check if this is a @Component decorator before decoding it
+            if not self._get_node_bytes(node, source_code).startswith(b'@Component'):
                 return
+            node_text = self._get_node_text(node, source_code)
             
             # Find the component entity (usually the class that follows the decorator)
             component_entity = self._find_component_entity_for_decorator(node, entities)
@@ -687,39 +672,42 @@ class JavaScriptParser(TreeSitterParser):
                 return
             
             # Extract templateUrl relationships
-            import re
-            template_url_match = re.search(r'templateUrl\s*:\s*[\'"]([^\'"]+)[\'"]', node_text)
+            template_url_match = _RE_TEMPLATE_URL.search(node_text)
             if template_url_match:
                 template_path = template_url_match.group(1)
                 relationships.append(ParsedRelationship(
                     from_id=component_entity.id,
-                    to_id=f"unresolved:template_{template_path}",
+                    to_id=None,
                     relationship_type="USES_TEMPLATE",
                     metadata={
                         'template_path': template_path,
                         'resolved_path': template_path,  # Will be resolved later
                         'component_selector': '',  # Extract if available
                         'component_file_path': file_path
-                    }
+                    },
+                    unresolved_name=template_path,
+                    unresolved_kind="template"
                 ))
             
             # Extract styleUrls relationships
-            style_urls_match = re.search(r'styleUrls\s*:\s*\[(.*?)\]', node_text, re.DOTALL)
+            style_urls_match = _RE_STYLE_URLS.search(node_text)
             if style_urls_match:
                 style_urls_text = style_urls_match.group(1)
-                url_matches = re.findall(r'[\'"]([^\'"]+)[\'"]', style_urls_text)
+                url_matches = _RE_QUOTED.findall(style_urls_text)
                 
                 for style_url in url_matches:
                     relationships.append(ParsedRelationship(
                         from_id=component_entity.id,
-                        to_id=f"unresolved:style_{style_url}",
+                        to_id=None,
                         relationship_type="USES_STYLES",
                         metadata={
                             'style_path': style_url,
                             'resolved_path': style_url,  # Will be resolved later
                             'component_selector': '',  # Extract if available
                             'component_file_path': file_path
-                        }
+                        },
+                        unresolved_name=style_url,
+                        unresolved_kind="style"
                     ))
             
         except Exception as e:
@@ -730,65 +718,92 @@ class JavaScriptParser(TreeSitterParser):
         try:
             decorator_line = self._get_node_line_info(decorator_node)[0]
             
-            # Look for a class entity that starts shortly after the decorator
-            for entity in entities:
-                if (entity.type == "Class" and 
-                    entity.line_start > decorator_line and 
-                    entity.line_start <= decorator_line + 5):  # Within 5 lines
-                    return entity
+            # Look for the first class entity that starts shortly after the decorator
+            class_starts, class_entities = self._get_class_index(entities)
+            index = bisect_right(class_starts, decorator_line)
+            if index < len(class_starts) and class_starts[index] <= decorator_line + 5:  # Within 5 lines
+                return class_entities[index]
                     
         except Exception as e:
             logger.debug(f"Failed to find component entity for decorator: {e}")
         
         return None
 
+    def _get_class_index(self, entities: List[ParsedEntity]) -> Tuple[List[int], List[ParsedEntity]]:
+        """
+        Get the class entities of an entity list, sorted by start line.
+        
+        The index is built once per entity list, so finding the class of
+        each decorator is a binary search rather than a scan of all entities.
+        
+        Args:
+            entities: Entities of the file being parsed
+            
+        Returns:
+            Tuple of (start lines, class entities) in matching order
+        """
+        if entities is not self._class_index_entities:
+            classes = sorted((entity for entity in entities if entity.type == "Class"),
+                             key=lambda entity: entity.line_start)
+            self._class_index = ([entity.line_start for entity in classes], classes)
+            self._class_index_entities = entities
+        return self._class_index
+
     def _extract_class_relationships(self, node: Node, source_code: str, file_path: str,
                                    entities: List[ParsedEntity], relationships: List[ParsedRelationship],
-                                   entity_lookup: Dict[str, ParsedEntity]) -> None:
+                                   by_id: Dict[str, ParsedEntity],
+                                   by_name: Dict[str, List[ParsedEntity]]) -> None:
         """Extract relationships for class declarations."""
         class_name = self._extract_name_from_node(node, source_code)
+        class_entity = by_id.get(self._generate_entity_id(
+            class_name, file_path, self._get_node_line_info(node)[0]))
+        if not class_entity:
+            return
         
         # Find extends relationships
         for child in node.children:
             if child.type == 'class_heritage':
-                heritage_text = self._get_node_text(child, source_code)
-                if 'extends' in heritage_text:
+                if b'extends' in self._get_node_bytes(child, source_code):
+                    heritage_text = self._get_node_text(child, source_code)
                     parent_class = heritage_text.replace('extends', '').strip()
-                    if parent_class in entity_lookup:
+                    parent_entity = self._find_entity_by_name(by_name, parent_class, "Class")
+                    if parent_entity:
                         relationships.append(ParsedRelationship(
-                            from_id=entity_lookup[class_name].id,
-                            to_id=entity_lookup[parent_class].id,
+                            from_id=class_entity.id,
+                            to_id=parent_entity.id,
                             relationship_type="EXTENDS",
                             metadata={'type': 'inheritance'}
                         ))
 
     def _extract_function_call_relationships(self, node: Node, source_code: str, file_path: str,
                                            entities: List[ParsedEntity], relationships: List[ParsedRelationship],
-                                           entity_lookup: Dict[str, ParsedEntity]) -> None:
+                                           by_id: Dict[str, ParsedEntity],
+                                           by_name: Dict[str, List[ParsedEntity]]) -> None:
         """Extract function call relationships."""
         if node.type == 'call_expression':
             try:
                 # Find the function being called
                 function_node = node.children[0] if node.children else None
                 if function_node:
-                    function_name = self._get_node_text(function_node, source_code)
-                    
                     # Find the containing function/method that makes this call
-                    caller_entity = self._find_containing_function(node, entities)
+                    line_number = self._get_node_line_info(node)[0]
+                    caller_entity = self._find_function_at_line(line_number, entities)
+                    # Callee names repeat across a file; interned, every call of the same
+                    # function shares one string in memory and in the parse cache
+                    function_name = (sys.intern(self._get_node_text(function_node, source_code))
+                                     if caller_entity else None)
                     
                     if caller_entity and function_name:
-                        # Mark external function calls as unresolved
-                        to_id = f"unresolved:function_{function_name}"
-                        
-                        # Create function call relationship
+                        # Create function call relationship, marked unresolved
+                        # for cross-file resolution
                         relationships.append(ParsedRelationship(
                             from_id=caller_entity.id,
-                            to_id=to_id,
+                            to_id=None,
                             relationship_type="CALLS",
-                            metadata={
-                                'call_type': 'function_call',
-                                'line_number': self._get_node_line_info(node)[0]
-                            }
+                            # The call type is implied by the relationship type
+                            metadata={'line_number': line_number},
+                            unresolved_name=function_name,
+                            unresolved_kind="function"
                         ))
                         
             except Exception as e:
@@ -796,60 +811,50 @@ class JavaScriptParser(TreeSitterParser):
     
     def _extract_property_access_relationships(self, node: Node, source_code: str, file_path: str,
                                              entities: List[ParsedEntity], relationships: List[ParsedRelationship],
-                                             entity_lookup: Dict[str, ParsedEntity]) -> None:
+                                             by_id: Dict[str, ParsedEntity],
+                                             by_name: Dict[str, List[ParsedEntity]]) -> None:
         """Extract property access relationships."""
         if node.type == 'member_expression':
             try:
-                access_text = self._get_node_text(node, source_code)
-                
                 # Find the containing function/method that accesses this property
-                accessor_entity = self._find_containing_function(node, entities)
+                access_location = self._get_node_line_info(node)[0]
+                accessor_entity = self._find_function_at_line(access_location, entities)
+                access_text = sys.intern(self._get_node_text(node, source_code)) if accessor_entity else None
                 
                 if accessor_entity and access_text:
                     # Mark property accesses as unresolved for cross-file resolution
-                    to_id = f"unresolved:property_{access_text}"
-                    
                     relationships.append(ParsedRelationship(
                         from_id=accessor_entity.id,
-                        to_id=to_id,
+                        to_id=None,
                         relationship_type="ACCESSES",
                         metadata={
                             'property_path': access_text,
-                            'access_location': self._get_node_line_info(node)[0]
-                        }
+                            'access_location': access_location
+                        },
+                        unresolved_name=access_text,
+                        unresolved_kind="property"
                     ))
                     
             except Exception as e:
                 logger.debug(f"Failed to extract property access relationship: {e}")
     
-    def _find_containing_function(self, node: Node, entities: List[ParsedEntity]) -> Optional[ParsedEntity]:
-        """Find the function or method that contains the given node."""
-        try:
-            node_line = self._get_node_line_info(node)[0]
-            
-            # Find entities that contain this line
-            containing_entities = []
-            for entity in entities:
-                if (entity.type in ['Function', 'Method', 'Constructor'] and 
-                    entity.line_start <= node_line <= entity.line_end):
-                    containing_entities.append(entity)
-            
-            # Return the most specific (smallest) containing entity
-            if containing_entities:
-                return min(containing_entities, key=lambda e: e.line_end - e.line_start)
-                
-        except Exception as e:
-            logger.debug(f"Failed to find containing function: {e}")
-        
-        return None
-
+    def _find_entity_by_name(self, by_name: Dict[str, List[ParsedEntity]], name: str,
+                             entity_type: str) -> Optional[ParsedEntity]:
+        """Find the entity declared under a name, preferring the given type."""
+        candidates = by_name.get(name)
+        if not candidates:
+            return None
+        for entity in candidates:
+            if entity.type == entity_type:
+                return entity
+        return candidates[-1]
+    
     def _extract_import_export_relationships(self, node: Node, source_code: str, file_path: str,
                                            entities: List[ParsedEntity], relationships: List[ParsedRelationship],
-                                           entity_lookup: Dict[str, ParsedEntity]) -> None:
+                                           by_id: Dict[str, ParsedEntity],
+                                           by_name: Dict[str, List[ParsedEntity]]) -> None:
         """Extract relationships for import/export statements."""
         try:
-            node_text = self._get_node_text(node, source_code)
-            
             # Find the file entity as the source
             file_entity = None
             for entity in entities:
@@ -861,116 +866,100 @@ class JavaScriptParser(TreeSitterParser):
                 return
             
             if node.type == 'import_statement':
-                # Extract imported module path
-                if 'from' in node_text:
-                    parts = node_text.split('from')
-                    if len(parts) > 1:
-                        module_path = parts[1].strip().strip('\'"')
-                        
-                        # Mark external modules as unresolved to prevent storage failures
-                        is_external = (module_path.startswith('@') or 
-                                     module_path in ['react', 'lodash', 'moment', 'axios', 'rxjs'] or
-                                     module_path.startswith('node_modules') or
-                                     not module_path.startswith('.'))
-                        
-                        to_id = f"unresolved:module_{module_path}" if is_external else f"module_{module_path}"
-                        
-                        # Create import relationship
-                        relationships.append(ParsedRelationship(
-                            from_id=file_entity.id,
-                            to_id=to_id,
-                            relationship_type="IMPORTS",
-                            metadata={
-                                'module_path': module_path,
-                                'is_relative': module_path.startswith('.'),
-                                'import_text': parts[0].strip(),
-                                'import_type': 'external' if is_external else 'internal'
-                            }
-                        ))
-                        
-                        # Extract specific imports
-                        import_spec = parts[0].replace('import', '').strip()
-                        if '{' in import_spec and '}' in import_spec:
-                            # Named imports
-                            named_imports = import_spec.split('{')[1].split('}')[0]
-                            for named_import in named_imports.split(','):
-                                clean_import = named_import.strip()
-                                if clean_import:
-                                    # Mark external symbols as unresolved
-                                    symbol_id = f"unresolved:external_{clean_import}" if is_external else f"external_{clean_import}"
-                                    
-                                    relationships.append(ParsedRelationship(
-                                        from_id=file_entity.id,
-                                        to_id=symbol_id,
-                                        relationship_type="USES",
-                                        metadata={
-                                            'type': 'named_import',
-                                            'symbol': clean_import,
-                                            'source_module': module_path,
-                                            'usage_type': 'import'
-                                        }
-                                    ))
+                # Side-effect imports have a source but no import clause
+                source_node = node.child_by_field_name('source')
+                import_clause = self._find_child_of_type(node, 'import_clause')
+                if source_node is not None and import_clause is not None:
+                    module_path = self._get_string_contents(source_node, source_code)
+                    
+                    # Mark external modules as unresolved to prevent storage failures;
+                    # anything not relative (bare, scoped or node_modules) is external
+                    is_relative = module_path.startswith('.')
+                    is_external = not is_relative
+                    
+                    to_id = None if is_external else f"module_{module_path}"
+                    source_bytes = self._get_source_bytes(source_code)
+                    
+                    # Create import relationship
+                    relationships.append(ParsedRelationship(
+                        from_id=file_entity.id,
+                        to_id=to_id,
+                        relationship_type="IMPORTS",
+                        metadata={
+                            'module_path': module_path,
+                            'is_relative': is_relative,
+                            'import_text': source_bytes[node.start_byte:import_clause.end_byte].decode('utf-8'),
+                            'import_type': 'external' if is_external else 'internal'
+                        },
+                        unresolved_name=module_path if is_external else None,
+                        unresolved_kind="module" if is_external else None
+                    ))
+                    
+                    # Extract specific imports
+                    named_imports = self._find_child_of_type(import_clause, 'named_imports')
+                    for specifier in (named_imports.named_children if named_imports is not None else ()):
+                        if specifier.type != 'import_specifier':
+                            continue
+                        clean_import = self._get_node_text(specifier.child_by_field_name('name'), source_code)
+                        if clean_import:
+                            # Mark external symbols as unresolved
+                            symbol_id = None if is_external else f"external_{clean_import}"
+                            
+                            relationships.append(ParsedRelationship(
+                                from_id=file_entity.id,
+                                to_id=symbol_id,
+                                relationship_type="USES",
+                                metadata={
+                                    'type': 'named_import',
+                                    'symbol': clean_import,
+                                    'source_module': module_path,
+                                    'usage_type': 'import'
+                                },
+                                unresolved_name=clean_import if is_external else None,
+                                unresolved_kind="external" if is_external else None
+                            ))
             
             elif node.type == 'export_statement':
                 # Track what this file exports
-                export_spec = node_text.replace('export', '').strip()
+                export_clause = self._find_child_of_type(node, 'export_clause')
                 
-                if export_spec.startswith('default'):
+                if self._find_child_of_type(node, 'default') is not None:
                     # Default export
                     relationships.append(ParsedRelationship(
                         from_id=file_entity.id,
-                        to_id=f"unresolved:export_default_{file_entity.name}",
+                        to_id=None,
                         relationship_type="EXPORTS",
                         metadata={
                             'export_type': 'default',
                             'symbol': 'default'
-                        }
+                        },
+                        unresolved_name=f"default_{file_entity.name}",
+                        unresolved_kind="export"
                     ))
-                elif '{' in export_spec and '}' in export_spec:
-                    # Named exports
-                    named_exports = export_spec.split('{')[1].split('}')[0]
-                    for named_export in named_exports.split(','):
-                        clean_export = named_export.strip()
+                elif export_clause is not None:
+                    # Named exports, under their exported alias if any
+                    for specifier in export_clause.named_children:
+                        if specifier.type != 'export_specifier':
+                            continue
+                        name_node = (specifier.child_by_field_name('alias')
+                                     or specifier.child_by_field_name('name'))
+                        clean_export = self._get_node_text(name_node, source_code)
                         if clean_export:
                             relationships.append(ParsedRelationship(
                                 from_id=file_entity.id,
-                                to_id=f"unresolved:export_{clean_export}",
+                                to_id=None,
                                 relationship_type="EXPORTS",
                                 metadata={
                                     'export_type': 'named',
                                     'symbol': clean_export
-                                }
+                                },
+                                unresolved_name=clean_export,
+                                unresolved_kind="export"
                             ))
                             
         except Exception as e:
             logger.debug(f"Failed to extract import/export relationships: {e}")
 
-    def parse_file(self, file_path: str) -> ParseResult:
-        """
-        Parse a JavaScript file with enhanced external entity creation.
-        
-        Overrides base parse_file to create stub entities for external function references
-        that don't have corresponding entities, preventing relationship storage failures.
-        """
-        # Call parent method to do normal parsing
-        result = super().parse_file(file_path)
-        
-        # Create external entities for unresolved function references
-        external_entities = self._create_external_entities_for_relationships(result.relationships, result.entities)
-        
-        # Combine entities
-        all_entities = result.entities + external_entities
-        
-        # Return enhanced result
-        return ParseResult(
-            entities=all_entities,
-            relationships=result.relationships,
-            file_hash=result.file_hash,
-            file_path=result.file_path,
-            errors=result.errors,
-            parse_time=result.parse_time
-        )
-    
     def _sanitize_external_name(self, name: str) -> str:
         """
         Sanitize external entity names to prevent ID collisions.
@@ -985,10 +974,10 @@ class JavaScriptParser(TreeSitterParser):
             return "unknown"
         
         # Handle very long names (like chained D3.js calls)
-        if len(name) > 100:
-            # Create hash suffix to maintain uniqueness
-            import hashlib
-            hash_suffix = hashlib.md5(name.encode()).hexdigest()[:8]
+        if len(name) > self.MAX_EXTERNAL_NAME_LENGTH:
+            # Create hash suffix to maintain uniqueness; CRC32 is stable across
+            # processes and much cheaper than a cryptographic digest
+            hash_suffix = f"{zlib.crc32(name.encode()):08x}"
             # Keep meaningful prefix and add hash
             truncated = name[:90]
             # Clean up truncation point
@@ -998,91 +987,21 @@ class JavaScriptParser(TreeSitterParser):
         
         return name
     
-    def _create_external_entities_for_relationships(self, relationships: List[ParsedRelationship], 
-                                                   existing_entities: List[ParsedEntity]) -> List[ParsedEntity]:
+    def _sanitize_unresolved_names(self, relationships: List[ParsedRelationship]) -> None:
         """
-        Create stub entities for external function references in relationships.
+        Shorten over-long unresolved names, such as chained D3.js calls, in place.
         
-        This prevents relationship storage failures when target entities don't exist.
+        Names within the length limit are left alone without further work;
+        each other distinct name is sanitized once, however often it is referenced.
         """
-        external_entities = []
-        existing_entity_ids = {entity.id for entity in existing_entities}
-        
+        max_length = self.MAX_EXTERNAL_NAME_LENGTH
+        sanitized: Dict[Optional[str], str] = {}
         for rel in relationships:
-            # Check if this is an unresolved function call
-            if rel.relationship_type == 'CALLS' and rel.to_id.startswith('unresolved:function_'):
-                if rel.to_id not in existing_entity_ids:
-                    # Extract function name from unresolved ID
-                    function_name = rel.to_id.replace('unresolved:function_', '')
-                    
-                    # Sanitize long function names for external entities
-                    sanitized_name = self._sanitize_external_name(function_name)
-                    sanitized_id = f'unresolved:function_{sanitized_name}'
-                    
-                    # Create stub entity for external function
-                    external_entity = ParsedEntity(
-                        id=sanitized_id,
-                        name=sanitized_name,
-                        type='ExternalFunction',
-                        file_path='<external>',
-                        line_start=0,
-                        line_end=0,
-                        metadata={
-                            'external': True,
-                            'stub': True,
-                            'function_name': function_name,
-                            'language': 'javascript',
-                            'source': 'external_reference'
-                        }
-                    )
-                    external_entities.append(external_entity)
-                    existing_entity_ids.add(sanitized_id)  # Prevent duplicates
-                    # Update relationship to use sanitized ID
-                    rel.to_id = sanitized_id
-            
-            # Handle other unresolved references (modules, properties, etc.)
-            elif rel.to_id.startswith('unresolved:') and rel.to_id not in existing_entity_ids:
-                reference_type = rel.to_id.split(':')[1].split('_')[0]  # Extract type from unresolved:type_name
-                reference_name = rel.to_id.replace(f'unresolved:{reference_type}_', '')
-                
-                # Map reference types to entity types
-                entity_type_map = {
-                    'module': 'ExternalModule',
-                    'export': 'ExternalExport', 
-                    'external': 'ExternalSymbol',
-                    'property': 'ExternalProperty',
-                    'template': 'ExternalTemplate',
-                    'style': 'ExternalStyle'
-                }
-                
-                entity_type = entity_type_map.get(reference_type, 'ExternalReference')
-                
-                # Sanitize name for external entities
-                sanitized_name = self._sanitize_external_name(reference_name)
-                sanitized_id = f'unresolved:{reference_type}_{sanitized_name}'
-                
-                external_entity = ParsedEntity(
-                    id=sanitized_id,
-                    name=sanitized_name,
-                    type=entity_type,
-                    file_path='<external>',
-                    line_start=0,
-                    line_end=0,
-                    metadata={
-                        'external': True,
-                        'stub': True,
-                        'reference_type': reference_type,
-                        'reference_name': reference_name,
-                        'language': 'javascript',
-                        'source': 'external_reference'
-                    }
-                )
-                external_entities.append(external_entity)
-                existing_entity_ids.add(sanitized_id)
-                # Update relationship to use sanitized ID
-                rel.to_id = sanitized_id
-        
-        if external_entities:
-            logger.debug(f"Created {len(external_entities)} external entities for unresolved references")
-        
-        return external_entities
+            if rel.to_id is None and rel.unresolved_kind:
+                name = rel.unresolved_name
+                if name and len(name) <= max_length:
+                    continue
+                clean_name = sanitized.get(name)
+                if clean_name is None:
+                    clean_name = sanitized[name] = self._sanitize_external_name(name)
+                rel.unresolved_name = clean_name
@@ -6,7 +6,7 @@ import time
 import logging
 from typing import List, Dict, Any
 
-from .base import BaseParser, ParsedEntity, ParsedRelationship, ParseResult
+from .base import BaseParser, ParsedEntity, ParsedRelationship, ParseResult, hash_content
 
 logger = logging.getLogger(__name__)
 
@@ -32,10 +32,13 @@ class NodeJSParser(BaseParser):
         errors = []
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Read and hash the file once
+            with open(file_path, 'rb', buffering=0) as f:
+                raw = f.read()
+            # Same text as reading in text mode: strict UTF-8, universal newlines
+            content = raw.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
 
-            file_hash = self._calculate_file_hash(file_path)
+            file_hash = hash_content(raw)
 
             # Placeholder for actual Node.js parsing logic
             # For now, we'll just create a single file entity.
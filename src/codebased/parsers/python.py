@@ -3,15 +3,28 @@ Python AST parser for CodeBased.
 """
 
 import ast
+import hashlib
+import io
+import os
+import sys
 import time
 import logging
+import tokenize
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Set, Union
+from typing import List, Dict, Any, Optional, Set, Tuple, Union
 
-from .base import BaseParser, ParsedEntity, ParsedRelationship, ParseResult
+from .base import BaseParser, ParsedEntity, ParsedRelationship, ParseResult, hash_content
 
 logger = logging.getLogger(__name__)
 
+# Statements and clauses that each add a branch to cyclomatic complexity
+_BRANCH_NODE_TYPES = frozenset({ast.If, ast.While, ast.For, ast.AsyncFor,
+                                ast.ExceptHandler, ast.With, ast.AsyncWith})
+# Expressions that make the enclosing function a generator
+_YIELD_NODE_TYPES = frozenset({ast.Yield, ast.YieldFrom})
+# Metadata of relationships that carry none; shared, so it is never mutated
+_NO_METADATA: Dict[str, Any] = {}
+
 
 class PythonASTParser(BaseParser):
     """Python AST parser implementation."""
@@ -22,6 +35,11 @@ class PythonASTParser(BaseParser):
         """
         Parse a Python file using AST.
         
+        With a parse cache configured, a file whose modification time and
+        size match its cached entry is returned from the cache without
+        reading, hashing or parsing it, and one whose content hash matches
+        is returned without parsing it.
+        
         Args:
             file_path: Path to Python file
             
@@ -34,30 +52,47 @@ class PythonASTParser(BaseParser):
         errors = []
         
         try:
-            # Read file content
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            parser_name = self.__class__.__name__
+            
+            cached = self.get_cached_result(file_path)
+            if cached is not None:
+                return cached
+            
+            # Read file content once, unbuffered, and hash the raw bytes
+            with open(file_path, 'rb', buffering=0) as f:
+                raw = f.read()
+                file_stat = os.fstat(f.fileno())
+            file_hash = hash_content(raw)
             
-            # Calculate file hash
-            file_hash = self._calculate_file_hash(file_path)
+            cached = self.get_cached_result_for_content(file_path, file_hash, file_stat)
+            if cached is not None:
+                return cached
             
-            # Parse AST
+            # Parse AST from the bytes, so the encoding declaration or BOM of
+            # the source is honoured like the interpreter does
             try:
-                tree = ast.parse(content, filename=file_path)
+                tree = ast.parse(raw, filename=file_path)
             except SyntaxError as e:
                 error_msg = f"Syntax error in {file_path}:{e.lineno}: {e.msg}"
                 logger.error(error_msg)
                 errors.append(error_msg)
                 return ParseResult([], [], file_hash, file_path, errors, time.time() - start_time)
             
-            # Create parser visitor
-            visitor = PythonASTVisitor(file_path, content.splitlines())
+            # Create parser visitor; the decoded lines are only needed while
+            # the file entity is created and are freed before the visit
+            visitor = PythonASTVisitor(file_path, self._decode_source(raw).splitlines(),
+                                       file_stat.st_size)
             visitor.visit(tree)
             
             entities = visitor.entities
             relationships = visitor.relationships
             errors = visitor.errors
             
+            # Results with errors are not cached, so the errors are reported again
+            if self._parse_cache is not None and not errors:
+                self._parse_cache.put(file_path, parser_name, file_hash, file_stat.st_mtime_ns,
+                                      file_stat.st_size, entities, relationships)
+            
         except Exception as e:
             error_msg = f"Failed to parse {file_path}: {e}"
             logger.error(error_msg)
@@ -66,21 +101,52 @@ class PythonASTParser(BaseParser):
         
         parse_time = time.time() - start_time
         return ParseResult(entities, relationships, file_hash, file_path, errors, parse_time)
+    
+    @staticmethod
+    def _decode_source(raw: bytes) -> str:
+        """
+        Decode Python source bytes to text.
+        
+        Args:
+            raw: Raw file bytes
+            
+        Returns:
+            Source text; splitlines() on it handles any newline style
+        """
+        # UTF-8 is by far the common case; otherwise use the declared encoding
+        try:
+            return raw.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            return raw.decode(tokenize.detect_encoding(io.BytesIO(raw).readline)[0])
 
 
-class PythonASTVisitor(ast.NodeVisitor):
-    """AST visitor for extracting entities and relationships."""
+class PythonASTVisitor:
+    """
+    AST visitor for extracting entities and relationships.
+    
+    Follows the ``ast.NodeVisitor`` protocol (``visit``/``generic_visit``
+    and ``visit_<NodeType>`` handlers) without subclassing it, so its state
+    lives in slots instead of a per-instance ``__dict__``.
+    """
     
-    def __init__(self, file_path: str, lines: List[str]):
+    __slots__ = ('file_path', 'line_count', 'size', 'entities', 'relationships', 'errors',
+                 'current_class', 'current_function', 'current_module', 'file_id',
+                 'imports', 'class_name_stack', 'function_name_stack', 'module_name',
+                 '_id_context_hash', '_dispatch')
+    
+    def __init__(self, file_path: str, lines: List[str], size: int):
         """
         Initialize visitor.
         
         Args:
             file_path: Path to the file being parsed
-            lines: List of file lines for context
+            lines: List of file lines, only counted for the file entity and
+                not kept, so they can be freed before the tree is visited
+            size: Size of the file in bytes
         """
         self.file_path = file_path
-        self.lines = lines
+        self.line_count = len(lines)
+        self.size = size
         self.entities: List[ParsedEntity] = []
         self.relationships: List[ParsedRelationship] = []
         self.errors: List[str] = []
@@ -90,8 +156,8 @@ class PythonASTVisitor(ast.NodeVisitor):
         self.current_function: Optional[str] = None
         self.current_module: Optional[str] = None
         
-        # Track entity IDs for relationship creation
-        self.entity_ids: Dict[str, str] = {}
+        # ID of the file entity, the container of top-level relationships
+        self.file_id: Optional[str] = None
         
         # Track imports
         self.imports: Dict[str, str] = {}  # module_name -> alias
@@ -99,14 +165,46 @@ class PythonASTVisitor(ast.NodeVisitor):
         # Track name context hierarchy for unique ID generation
         self.class_name_stack: List[str] = []
         self.function_name_stack: List[str] = []
-        self.module_name: str = Path(self.file_path).stem
+        path = Path(file_path)
+        self.module_name: str = path.stem
+        # MD5 state fed with the context part of IDs, kept in step with the stacks
+        self._id_context_hash = None
+        self._update_id_context()
+        
+        # Handlers by node type, so visiting needs no per-node method name lookup
+        self._dispatch = {
+            ast.Module: self.visit_Module,
+            ast.ClassDef: self.visit_ClassDef,
+            ast.FunctionDef: self.visit_FunctionDef,
+            ast.AsyncFunctionDef: self.visit_AsyncFunctionDef,
+            ast.Import: self.visit_Import,
+            ast.ImportFrom: self.visit_ImportFrom,
+            ast.Call: self.visit_Call,
+            ast.Assign: self.visit_Assign,
+        }
         
         # Initialize with file entity
-        self._create_file_entity()
+        self._create_file_entity(path, lines)
+    
+    def visit(self, node: ast.AST) -> None:
+        """Visit a node with its handler from the dispatch table."""
+        self._dispatch.get(type(node), self.generic_visit)(node)
     
-    def _create_file_entity(self):
+    def generic_visit(self, node: ast.AST) -> None:
+        """Visit the children of a node, reading them straight from its fields."""
+        dispatch = self._dispatch
+        generic_visit = self.generic_visit
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        dispatch.get(type(item), generic_visit)(item)
+            elif isinstance(value, ast.AST):
+                dispatch.get(type(value), generic_visit)(value)
+    
+    def _create_file_entity(self, file_path_obj: Path, lines: List[str]):
         """Create the file entity."""
-        file_path_obj = Path(self.file_path)
         file_id = self._generate_id("file", self.file_path, 1)
         
         file_entity = ParsedEntity(
@@ -115,22 +213,22 @@ class PythonASTVisitor(ast.NodeVisitor):
             type="File",
             file_path=self.file_path,
             line_start=1,
-            line_end=len(self.lines),
+            line_end=self.line_count,
             metadata={
                 "path": self.file_path,
                 "extension": file_path_obj.suffix,
-                "size": len('\n'.join(self.lines)),
-                "lines_of_code": len([line for line in self.lines if line.strip() and not line.strip().startswith('#')])
+                "size": self.size,
+                "lines_of_code": sum(1 for line in lines
+                                     if (stripped := line.lstrip()) and stripped[0] != '#')
             }
         )
         
         self.entities.append(file_entity)
-        self.entity_ids['file'] = file_id
+        self.file_id = file_id
     
     def visit_Module(self, node: ast.Module) -> None:
         """Visit module node."""
-        file_path_obj = Path(self.file_path)
-        module_name = file_path_obj.stem
+        module_name = self.module_name
         module_id = self._generate_id("module", module_name, 1)
         
         # Get module docstring
@@ -142,23 +240,19 @@ class PythonASTVisitor(ast.NodeVisitor):
             type="Module",
             file_path=self.file_path,
             line_start=1,
-            line_end=len(self.lines),
+            line_end=self.line_count,
             metadata={
                 "docstring": docstring,
-                "file_id": self.entity_ids['file']
+                "file_id": self.file_id
             }
         )
         
         self.entities.append(module_entity)
-        self.entity_ids['module'] = module_id
         self.current_module = module_id
         
         # Create FILE_CONTAINS_MODULE relationship
-        self._create_relationship(
-            self.entity_ids['file'],
-            module_id,
-            "FILE_CONTAINS_MODULE"
-        )
+        self.relationships.append(ParsedRelationship(
+            self.file_id, module_id, "FILE_CONTAINS_MODULE", _NO_METADATA))
         
         self.generic_visit(node)
     
@@ -166,6 +260,7 @@ class PythonASTVisitor(ast.NodeVisitor):
         """Visit class definition."""
         # Add to name context before generating ID
         self.class_name_stack.append(node.name)
+        self._update_id_context()
         
         class_id = self._generate_id("class", node.name, node.lineno)
         parent_class = self.current_class
@@ -185,35 +280,33 @@ class PythonASTVisitor(ast.NodeVisitor):
             metadata={
                 "docstring": docstring,
                 "is_abstract": is_abstract,
-                "file_id": self.entity_ids['file'],
+                "file_id": self.file_id,
                 "module_id": self.current_module,
                 "parent_class": parent_class
             }
         )
         
         self.entities.append(class_entity)
-        self.entity_ids[f"class:{node.name}"] = class_id
         
         # Create appropriate CONTAINS relationship
+        append = self.relationships.append
         if parent_class:
-            self._create_relationship(parent_class, class_id, "CLASS_CONTAINS_CLASS")  # For nested classes
+            # For nested classes
+            append(ParsedRelationship(parent_class, class_id, "CLASS_CONTAINS_CLASS", _NO_METADATA))
         elif self.current_module:
-            self._create_relationship(self.current_module, class_id, "MODULE_CONTAINS_CLASS")
+            append(ParsedRelationship(self.current_module, class_id, "MODULE_CONTAINS_CLASS", _NO_METADATA))
             # Also create direct file relationship for better visualization
-            self._create_relationship(self.entity_ids['file'], class_id, "FILE_CONTAINS_CLASS")
+            append(ParsedRelationship(self.file_id, class_id, "FILE_CONTAINS_CLASS", _NO_METADATA))
         else:
-            self._create_relationship(self.entity_ids['file'], class_id, "FILE_CONTAINS_CLASS")
+            append(ParsedRelationship(self.file_id, class_id, "FILE_CONTAINS_CLASS", _NO_METADATA))
         
         # Handle inheritance
         for base in node.bases:
             base_name = self._get_name_from_node(base)
             if base_name:
                 # Create INHERITS relationship (will be resolved in second pass)
-                self._create_relationship(
-                    class_id,
-                    f"unresolved:{base_name}",
-                    "INHERITS"
-                )
+                append(ParsedRelationship(class_id, None, "INHERITS", _NO_METADATA,
+                                          unresolved_name=base_name))
         
         # Visit class body
         self.generic_visit(node)
@@ -221,11 +314,13 @@ class PythonASTVisitor(ast.NodeVisitor):
         # Restore context
         self.current_class = parent_class
         self.class_name_stack.pop()
+        self._update_id_context()
     
     def visit_FunctionDef(self, node: Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> None:
         """Visit function/method definition."""
         # Add to name context before generating ID
         self.function_name_stack.append(node.name)
+        self._update_id_context()
         
         function_id = self._generate_id("function", node.name, node.lineno)
         parent_function = self.current_function
@@ -238,11 +333,10 @@ class PythonASTVisitor(ast.NodeVisitor):
         
         # Determine function characteristics
         is_async = isinstance(node, ast.AsyncFunctionDef)
-        is_generator = self._is_generator(node)
+        is_generator, complexity = self._analyze_function(node)
         is_property = self._has_decorator(node, "property")
         is_staticmethod = self._has_decorator(node, "staticmethod")
         is_classmethod = self._has_decorator(node, "classmethod")
-        complexity = self._calculate_complexity(node)
         
         function_entity = ParsedEntity(
             id=function_id,
@@ -261,7 +355,7 @@ class PythonASTVisitor(ast.NodeVisitor):
                 "is_staticmethod": is_staticmethod,
                 "is_classmethod": is_classmethod,
                 "complexity": complexity,
-                "file_id": self.entity_ids['file'],
+                "file_id": self.file_id,
                 "module_id": self.current_module,
                 "class_id": self.current_class,
                 "parent_function": parent_function
@@ -269,30 +363,28 @@ class PythonASTVisitor(ast.NodeVisitor):
         )
         
         self.entities.append(function_entity)
-        self.entity_ids[f"function:{node.name}"] = function_id
         
         # Create appropriate CONTAINS relationship
+        append = self.relationships.append
         if self.current_class:
-            self._create_relationship(self.current_class, function_id, "CLASS_CONTAINS_FUNCTION")
+            append(ParsedRelationship(self.current_class, function_id, "CLASS_CONTAINS_FUNCTION", _NO_METADATA))
         elif parent_function:
-            self._create_relationship(parent_function, function_id, "FUNCTION_CONTAINS_FUNCTION")  # For nested functions
+            # For nested functions
+            append(ParsedRelationship(parent_function, function_id, "FUNCTION_CONTAINS_FUNCTION", _NO_METADATA))
         elif self.current_module:
-            self._create_relationship(self.current_module, function_id, "MODULE_CONTAINS_FUNCTION")
+            append(ParsedRelationship(self.current_module, function_id, "MODULE_CONTAINS_FUNCTION", _NO_METADATA))
             # Also create direct file relationship for better visualization
-            self._create_relationship(self.entity_ids['file'], function_id, "FILE_CONTAINS_FUNCTION")
+            append(ParsedRelationship(self.file_id, function_id, "FILE_CONTAINS_FUNCTION", _NO_METADATA))
         else:
-            self._create_relationship(self.entity_ids['file'], function_id, "FILE_CONTAINS_FUNCTION")
+            append(ParsedRelationship(self.file_id, function_id, "FILE_CONTAINS_FUNCTION", _NO_METADATA))
         
         # Handle decorators
         for decorator in node.decorator_list:
             decorator_name = self._get_name_from_node(decorator)
             if decorator_name:
-                self._create_relationship(
-                    f"unresolved:{decorator_name}",
-                    function_id,
-                    "DECORATES",
-                    {"decorator_name": decorator_name, "line_number": node.lineno}
-                )
+                append(ParsedRelationship(None, function_id, "DECORATES",
+                                          {"decorator_name": decorator_name, "line_number": node.lineno},
+                                          unresolved_name=decorator_name))
         
         # Visit function body
         self.generic_visit(node)
@@ -300,6 +392,7 @@ class PythonASTVisitor(ast.NodeVisitor):
         # Restore context
         self.current_function = parent_function
         self.function_name_stack.pop()
+        self._update_id_context()
     
     def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
         """Visit async function definition."""
@@ -307,6 +400,8 @@ class PythonASTVisitor(ast.NodeVisitor):
     
     def visit_Import(self, node: ast.Import) -> None:
         """Visit import statement."""
+        file_id = self.file_id
+        relationships = []
         for alias in node.names:
             import_id = self._generate_id("import", alias.name, node.lineno)
             
@@ -321,7 +416,7 @@ class PythonASTVisitor(ast.NodeVisitor):
                     "module_name": alias.name,
                     "alias": alias.asname,
                     "is_from_import": False,
-                    "file_id": self.entity_ids['file']
+                    "file_id": file_id
                 }
             )
             
@@ -331,18 +426,18 @@ class PythonASTVisitor(ast.NodeVisitor):
             import_name = alias.asname if alias.asname else alias.name
             self.imports[import_name] = alias.name
             
-            # Create FILE_CONTAINS_IMPORT relationship
-            self._create_relationship(
-                self.entity_ids['file'],
-                import_id,
-                "FILE_CONTAINS_IMPORT"
-            )
+            # Create FILE_CONTAINS_IMPORT relationship, added with the others below
+            relationships.append(ParsedRelationship(
+                file_id, import_id, "FILE_CONTAINS_IMPORT", _NO_METADATA))
         
+        self.relationships.extend(relationships)
         self.generic_visit(node)
     
     def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
         """Visit from-import statement."""
         module_name = node.module or ""
+        file_id = self.file_id
+        relationships = []
         
         for alias in node.names:
             import_id = self._generate_id("import", f"{module_name}.{alias.name}", node.lineno)
@@ -358,7 +453,7 @@ class PythonASTVisitor(ast.NodeVisitor):
                     "module_name": module_name,
                     "alias": alias.asname,
                     "is_from_import": True,
-                    "file_id": self.entity_ids['file']
+                    "file_id": file_id
                 }
             )
             
@@ -368,30 +463,27 @@ class PythonASTVisitor(ast.NodeVisitor):
             import_name = alias.asname if alias.asname else alias.name
             self.imports[import_name] = f"{module_name}.{alias.name}"
             
-            # Create FILE_CONTAINS_IMPORT relationship
-            self._create_relationship(
-                self.entity_ids['file'],
-                import_id,
-                "FILE_CONTAINS_IMPORT"
-            )
+            # Create FILE_CONTAINS_IMPORT relationship, added with the others below
+            relationships.append(ParsedRelationship(
+                file_id, import_id, "FILE_CONTAINS_IMPORT", _NO_METADATA))
         
+        self.relationships.extend(relationships)
         self.generic_visit(node)
     
     def visit_Call(self, node: ast.Call) -> None:
         """Visit function call."""
-        if self.current_function:
-            func_name = self._get_name_from_node(node.func)
-            if func_name:
-                # Create CALLS relationship (will be resolved in second pass)
-                self._create_relationship(
-                    self.current_function,
-                    f"unresolved:{func_name}",
-                    "CALLS",
-                    {
-                        "call_type": "function_call",
-                        "line_number": node.lineno
-                    }
-                )
+        # Outside functions calls are not tracked, and an expression holds no
+        # statements that could define entities, so the arguments are skipped
+        if not self.current_function:
+            return
+        
+        func_name = self._get_name_from_node(node.func)
+        if func_name:
+            # Create CALLS relationship (will be resolved in second pass)
+            self.relationships.append(ParsedRelationship(
+                self.current_function, None, "CALLS",
+                {"call_type": "function_call", "line_number": node.lineno},
+                unresolved_name=func_name))
         
         self.generic_visit(node)
     
@@ -417,7 +509,7 @@ class PythonASTVisitor(ast.NodeVisitor):
                             "type_annotation": type_annotation,
                             "is_global": self.current_function is None and self.current_class is None,
                             "is_constant": var_name.isupper(),
-                            "file_id": self.entity_ids['file'],
+                            "file_id": self.file_id,
                             "scope_id": self.current_function or self.current_class or self.current_module
                         }
                     )
@@ -425,58 +517,65 @@ class PythonASTVisitor(ast.NodeVisitor):
                     self.entities.append(variable_entity)
                     
                     # Create appropriate CONTAINS relationship
+                    append = self.relationships.append
+                    file_id = self.file_id
                     if self.current_function:
-                        self._create_relationship(self.current_function, var_id, "FUNCTION_CONTAINS_VARIABLE")
+                        append(ParsedRelationship(self.current_function, var_id, "FUNCTION_CONTAINS_VARIABLE", _NO_METADATA))
                     elif self.current_class:
-                        self._create_relationship(self.current_class, var_id, "CLASS_CONTAINS_VARIABLE")
+                        append(ParsedRelationship(self.current_class, var_id, "CLASS_CONTAINS_VARIABLE", _NO_METADATA))
                         # Also create direct file relationship for better visualization
-                        self._create_relationship(self.entity_ids['file'], var_id, "FILE_CONTAINS_VARIABLE")
+                        append(ParsedRelationship(file_id, var_id, "FILE_CONTAINS_VARIABLE", _NO_METADATA))
                     elif self.current_module:
-                        self._create_relationship(self.current_module, var_id, "MODULE_CONTAINS_VARIABLE")
+                        append(ParsedRelationship(self.current_module, var_id, "MODULE_CONTAINS_VARIABLE", _NO_METADATA))
                         # Also create direct file relationship for better visualization  
-                        self._create_relationship(self.entity_ids['file'], var_id, "FILE_CONTAINS_VARIABLE")
+                        append(ParsedRelationship(file_id, var_id, "FILE_CONTAINS_VARIABLE", _NO_METADATA))
                     else:
-                        self._create_relationship(self.entity_ids['file'], var_id, "FILE_CONTAINS_VARIABLE")
+                        append(ParsedRelationship(file_id, var_id, "FILE_CONTAINS_VARIABLE", _NO_METADATA))
         
-        self.generic_visit(node)
+        # Targets and value are expressions, which only yield calls made
+        # inside functions; at module and class level they are not descended
+        if self.current_function:
+            self.generic_visit(node)
     
     # Helper methods
     
-    def _generate_id(self, entity_type: str, name: str, line: int) -> str:
-        """Generate unique entity ID with full context hierarchy."""
-        import hashlib
-        
-        # Build hierarchical context path for uniqueness
+    def _update_id_context(self) -> None:
+        """Rebuild the hashed context prefix of IDs after a name stack changed."""
+        # Build hierarchical context path for uniqueness, without empty parts
         context_parts = [
             self.file_path,
             self.module_name,
-            ".".join(self.class_name_stack) if self.class_name_stack else "",
-            ".".join(self.function_name_stack) if self.function_name_stack else "",
-            entity_type,
-            name,
-            str(line)
+            ".".join(self.class_name_stack),
+            ".".join(self.function_name_stack)
         ]
-        
-        # Remove empty parts and join with colons
-        identifier = ":".join(part for part in context_parts if part)
-        return hashlib.md5(identifier.encode()).hexdigest()
+        context = ":".join(part for part in context_parts if part)
+        self._id_context_hash = hashlib.md5((context + ":").encode() if context else b"")
+    
+    def _generate_id(self, entity_type: str, name: str, line: int) -> str:
+        """Generate unique entity ID with full context hierarchy."""
+        hasher = self._id_context_hash.copy()
+        if name:
+            hasher.update(f"{entity_type}:{name}:{line}".encode())
+        else:
+            hasher.update(f"{entity_type}:{line}".encode())
+        return hasher.hexdigest()
     
-    def _get_docstring(self, node: ast.AST) -> str:
-        """Extract docstring from AST node."""
-        if (isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Module)) and
-            node.body and
-            isinstance(node.body[0], ast.Expr) and
-            isinstance(node.body[0].value, ast.Constant) and
-            isinstance(node.body[0].value.value, str)):
-            return node.body[0].value.value
+    def _get_docstring(self, node: Union[ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef]) -> str:
+        """Extract docstring from a module, class or function node."""
+        body = node.body
+        if body:
+            first = body[0]
+            if type(first) is ast.Expr:
+                value = first.value
+                if type(value) is ast.Constant and isinstance(value.value, str):
+                    return value.value
         return ""
     
-    def _get_end_line(self, node: ast.AST) -> int:
-        """Get end line number for AST node."""
-        if hasattr(node, 'end_lineno') and node.end_lineno:
-            return node.end_lineno
-        # Fallback: estimate based on content
-        return getattr(node, 'lineno', 1)
+    def _get_end_line(self, node: ast.stmt) -> int:
+        """Get end line number for AST statement node."""
+        # Statements always carry end_lineno on Python 3.8+; it is only
+        # unset on nodes built by hand
+        return node.end_lineno or node.lineno
     
     def _get_function_signature(self, node: Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> str:
         """Generate function signature string."""
@@ -515,12 +614,25 @@ class PythonASTVisitor(ast.NodeVisitor):
         """Extract name string from AST node."""
         if isinstance(node, ast.Name):
             return node.id
-        elif isinstance(node, ast.Attribute):
-            value = self._get_name_from_node(node.value)
-            return f"{value}.{node.attr}" if value else node.attr
+        
+        # Collect attribute names from the outermost inwards, then join once
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        
+        if isinstance(node, ast.Name):
+            parts.append(node.id)
         elif isinstance(node, ast.Constant):
-            return str(node.value)
-        return ""
+            value = str(node.value)
+            if value:
+                parts.append(value)
+        if len(parts) == 1:
+            return parts[0]
+        parts.reverse()
+        # Names like "self.logger.info" repeat across many relationships;
+        # interning shares one string, which pickled results store only once
+        return sys.intern(".".join(parts))
     
     def _is_abstract_class(self, node: ast.ClassDef) -> bool:
         """Check if class is abstract."""
@@ -538,13 +650,6 @@ class PythonASTVisitor(ast.NodeVisitor):
         
         return False
     
-    def _is_generator(self, node: Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> bool:
-        """Check if function is a generator."""
-        for child in ast.walk(node):
-            if isinstance(child, (ast.Yield, ast.YieldFrom)):
-                return True
-        return False
-    
     def _has_decorator(self, node: Union[ast.FunctionDef, ast.AsyncFunctionDef], decorator_name: str) -> bool:
         """Check if function has specific decorator."""
         for decorator in node.decorator_list:
@@ -552,27 +657,38 @@ class PythonASTVisitor(ast.NodeVisitor):
                 return True
         return False
     
-    def _calculate_complexity(self, node: Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> int:
-        """Calculate cyclomatic complexity."""
+    def _analyze_function(self, node: Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> Tuple[bool, int]:
+        """
+        Check if a function is a generator and calculate its cyclomatic complexity.
+        
+        Both come from a single stack-based traversal of the function's
+        subtree, reading child nodes straight from each node's fields.
+        
+        Returns:
+            Tuple of (is_generator, complexity)
+        """
+        is_generator = False
         complexity = 1  # Base complexity
         
-        for child in ast.walk(node):
-            if isinstance(child, (ast.If, ast.While, ast.For, ast.AsyncFor, 
-                                ast.ExceptHandler, ast.With, ast.AsyncWith)):
+        stack = [node]
+        while stack:
+            child = stack.pop()
+            child_type = type(child)
+            if child_type in _BRANCH_NODE_TYPES:
                 complexity += 1
-            elif isinstance(child, ast.BoolOp):
+            elif child_type is ast.BoolOp:
                 complexity += len(child.values) - 1
-        
-        return complexity
-    
-    def _get_call_context(self, node: ast.Call) -> str:
-        """Get context information for function call."""
-        try:
-            if hasattr(node, 'lineno') and node.lineno <= len(self.lines):
-                return self.lines[node.lineno - 1].strip()
-        except:
-            pass
-        return ""
+            elif child_type in _YIELD_NODE_TYPES:
+                is_generator = True
+            
+            for field in child._fields:
+                value = getattr(child, field, None)
+                if isinstance(value, list):
+                    stack.extend(item for item in value if isinstance(item, ast.AST))
+                elif isinstance(value, ast.AST):
+                    stack.append(value)
+        
+        return is_generator, complexity
     
     def _extract_variable_names(self, node: ast.AST) -> List[str]:
         """Extract variable names from assignment target."""
@@ -606,13 +722,3 @@ class PythonASTVisitor(ast.NodeVisitor):
             return func_name if func_name else "unknown"
         
         return "unknown"
-    
-    def _create_relationship(self, from_id: str, to_id: str, rel_type: str, metadata: Dict[str, Any] = None):
-        """Create a relationship between entities."""
-        relationship = ParsedRelationship(
-            from_id=from_id,
-            to_id=to_id,
-            relationship_type=rel_type,
-            metadata=metadata or {}
-        )
-        self.relationships.append(relationship)
\ No newline at end of file
@@ -2,7 +2,8 @@
 Parser registry for CodeBased.
 """
 
-from typing import Dict, Type
+from types import MappingProxyType
+from typing import Callable, Mapping, Optional, Type
 from .base import BaseParser
 from .python import PythonASTParser
 from .javascript import JavaScriptParser
@@ -12,8 +13,9 @@ from .typescript import TypeScriptParser
 from .angular import AngularParser
 from .nodejs import NodeJSParser
 
-# Parser registry mapping file types to parser classes
-PARSER_REGISTRY: Dict[str, Type[BaseParser]] = {
+# Parser registry mapping file types to parser classes; read-only, so the
+# same mapping can be shared safely by every extractor and worker process
+PARSER_REGISTRY: Mapping[str, Type[BaseParser]] = MappingProxyType({
     "python": PythonASTParser,
     "javascript": JavaScriptParser,
     "html": HTMLParser,
@@ -21,17 +23,8 @@ PARSER_REGISTRY: Dict[str, Type[BaseParser]] = {
     "typescript": TypeScriptParser,
     "angular": AngularParser,
     "nodejs": NodeJSParser,
-}
+})
 
-
-def get_parser(file_type: str) -> Type[BaseParser] | None:
-    """
-    Get the parser class for a given file type.
-
-    Args:
-        file_type: The file type to get the parser for.
-
-    Returns:
-        The parser class, or None if no parser is found.
-    """
-    return PARSER_REGISTRY.get(file_type)
+# Get the parser class for a file type, or None if no parser handles it.
+# Bound directly to the mapping's lookup, without a wrapper call per lookup.
+get_parser: Callable[[str], Optional[Type[BaseParser]]] = PARSER_REGISTRY.get
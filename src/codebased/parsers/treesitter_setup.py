@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
-import importlib
 import logging
+import warnings
 from functools import lru_cache
 
 from tree_sitter import Language
 
 logger = logging.getLogger(__name__)
 
+# Imported once here rather than on every lookup; optional, see the .so fallback
+try:
+    import tree_sitter_languages as _ts_langs
+except ImportError:  # pragma: no cover - fallback path
+    _ts_langs = None
+
 
 @lru_cache(maxsize=None)
 def ensure_language(lang: str) -> Language:
@@ -19,15 +25,15 @@ def ensure_language(lang: str) -> Language:
     function attempts to load a shared library named ``{lang}.so`` placed in
     the same directory as this file.
     """
-    try:
-        import warnings
-        with warnings.catch_warnings():
-            # Suppress the FutureWarning from tree_sitter_languages
-            warnings.filterwarnings("ignore", category=FutureWarning, module="tree_sitter_languages")
-            ts_langs = importlib.import_module("tree_sitter_languages")
-            return ts_langs.get_language(lang)
-    except Exception as e:  # pragma: no cover - fallback path
-        logger.debug("tree_sitter_languages not usable: %s", e)
+    if _ts_langs is not None:
+        try:
+            with warnings.catch_warnings():
+                # tree_sitter_languages builds languages through the deprecated
+                # Language(path, name) constructor; tree_sitter warns about it
+                warnings.filterwarnings("ignore", category=FutureWarning, module="tree_sitter")
+                return _ts_langs.get_language(lang)
+        except Exception as e:  # pragma: no cover - fallback path
+            logger.debug("tree_sitter_languages not usable: %s", e)
 
     so_path = __name__.replace(".", "/")
     so_path = f"{__file__[:-3]}_{lang}.so"
@@ -3,7 +3,8 @@ TypeScript parser for CodeBased using tree-sitter.
 """
 
 import logging
-from typing import List, Dict, Any, Optional, Set
+import time
+from typing import List, Dict, Any, Optional, Set, Tuple
 from pathlib import Path
 
 from .base import TreeSitterParser, ParsedEntity, ParsedRelationship
@@ -49,6 +50,61 @@ class TypeScriptParser(TreeSitterParser):
         'Output': 'AngularOutput'
     }
 
+    # Node types that produce relationships, mapped to their extractor methods
+    RELATIONSHIP_EXTRACTORS = {
+        'class_declaration': ('_extract_class_relationships',
+                              '_extract_interface_implementation_relationships'),
+        'decorator': ('_extract_angular_template_relationships',),
+        'import_statement': ('_extract_import_export_relationships',),
+        'export_statement': ('_extract_import_export_relationships',),
+        'call_expression': ('_extract_function_call_relationships',),
+        'member_expression': ('_extract_property_access_relationships',)
+    }
+
+    # Node types the tree walk has to look at; everything else is skipped
+    # after a single set lookup. This is not a tree-sitter Query: the
+    # grammar has no constructor_definition, get_accessor or set_accessor
+    # nodes (they parse as method_definition), so a query over these types
+    # does not compile, and one over the valid types captures no faster
+    # than the walk
+    WALKED_NODE_TYPES = frozenset(ENTITY_NODE_TYPES) | frozenset(RELATIONSHIP_EXTRACTORS)
+
+    def __init__(self, config: Dict[str, Any] = None):
+        """Initialize TypeScript parser."""
+        super().__init__(config)
+        # Entities of the last walked tree, keyed by the id of their node
+        self._node_entities: Dict[int, ParsedEntity] = {}
+
+    def _parse_tree(self, root_node: Node, source_code: str,
+                    file_path: str) -> Tuple[List[ParsedEntity], List[ParsedRelationship]]:
+        """
+        Extract entities and relationships in a single walk of the tree.
+        
+        Relationship nodes are collected during the entity walk and handled
+        once all entities are known, since relationships may point at
+        entities declared later in the file.
+        """
+        entities = [self._create_file_entity(file_path, source_code)]
+        relationship_nodes = []
+        node_entities = self._node_entities = {}
+        
+        walked_types = self.WALKED_NODE_TYPES
+        for node in self._walk(root_node):
+            node_type = node.type
+            if node_type not in walked_types:
+                continue
+            if node_type in self.ENTITY_NODE_TYPES:
+                entity = self._create_entity_from_node(node, source_code, file_path)
+                if entity:
+                    entities.append(entity)
+                    node_entities[node.id] = entity
+            if node_type in self.RELATIONSHIP_EXTRACTORS:
+                relationship_nodes.append(node)
+        
+        relationships = self._extract_relationships_from_nodes(relationship_nodes, source_code,
+                                                               entities, file_path)
+        return entities, relationships
+
     def _extract_entities_from_node(self, node: Node, source_code: str, file_path: str) -> List[ParsedEntity]:
         """Extract TypeScript entities from tree-sitter AST."""
         entities = []
@@ -56,157 +112,69 @@ class TypeScriptParser(TreeSitterParser):
         # Add file entity
         entities.append(self._create_file_entity(file_path, source_code))
         
-        # Traverse tree and extract entities
-        self._traverse_for_entities(node, source_code, file_path, entities)
+        # Walk tree and extract entities
+        node_entities = self._node_entities = {}
+        for child in self._walk(node):
+            if child.type in self.ENTITY_NODE_TYPES:
+                entity = self._create_entity_from_node(child, source_code, file_path)
+                if entity:
+                    entities.append(entity)
+                    node_entities[child.id] = entity
         
         return entities
 
     def _extract_relationships_from_node(self, node: Node, source_code: str, 
                                        entities: List[ParsedEntity], file_path: str) -> List[ParsedRelationship]:
         """Extract TypeScript relationships from tree-sitter AST."""
+        relationship_nodes = [child for child in self._walk(node)
+                              if child.type in self.RELATIONSHIP_EXTRACTORS]
+        return self._extract_relationships_from_nodes(relationship_nodes, source_code, entities, file_path)
+
+    def _extract_relationships_from_nodes(self, nodes: List[Node], source_code: str,
+                                          entities: List[ParsedEntity], file_path: str) -> List[ParsedRelationship]:
+        """Extract relationships from nodes in document order, dispatching on node type."""
         relationships = []
         
         # Create entity lookup for relationships
         entity_lookup = {entity.name: entity for entity in entities}
         
-        # Traverse tree and extract relationships
-        self._traverse_for_relationships(node, source_code, file_path, entities, relationships, entity_lookup)
+        extractors = {node_type: [getattr(self, method_name) for method_name in method_names]
+                      for node_type, method_names in self.RELATIONSHIP_EXTRACTORS.items()}
+        for node in nodes:
+            for extractor in extractors[node.type]:
+                extractor(node, source_code, file_path, entities, relationships, entity_lookup)
         
         return relationships
     
-    def _normalize_relationship_metadata(self, relationship: ParsedRelationship) -> Dict[str, Any]:
-        """
-        Normalize TypeScript relationship metadata to match database schema.
-        
-        Args:
-            relationship: Relationship with metadata to normalize
-            
-        Returns:
-            Dictionary with properties that match the schema
-        """
-        rel_type = relationship.relationship_type
-        metadata = relationship.metadata or {}
-        
-        # Mapping for each relationship type based on schema definitions
-        if rel_type == "CALLS":
-            # Schema: call_type STRING, line_number INT64
-            return {
-                'call_type': metadata.get('type', 'function_call'),
-                'line_number': metadata.get('call_location', metadata.get('line_number', 0))
-            }
-        
-        elif rel_type == "USES":
-            # Schema: usage_type STRING, line_number INT64
-            return {
-                'usage_type': metadata.get('type', 'variable_access'),
-                'line_number': metadata.get('access_location', metadata.get('line_number', 0))
-            }
-        
-        elif rel_type == "ACCESSES":
-            # Schema: property_path STRING, access_location INT64
-            return {
-                'property_path': metadata.get('property_path', ''),
-                'access_location': metadata.get('access_location', metadata.get('line_number', 0))
-            }
-        
-        elif rel_type == "EXPORTS":
-            # Schema: export_type STRING, symbol STRING
-            return {
-                'export_type': metadata.get('export_type', 'named'),
-                'symbol': metadata.get('symbol', metadata.get('function_name', ''))
-            }
-        
-        elif rel_type == "IMPORTS":
-            # Schema: import_type STRING
-            return {
-                'import_type': metadata.get('import_type', 'named')
-            }
-        
-        elif rel_type == "DECORATES":
-            # Schema: decorator_name STRING
-            return {
-                'decorator_name': metadata.get('decorator_name', '')
-            }
-        
-        elif rel_type == "USES_TEMPLATE":
-            # Schema: template_path STRING, resolved_path STRING, component_selector STRING
-            return {
-                'template_path': metadata.get('template_path', ''),
-                'resolved_path': metadata.get('resolved_path', ''),
-                'component_selector': metadata.get('component_selector', '')
-            }
-        
-        elif rel_type == "USES_STYLES":
-            # Schema: style_path STRING, resolved_path STRING, component_selector STRING
-            return {
-                'style_path': metadata.get('style_path', ''),
-                'resolved_path': metadata.get('resolved_path', ''),
-                'component_selector': metadata.get('component_selector', '')
-            }
-        
-        # For containment relationships (FILE_CONTAINS_*, CLASS_CONTAINS_*, etc.)
-        # these don't have additional properties in the schema, so return empty dict
-        elif rel_type.startswith("FILE_CONTAINS_") or rel_type.startswith("CLASS_CONTAINS_") or \
-             rel_type.startswith("MODULE_CONTAINS_") or rel_type.startswith("FUNCTION_CONTAINS_"):
-            return {}
-        
-        # For relationship types without extra properties (IMPLEMENTS, EXTENDS, INHERITS)
-        elif rel_type in ["IMPLEMENTS", "EXTENDS", "INHERITS"]:
-            return {}
-        
-        # For unknown relationship types, log warning and return empty dict
-        else:
-            logger.warning(f"Unknown relationship type: {rel_type}")
-            return {}
-
     def _create_file_entity(self, file_path: str, source_code: str) -> ParsedEntity:
         """Create entity for the file itself."""
-        lines = source_code.splitlines()
-        filename = str(Path(file_path).name)
+        line_count = self._count_lines(source_code)
         file_path_obj = Path(file_path)
+        filename = file_path_obj.name
         
-        # Get file metadata
-        import os
-        import time
-        import hashlib
-        
-        file_stats = os.stat(file_path) if os.path.exists(file_path) else None
+        file_stats = self._stat_file(file_path)
         file_size = file_stats.st_size if file_stats else 0
         modified_time = int(file_stats.st_mtime) if file_stats else int(time.time())
         
-        # Generate file hash
-        file_hash = hashlib.md5(source_code.encode()).hexdigest()
-        
         return ParsedEntity(
             id=self._generate_entity_id(filename, file_path, 1, 
-                                       entity_type="File", line_end=len(lines)),
+                                       entity_type="File", line_end=line_count),
             name=filename,
             type="File",
             file_path=file_path,
             line_start=1,
-            line_end=len(lines),
+            line_end=line_count,
             metadata={
                 'extension': file_path_obj.suffix,
                 'size': file_size,
                 'modified_time': modified_time,
-                'hash': file_hash,
-                'lines_of_code': len(lines),
+                'hash': self._file_content_hash(file_path),
+                'lines_of_code': line_count,
                 'full_path': file_path,
                 'language': 'typescript'
             }
         )
 
-    def _traverse_for_entities(self, node: Node, source_code: str, file_path: str, entities: List[ParsedEntity]) -> None:
-        """Traverse AST and extract entities."""
-        if node.type in self.ENTITY_NODE_TYPES:
-            entity = self._create_entity_from_node(node, source_code, file_path)
-            if entity:
-                entities.append(entity)
-        
-        # Recursively process children
-        for child in node.children:
-            self._traverse_for_entities(child, source_code, file_path, entities)
-
     def _create_entity_from_node(self, node: Node, source_code: str, file_path: str) -> Optional[ParsedEntity]:
         """Create entity from a tree-sitter node."""
         try:
@@ -221,13 +189,11 @@ class TypeScriptParser(TreeSitterParser):
                 return None
             
             start_line, end_line = self._get_node_line_info(node)
-            node_text = self._get_node_text(node, source_code)
             
             # Extract additional metadata based on node type
             metadata = self._extract_node_metadata(node, source_code, entity_type)
             metadata.update({
                 'node_type': node.type,
-                'code_snippet': node_text[:500],  # Limit snippet size
                 'language': 'typescript'
             })
             
@@ -340,8 +306,8 @@ class TypeScriptParser(TreeSitterParser):
                 metadata['parameter_count'] = param_count
         
         # Check if async
-        node_text = self._get_node_text(node, source_code)
-        metadata['is_async'] = 'async' in node_text
+        node_text = self._get_node_bytes(node, source_code)
+        metadata['is_async'] = b'async' in node_text
         
         return metadata
 
@@ -372,19 +338,20 @@ class TypeScriptParser(TreeSitterParser):
         """Extract metadata specific to method definitions."""
         metadata = {}
         
-        node_text = self._get_node_text(node, source_code)
+        # Modifiers precede the method name
+        node_text = self._get_node_header_bytes(node, source_code)
         
         # Check accessibility
-        if 'private' in node_text:
+        if b'private' in node_text:
             metadata['accessibility'] = 'private'
-        elif 'protected' in node_text:
+        elif b'protected' in node_text:
             metadata['accessibility'] = 'protected'
-        elif 'public' in node_text:
+        elif b'public' in node_text:
             metadata['accessibility'] = 'public'
         
         # Check if static
-        metadata['is_static'] = 'static' in node_text
-        metadata['is_async'] = 'async' in node_text
+        metadata['is_static'] = b'static' in node_text
+        metadata['is_async'] = b'async' in node_text
         
         return metadata
 
@@ -410,7 +377,6 @@ class TypeScriptParser(TreeSitterParser):
     def _create_angular_decorator_entity(self, node: Node, source_code: str, file_path: str) -> Optional[ParsedEntity]:
         """Create entity from Angular decorator node."""
         try:
-            decorator_text = self._get_node_text(node, source_code)
             start_line, end_line = self._get_node_line_info(node)
             
             # Extract decorator name from @DecoratorName syntax
@@ -439,8 +405,7 @@ class TypeScriptParser(TreeSitterParser):
                 'decorator_name': decorator_name,
                 'angular_type': angular_entity_type,
                 'language': 'typescript',
-                'framework': 'angular',
-                'code_snippet': decorator_text[:500]
+                'framework': 'angular'
             }
             
             # Add Angular-specific configuration to metadata
@@ -619,10 +584,8 @@ class TypeScriptParser(TreeSitterParser):
                             from_id=caller_entity.id,
                             to_id=f"function_{function_name}",
                             relationship_type="CALLS",
-                            metadata={
-                                'call_type': 'function_call',
-                                'line_number': self._get_node_line_info(node)[0]
-                            }
+                            # The call type is implied by the relationship type
+                            metadata={'line_number': self._get_node_line_info(node)[0]}
                         ))
                         
             except Exception as e:
@@ -683,27 +646,6 @@ class TypeScriptParser(TreeSitterParser):
             except Exception as e:
                 logger.debug(f"Failed to extract property access relationship: {e}")
     
-    def _find_containing_function(self, node: Node, entities: List[ParsedEntity]) -> Optional[ParsedEntity]:
-        """Find the function or method that contains the given node."""
-        try:
-            node_line = self._get_node_line_info(node)[0]
-            
-            # Find entities that contain this line
-            containing_entities = []
-            for entity in entities:
-                if (entity.type in ['Function', 'Method', 'Constructor'] and 
-                    entity.line_start <= node_line <= entity.line_end):
-                    containing_entities.append(entity)
-            
-            # Return the most specific (smallest) containing entity
-            if containing_entities:
-                return min(containing_entities, key=lambda e: e.line_end - e.line_start)
-                
-        except Exception as e:
-            logger.debug(f"Failed to find containing function: {e}")
-        
-        return None
-
     def _extract_angular_template_relationships(self, node: Node, source_code: str, file_path: str,
                                               entities: List[ParsedEntity], relationships: List[ParsedRelationship],
                                               entity_lookup: Dict[str, ParsedEntity]) -> None:
@@ -721,13 +663,17 @@ class TypeScriptParser(TreeSitterParser):
             # Parse decorator arguments to get Angular configuration
             angular_config = self._parse_decorator_arguments(node, source_code)
             
-            # Find the Angular component entity
-            component_entity = None
-            for entity in entities:
-                if (entity.type == 'AngularComponent' and 
-                    entity.line_start <= self._get_node_line_info(node)[0] <= entity.line_end):
-                    component_entity = entity
-                    break
+            # Find the Angular component entity, normally created from this decorator
+            component_entity = self._node_entities.get(node.id)
+            if (component_entity is None or component_entity.type != 'AngularComponent'
+                    or component_entity.file_path != file_path):
+                component_entity = None
+                decorator_line = self._get_node_line_info(node)[0]
+                for entity in entities:
+                    if (entity.type == 'AngularComponent' and 
+                        entity.line_start <= decorator_line <= entity.line_end):
+                        component_entity = entity
+                        break
             
             if not component_entity:
                 return
@@ -741,27 +687,31 @@ class TypeScriptParser(TreeSitterParser):
                     
                     relationships.append(ParsedRelationship(
                         from_id=component_entity.id,
-                        to_id=f"unresolved:template_{clean_template_path}",  # Use original path
+                        to_id=None,
                         relationship_type="USES_TEMPLATE",
                         metadata={
                             'template_path': clean_template_path,
                             'resolved_path': self._resolve_angular_file_path(template_path, file_path),
                             'component_selector': angular_config.get('selector', ''),
                             'component_file_path': file_path  # Add for resolution context
-                        }
+                        },
+                        unresolved_name=clean_template_path,
+                        unresolved_kind="template"
                     ))
             
             # Handle inline template
             elif 'template' in angular_config:
                 relationships.append(ParsedRelationship(
                     from_id=component_entity.id,
-                    to_id=f"unresolved:inline_template_{component_entity.id}",
+                    to_id=None,
                     relationship_type="USES_TEMPLATE",
                     metadata={
                         'template_path': 'inline',
                         'resolved_path': 'inline', 
                         'component_selector': angular_config.get('selector', '')
-                    }
+                    },
+                    unresolved_name=component_entity.id,
+                    unresolved_kind="inline_template"
                 ))
             
             # Create style relationships
@@ -773,14 +723,16 @@ class TypeScriptParser(TreeSitterParser):
                     
                     relationships.append(ParsedRelationship(
                         from_id=component_entity.id,
-                        to_id=f"unresolved:style_{clean_style_path}",
+                        to_id=None,
                         relationship_type="USES_STYLES",
                         metadata={
                             'style_path': clean_style_path,
                             'resolved_path': self._resolve_angular_file_path(style_path, file_path),
                             'component_selector': angular_config.get('selector', ''),
                             'component_file_path': file_path  # Add for resolution context
-                        }
+                        },
+                        unresolved_name=clean_style_path,
+                        unresolved_kind="style"
                     ))
             
             # Handle styleUrls array
@@ -794,27 +746,31 @@ class TypeScriptParser(TreeSitterParser):
                             
                             relationships.append(ParsedRelationship(
                                 from_id=component_entity.id,
-                                to_id=f"unresolved:style_{clean_style_path}",
+                                to_id=None,
                                 relationship_type="USES_STYLES",
                                 metadata={
                                     'style_path': clean_style_path,
                                     'resolved_path': self._resolve_angular_file_path(style_path, file_path),
                                     'component_selector': angular_config.get('selector', ''),
                                     'component_file_path': file_path  # Add for resolution context
-                                }
+                                },
+                                unresolved_name=clean_style_path,
+                                unresolved_kind="style"
                             ))
             
             # Handle inline styles
             elif 'styles' in angular_config:
                 relationships.append(ParsedRelationship(
                     from_id=component_entity.id,
-                    to_id=f"unresolved:inline_styles_{component_entity.id}",
+                    to_id=None,
                     relationship_type="USES_STYLES",
                     metadata={
                         'style_path': 'inline',
                         'resolved_path': 'inline',
                         'component_selector': angular_config.get('selector', '')
-                    }
+                    },
+                    unresolved_name=component_entity.id,
+                    unresolved_kind="inline_styles"
                 ))
                 
         except Exception as e:
@@ -910,28 +866,6 @@ class TypeScriptParser(TreeSitterParser):
             logger.debug(f"Failed to create resolution patterns: {e}")
             return [relative_path.strip('\'"')]
 
-    def _traverse_for_relationships(self, node: Node, source_code: str, file_path: str,
-                                  entities: List[ParsedEntity], relationships: List[ParsedRelationship],
-                                  entity_lookup: Dict[str, ParsedEntity]) -> None:
-        """Traverse AST and extract relationships."""
-        
-        # Look for specific relationship patterns
-        if node.type == 'class_declaration':
-            self._extract_class_relationships(node, source_code, file_path, entities, relationships, entity_lookup)
-            self._extract_interface_implementation_relationships(node, source_code, file_path, entities, relationships, entity_lookup)
-        elif node.type == 'decorator':
-            self._extract_angular_template_relationships(node, source_code, file_path, entities, relationships, entity_lookup)
-        elif node.type in ['import_statement', 'export_statement']:
-            self._extract_import_export_relationships(node, source_code, file_path, entities, relationships, entity_lookup)
-        elif node.type == 'call_expression':
-            self._extract_function_call_relationships(node, source_code, file_path, entities, relationships, entity_lookup)
-        elif node.type == 'member_expression':
-            self._extract_property_access_relationships(node, source_code, file_path, entities, relationships, entity_lookup)
-        
-        # Recursively process children
-        for child in node.children:
-            self._traverse_for_relationships(child, source_code, file_path, entities, relationships, entity_lookup)
-
     def _extract_class_relationships(self, node: Node, source_code: str, file_path: str,
                                    entities: List[ParsedEntity], relationships: List[ParsedRelationship],
                                    entity_lookup: Dict[str, ParsedEntity]) -> None:
@@ -971,11 +905,15 @@ class TypeScriptParser(TreeSitterParser):
             
             if node.type == 'import_statement':
                 # Find the Import entity that was created for this node
-                import_entity = None
-                for entity in entities:
-                    if entity.type == 'Import' and entity.line_start == self._get_node_line_info(node)[0]:
-                        import_entity = entity
-                        break
+                import_entity = self._node_entities.get(node.id)
+                if (import_entity is None or import_entity.type != 'Import'
+                        or import_entity.file_path != file_path):
+                    import_entity = None
+                    import_line = self._get_node_line_info(node)[0]
+                    for entity in entities:
+                        if entity.type == 'Import' and entity.line_start == import_line:
+                            import_entity = entity
+                            break
                 
                 # Extract imported module path
                 if 'from' in node_text:
@@ -986,13 +924,15 @@ class TypeScriptParser(TreeSitterParser):
                         # Create import relationship - mark external modules as unresolved
                         relationships.append(ParsedRelationship(
                             from_id=file_entity.id,
-                            to_id=f"unresolved:module_{module_path}",  # Mark as unresolved
+                            to_id=None,
                             relationship_type="IMPORTS",
                             metadata={
                                 'module_path': module_path,
                                 'is_relative': module_path.startswith('.'),
                                 'import_text': parts[0].strip()
-                            }
+                            },
+                            unresolved_name=module_path,
+                            unresolved_kind="module"
                         ))
                         
                         # If we have an Import entity, create a FILE_CONTAINS_IMPORT relationship
@@ -1014,12 +954,14 @@ class TypeScriptParser(TreeSitterParser):
                                 if clean_import:
                                     relationships.append(ParsedRelationship(
                                         from_id=file_entity.id,
-                                        to_id=f"unresolved:external_{clean_import}",  # Mark as unresolved
+                                        to_id=None,
                                         relationship_type="USES", 
                                         metadata={
                                             'usage_type': 'named_import',
                                             'line_number': self._get_node_line_info(node)[0]
-                                        }
+                                        },
+                                        unresolved_name=clean_import,
+                                        unresolved_kind="external"
                                     ))
             
             elif node.type == 'export_statement':
@@ -1030,12 +972,14 @@ class TypeScriptParser(TreeSitterParser):
                     # Default export
                     relationships.append(ParsedRelationship(
                         from_id=file_entity.id,
-                        to_id=f"unresolved:export_default_{file_entity.name}",
+                        to_id=None,
                         relationship_type="EXPORTS",
                         metadata={
                             'export_type': 'default_export',
                             'symbol': export_spec
-                        }
+                        },
+                        unresolved_name=f"default_{file_entity.name}",
+                        unresolved_kind="export"
                     ))
                 elif '{' in export_spec and '}' in export_spec:
                     # Named exports
@@ -1045,12 +989,14 @@ class TypeScriptParser(TreeSitterParser):
                         if clean_export:
                             relationships.append(ParsedRelationship(
                                 from_id=file_entity.id,
-                                to_id=f"unresolved:export_{clean_export}",
+                                to_id=None,
                                 relationship_type="EXPORTS",
                                 metadata={
                                     'export_type': 'named_export',
                                     'symbol': clean_export
-                                }
+                                },
+                                unresolved_name=clean_export,
+                                unresolved_kind="export"
                             ))
                             
         except Exception as e:
@@ -23,3 +23,133 @@ def test_extractor_initializes_all_parsers():
     cfg = CodeBasedConfig()
     extractor = EntityExtractor(cfg, DummyDB())
     assert set(extractor.parsers.keys()) == set(PARSER_REGISTRY.keys())
+
+
+def test_resolve_relationships_uses_symbol_registry():
+    from codebased.parsers.base import ParseResult, ParsedEntity, ParsedRelationship
+
+    extractor = EntityExtractor(CodeBasedConfig(), DummyDB())
+    base = ParsedEntity('base-id', 'Animal', 'Class', 'a.py', 1, 2, {})
+    extractor._register_symbol(base)
+
+    resolved = ParsedRelationship('dog-id', None, 'INHERITS', {}, unresolved_name='Animal')
+    external = ParsedRelationship('file-id', None, 'IMPORTS', {},
+                                  unresolved_name='@angular/core', unresolved_kind='module')
+    result = ParseResult([base], [resolved, external], '', 'a.py', [], 0.0)
+
+    resolved_results = extractor._resolve_relationships([result])
+    relationships = resolved_results[0].relationships
+    assert relationships[0].to_id == 'base-id'
+    assert relationships[1].to_id is None
+    assert extractor._relationship_properties(relationships[1]) is None
+    batches = list(extractor._iter_unwind_batches(
+        extractor._iter_relationship_rows(resolved_results), extractor._create_relationship_unwind_query))
+    assert [rows for _, rows in batches] == [[{'from_id': 'dog-id', 'to_id': 'base-id'}]]
+
+
+def test_get_parser_for_file_dispatches_by_file_type():
+    extractor = EntityExtractor(CodeBasedConfig(), DummyDB())
+    assert extractor._get_parser_for_file('app/app.component.ts') is extractor.parsers['angular']
+    assert extractor._get_parser_for_file('app/main.ts') is extractor.parsers['typescript']
+    assert extractor._get_parser_for_file('styles/site.scss') is extractor.parsers['css']
+    assert extractor._get_parser_for_file('README.md') is None
+
+
+def test_iter_parseable_entries_walks_once_with_stats(tmp_path):
+    (tmp_path / 'a.py').write_text('x = 1\n')
+    (tmp_path / 'notes.txt').write_text('ignored\n')
+    (tmp_path / 'web').mkdir()
+    (tmp_path / 'web' / 'app.js').write_text('let y = 2;\n')
+
+    extractor = EntityExtractor(CodeBasedConfig(), DummyDB())
+    entries = {path: (stat, parser) for path, stat, parser in extractor.iter_parseable_entries(str(tmp_path))}
+
+    assert set(entries) == {str(tmp_path / 'a.py'), str(tmp_path / 'web' / 'app.js')}
+    stat, parser = entries[str(tmp_path / 'a.py')]
+    assert stat.st_size == 6
+    assert parser is extractor.parsers['python']
+
+
+def test_resolve_relationships_delta_replaces_stale_symbols():
+    from codebased.parsers.base import ParseResult, ParsedEntity, ParsedRelationship
+
+    extractor = EntityExtractor(CodeBasedConfig(), DummyDB())
+    extractor._register_symbol(ParsedEntity('old-id', 'Animal', 'Class', 'a.py', 1, 2, {}))
+    extractor._register_symbol(ParsedEntity('gone-id', 'Plant', 'Class', 'gone.py', 1, 2, {}))
+
+    current = ParsedEntity('new-id', 'Animal', 'Class', 'a.py', 3, 4, {})
+    inherits = ParsedRelationship('dog-id', None, 'INHERITS', {}, unresolved_name='Animal')
+    uses_removed = ParsedRelationship('dog-id', None, 'CALLS', {}, unresolved_name='Plant')
+    result = ParseResult([current], [inherits, uses_removed], '', 'a.py', [], 0.0)
+
+    resolved = extractor._resolve_relationships_delta([result], {'a.py', 'gone.py'})
+    assert [rel.to_id for rel in resolved[0].relationships] == ['new-id', None]
+
+
+def test_store_results_inserts_rows_with_unwind_per_label():
+    from codebased.parsers.base import ParseResult, ParsedEntity, ParsedRelationship
+
+    class RecordingDB(DummyDB):
+        def __init__(self):
+            self.calls = []
+
+        def execute_query(self, query, parameters=None):
+            self.calls.append((query, parameters))
+            return []
+
+    db = RecordingDB()
+    extractor = EntityExtractor(CodeBasedConfig(), db)
+    first = ParsedEntity('f1', 'first', 'Function', 'a.js', 1, 2, {'file_id': 'file-a'})
+    second = ParsedEntity('f2', 'second', 'Function', 'a.js', 3, 4, {'file_id': 'file-a'})
+    calls = ParsedRelationship('f1', 'f2', 'CALLS', {'line_number': 1})
+    extractor._store_results([ParseResult([first, second, first], [calls], '', 'a.js', [], 0.0)])
+
+    (entity_query, entity_params), (relationship_query, relationship_params) = db.calls
+    assert entity_query.startswith('UNWIND $rows AS row MERGE (n:Function {id: row.id}) SET')
+    assert [row['id'] for row in entity_params['rows']] == ['f1', 'f2']
+    assert '-[:CALLS {call_type: row.call_type, line_number: row.line_number}]->' in relationship_query
+    assert relationship_params['rows'] == [
+        {'from_id': 'f1', 'to_id': 'f2', 'call_type': 'function_call', 'line_number': 1}]
+
+
+def test_parse_pool_size_follows_parse_workers(tmp_path, monkeypatch):
+    import codebased.parsers.extractor as extractor_module
+
+    paths = []
+    for index in range(6):
+        source = tmp_path / f'm{index}.py'
+        source.write_text(f'def f{index}():\n    return {index}\n')
+        paths.append(str(source))
+
+    pool_sizes = []
+    real_pool = extractor_module.ProcessPoolExecutor
+
+    def recording_pool(max_workers, **kwargs):
+        pool_sizes.append(max_workers)
+        return real_pool(max_workers=max_workers, **kwargs)
+
+    monkeypatch.setattr(extractor_module, 'ProcessPoolExecutor', recording_pool)
+    cfg = CodeBasedConfig()
+    cfg.parsing.parse_cache = False
+    cfg.parsing.parse_workers = 2
+    results = EntityExtractor(cfg, DummyDB())._extract_entities_parallel(paths)
+
+    assert pool_sizes == [2]
+    assert [result.file_path for result in results] == paths
+    assert all(result.errors == [] for result in results)
+
+
+def test_iter_extract_entities_yields_every_file_once(tmp_path):
+    paths = []
+    for index in range(6):
+        source = tmp_path / f'm{index}.py'
+        source.write_text(f'def f{index}():\n    return {index}\n')
+        paths.append(str(source))
+
+    cfg = CodeBasedConfig()
+    cfg.parsing.parse_cache = False
+    cfg.parsing.parse_workers = 2
+    results = list(EntityExtractor(cfg, DummyDB()).iter_extract_entities(paths))
+
+    assert sorted(result.file_path for result in results) == sorted(paths)
+    assert all(result.errors == [] for result in results)
@@ -0,0 +1,21 @@
+import sys
+from types import ModuleType
+from pathlib import Path
+
+# Stub kuzu to avoid heavy dependency during tests
+sys.modules.setdefault('kuzu', ModuleType('kuzu'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from codebased.parsers.html import HTMLParser
+
+
+def test_carriage_return_line_endings_are_counted(tmp_path):
+    template = tmp_path / 'page.html'
+    template.write_bytes(b'<div>\r  <p>hi</p>\r</div>\r')
+
+    result = HTMLParser({}).parse_file(str(template))
+    assert result.errors == []
+
+    file_entity = result.entities[0]
+    assert file_entity.line_end == 3
+    assert file_entity.metadata['lines_of_code'] == 3
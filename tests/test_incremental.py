@@ -0,0 +1,176 @@
+import os
+import sys
+from types import ModuleType
+from pathlib import Path
+
+# Stub kuzu to avoid heavy dependency during tests
+sys.modules.setdefault('kuzu', ModuleType('kuzu'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from codebased.parsers.incremental import IncrementalUpdater
+from codebased.config import CodeBasedConfig
+
+
+class DummyDB:
+    def __init__(self):
+        self.batches = []
+
+    def execute_query(self, query, parameters=None):
+        return []
+
+    def execute_batch(self, queries):
+        self.batches.append(list(queries))
+        return True
+
+
+def test_detect_changes_skips_hashing_when_stat_matches(tmp_path, monkeypatch):
+    source = tmp_path / 'a.py'
+    source.write_text('x = 1\n')
+    file_path = str(source)
+
+    updater = IncrementalUpdater(CodeBasedConfig(), DummyDB())
+    assert updater._detect_changes(str(tmp_path))['added'] == [file_path]
+
+    updater.file_hashes[file_path] = updater._calculate_file_hash(file_path)
+    updater.file_stats[file_path] = updater._stat_signature(file_path)
+
+    def fail_hash(path):
+        raise AssertionError('unchanged file was re-hashed')
+
+    monkeypatch.setattr(updater, '_calculate_file_hash', fail_hash)
+    assert updater._detect_changes(str(tmp_path))['unchanged'] == 1
+
+
+def test_detect_changes_does_not_hash_added_files(tmp_path, monkeypatch):
+    source = tmp_path / 'a.py'
+    source.write_text('x = 1\n')
+
+    updater = IncrementalUpdater(CodeBasedConfig(), DummyDB())
+
+    def fail_hash(path):
+        raise AssertionError('added file was hashed before parsing')
+
+    # The parser reports the hash of new files, so detection must not read them
+    monkeypatch.setattr(updater, '_calculate_file_hash', fail_hash)
+    assert updater._detect_changes(str(tmp_path))['added'] == [str(source)]
+
+
+def test_detect_changes_rehashes_when_stat_differs(tmp_path):
+    source = tmp_path / 'a.py'
+    source.write_text('x = 1\n')
+    file_path = str(source)
+
+    updater = IncrementalUpdater(CodeBasedConfig(), DummyDB())
+    updater.file_hashes[file_path] = updater._calculate_file_hash(file_path)
+    updater.file_stats[file_path] = updater._stat_signature(file_path)
+
+    # Touch without changing content: hash matches, new signature is recorded
+    stat = os.stat(file_path)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert updater._detect_changes(str(tmp_path))['unchanged'] == 1
+    assert updater.file_stats[file_path] == updater._stat_signature(file_path)
+
+    source.write_text('x = 2\n')
+    assert updater._detect_changes(str(tmp_path))['modified'] == [file_path]
+
+
+def test_file_hashes_round_trip_through_local_cache(tmp_path):
+    config = CodeBasedConfig()
+    config.database.path = str(tmp_path / 'data' / 'graph.kuzu')
+
+    updater = IncrementalUpdater(config, DummyDB())
+    updater.file_hashes['a.py'] = 'abc'
+    updater.file_stats['a.py'] = (123, 4)
+    updater._dirty_files.add('a.py')
+    updater._save_file_hashes()
+
+    reloaded = IncrementalUpdater(config, DummyDB())
+    assert reloaded.file_hashes == {'a.py': 'abc'}
+    assert reloaded.file_stats == {'a.py': (123, 4)}
+
+
+def test_files_already_in_graph_are_replaced_without_hash_cache(tmp_path, monkeypatch):
+    source = tmp_path / 'a.py'
+    source.write_text('x = 1\n')
+
+    config = CodeBasedConfig()
+    config.database.path = str(tmp_path / 'data' / 'graph.kuzu')
+    removed = []
+
+    def process(updater):
+        monkeypatch.setattr(updater, '_remove_files_from_graph',
+                            lambda paths, results: removed.append(list(paths)))
+        assert updater.update_graph(str(tmp_path))['errors'] == []
+
+    # No hash cache yet: the graph may already hold the file from an earlier run
+    process(IncrementalUpdater(config, DummyDB()))
+    assert removed == [[str(source)]]
+
+    source.write_text('x = 2\n')
+    tmp_path.joinpath('b.py').write_text('y = 1\n')
+    removed.clear()
+    process(IncrementalUpdater(config, DummyDB()))
+    assert removed == [[str(source)]]
+
+
+def test_update_graph_returns_early_without_changes(tmp_path, monkeypatch):
+    source = tmp_path / 'a.py'
+    source.write_text('x = 1\n')
+    file_path = str(source)
+
+    updater = IncrementalUpdater(CodeBasedConfig(), DummyDB())
+    updater.file_hashes[file_path] = updater._calculate_file_hash(file_path)
+    updater.file_stats[file_path] = updater._stat_signature(file_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('nothing to process or persist')
+
+    monkeypatch.setattr(updater, '_process_changes', fail)
+    monkeypatch.setattr(updater, '_save_file_hashes', fail)
+    results = updater.update_graph(str(tmp_path))
+    assert results['errors'] == []
+    assert results['files_unchanged'] == 1
+
+
+def test_cleanup_after_update_sees_files_deleted_since(tmp_path):
+    kept = tmp_path / 'a.py'
+    kept.write_text('x = 1\n')
+    deleted = tmp_path / 'e.py'
+    deleted.write_text('y = 2\n')
+
+    class FileDB(DummyDB):
+        def execute_query(self, query, parameters=None):
+            if 'RETURN f.path' in query:
+                return [{'file_path': str(kept)}, {'file_path': str(deleted)}]
+            if 'DETACH DELETE' in query:
+                return [{'removed': len(parameters['paths'])}]
+            return []
+
+    config = CodeBasedConfig()
+    config.project_root = str(tmp_path)
+    config.database.path = str(tmp_path / 'data' / 'graph.kuzu')
+    updater = IncrementalUpdater(config, FileDB())
+    updater.update_graph(str(tmp_path))
+
+    deleted.unlink()
+    assert updater.cleanup_orphaned_entities()['entities_removed'] == 1
+
+
+def test_tree_sitter_entities_are_removed_with_their_file(tmp_path):
+    from codebased.parsers.extractor import EntityExtractor
+    from codebased.parsers.javascript import JavaScriptParser
+    from codebased.parsers.typescript import TypeScriptParser
+
+    js = tmp_path / 'x.js'
+    js.write_text('function a() { b(); }\nfunction b() {}\n')
+    ts = tmp_path / 'y.ts'
+    ts.write_text('class C { m(): void {} }\nexport function f(): number { return 1; }\n')
+
+    extractor = EntityExtractor(CodeBasedConfig(), DummyDB())
+    for parser, source in ((JavaScriptParser({}), js), (TypeScriptParser({}), ts)):
+        entities = parser.parse_file(str(source)).entities
+        file_entity = entities[0]
+        assert file_entity.type == 'File'
+        # Removal deletes the File node and every node whose file_id is its id
+        others = [extractor._entity_properties(e) for e in entities[1:]]
+        assert others and all(props['file_id'] == file_entity.id for props in others)
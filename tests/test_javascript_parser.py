@@ -0,0 +1,133 @@
+import sys
+from types import ModuleType
+from pathlib import Path
+
+# Stub kuzu to avoid heavy dependency during tests
+sys.modules.setdefault('kuzu', ModuleType('kuzu'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from codebased.parsers.javascript import JavaScriptParser
+
+
+def test_extends_resolves_class_when_names_collide(tmp_path):
+    source = tmp_path / 'shapes.js'
+    source.write_text(
+        'class Shape {}\n'
+        'class Circle extends Shape {}\n'
+        'var Shape = 1;\n'
+    )
+
+    result = JavaScriptParser({}).parse_file(str(source))
+    assert result.errors == []
+
+    by_id = {entity.id: entity for entity in result.entities}
+    extends = [r for r in result.relationships if r.relationship_type == 'EXTENDS']
+    assert len(extends) == 1
+    assert (by_id[extends[0].from_id].name, by_id[extends[0].from_id].type) == ('Circle', 'Class')
+    assert (by_id[extends[0].to_id].name, by_id[extends[0].to_id].type) == ('Shape', 'Class')
+
+
+def test_function_keyword_tokens_are_not_entities(tmp_path):
+    source = tmp_path / 'calls.js'
+    source.write_text('function helper() {}\nfunction caller() { return helper(); }\n')
+
+    result = JavaScriptParser({}).parse_file(str(source))
+    assert result.errors == []
+    assert 'function' not in [entity.name for entity in result.entities]
+
+    by_id = {entity.id: entity for entity in result.entities}
+    calls = [r for r in result.relationships if r.relationship_type == 'CALLS']
+    assert [(by_id[r.from_id].name, r.unresolved_name) for r in calls] == [('caller', 'helper')]
+
+
+def test_component_decorators_resolve_to_following_class(tmp_path):
+    source = tmp_path / 'components.js'
+    source.write_text(
+        "@Component({selector: 'app-a', templateUrl: './a.html'})\n"
+        "export class AComponent {}\n"
+        "\n"
+        "@Component({selector: 'app-b', templateUrl: './b.html'})\n"
+        "export class BComponent {}\n"
+    )
+
+    result = JavaScriptParser({}).parse_file(str(source))
+    assert result.errors == []
+
+    by_id = {entity.id: entity for entity in result.entities}
+    templates = [(by_id[r.from_id].name, r.unresolved_name) for r in result.relationships
+                 if r.relationship_type == 'USES_TEMPLATE']
+    assert templates == [('AComponent', './a.html'), ('BComponent', './b.html')]
+
+
+def test_calls_are_attributed_to_innermost_function(tmp_path):
+    source = tmp_path / 'nested.js'
+    source.write_text(
+        'function outer() {\n'
+        '  function inner() {\n'
+        '    first();\n'
+        '  }\n'
+        '  second();\n'
+        '}\n'
+        'third();\n'
+    )
+
+    result = JavaScriptParser({}).parse_file(str(source))
+    by_id = {entity.id: entity for entity in result.entities}
+    calls = [(by_id[r.from_id].name, r.unresolved_name) for r in result.relationships
+             if r.relationship_type == 'CALLS']
+    assert calls == [('inner', 'first'), ('outer', 'second')]
+
+
+def test_imports_and_exports_read_from_syntax_tree(tmp_path):
+    source = tmp_path / 'module.js'
+    source.write_text(
+        "import helper, { a as b, c } from './helper';\n"
+        "export { helper as h };\n"
+        "export function f() { return c; }\n"
+    )
+
+    result = JavaScriptParser({}).parse_file(str(source))
+    assert result.errors == []
+
+    imports = [r for r in result.relationships if r.relationship_type == 'IMPORTS']
+    assert [r.metadata['module_path'] for r in imports] == ['./helper']
+    assert imports[0].metadata['import_text'] == 'import helper, { a as b, c }'
+
+    uses = [r.metadata['symbol'] for r in result.relationships if r.relationship_type == 'USES']
+    assert uses == ['a', 'c']
+
+    exports = [r.unresolved_name for r in result.relationships if r.relationship_type == 'EXPORTS']
+    assert exports == ['h']
+
+
+def test_unresolved_references_create_no_stub_entities(tmp_path):
+    chain = 'd3.select(node)' + ''.join(f'.attr("a{i}", {i})' for i in range(20))
+    source = tmp_path / 'chart.js'
+    source.write_text(f'function draw(node) {{ console.log(node); {chain}; }}\n')
+
+    result = JavaScriptParser({}).parse_file(str(source))
+    assert result.errors == []
+    assert not [entity for entity in result.entities if entity.type.startswith('External')]
+
+    calls = [r.unresolved_name for r in result.relationships if r.relationship_type == 'CALLS']
+    assert 'console.log' in calls
+    assert all(len(name) <= 101 for name in calls)
+
+
+def test_method_modifiers_read_from_method_header(tmp_path):
+    source = tmp_path / 'widget.js'
+    source.write_text(
+        'class Widget {\n'
+        '  static async load() {}\n'
+        '  get size() { return 1; }\n'
+        '  render(target) { return async () => target; }\n'
+        '}\n'
+    )
+
+    result = JavaScriptParser({}).parse_file(str(source))
+    methods = {e.name: e.metadata for e in result.entities if e.type == 'Method'}
+    assert (methods['load']['is_static'], methods['load']['is_async']) == (True, True)
+    assert methods['size']['method_kind'] == 'getter'
+    # Words inside parameters and the body are not modifiers
+    assert methods['render']['is_async'] is False
+    assert methods['render']['method_kind'] == 'method'
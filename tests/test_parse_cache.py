@@ -0,0 +1,172 @@
+import sys
+from types import ModuleType
+from pathlib import Path
+
+# Stub kuzu to avoid heavy dependency during tests
+sys.modules.setdefault('kuzu', ModuleType('kuzu'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import codebased.parsers.base as base_module
+from codebased.parsers.cache import ParseCache
+from codebased.parsers.javascript import JavaScriptParser
+import codebased.parsers.python as python_module
+from codebased.parsers.python import PythonASTParser
+
+
+def test_unchanged_file_is_served_from_parse_cache(tmp_path, monkeypatch):
+    source = tmp_path / 'app.js'
+    source.write_text('function a() { b(); }\nfunction b() {}\n')
+    config = {'parse_cache_path': str(tmp_path / 'parse_cache.sqlite')}
+
+    first = JavaScriptParser(config).parse_file(str(source))
+    assert first.errors == []
+
+    parser = JavaScriptParser(config)
+
+    def fail_parse(source_code):
+        raise AssertionError('unchanged file was parsed again')
+
+    def fail_hash(content):
+        raise AssertionError('unchanged file was hashed again')
+
+    monkeypatch.setattr(parser, '_parse_source_code', fail_parse)
+    monkeypatch.setattr(base_module, 'hash_content', fail_hash)
+    second = parser.parse_file(str(source))
+    assert second.file_hash == first.file_hash
+    assert [e.id for e in second.entities] == [e.id for e in first.entities]
+    assert len(second.relationships) == len(first.relationships)
+
+
+def test_modified_file_misses_parse_cache(tmp_path):
+    source = tmp_path / 'app.js'
+    source.write_text('function a() {}\n')
+    config = {'parse_cache_path': str(tmp_path / 'parse_cache.sqlite')}
+    JavaScriptParser(config).parse_file(str(source))
+
+    source.write_text('function a() {}\nfunction c() {}\n')
+    result = JavaScriptParser(config).parse_file(str(source))
+    assert 'c' in {e.name for e in result.entities}
+
+
+def test_unchanged_python_file_is_served_from_parse_cache(tmp_path, monkeypatch):
+    source = tmp_path / 'app.py'
+    source.write_text('def a():\n    return b()\n\ndef b():\n    pass\n')
+    config = {'parse_cache_path': str(tmp_path / 'parse_cache.sqlite')}
+
+    first = PythonASTParser(config).parse_file(str(source))
+    assert first.errors == []
+
+    def fail(*args, **kwargs):
+        raise AssertionError('unchanged file was parsed or hashed again')
+
+    monkeypatch.setattr(python_module.ast, 'parse', fail)
+    monkeypatch.setattr(python_module, 'hash_content', fail)
+    second = PythonASTParser(config).parse_file(str(source))
+    assert second.errors == []
+    assert second.file_hash == first.file_hash
+    assert [e.id for e in second.entities] == [e.id for e in first.entities]
+    assert len(second.relationships) == len(first.relationships)
+
+
+def test_touched_file_is_served_from_parse_cache_by_content(tmp_path, monkeypatch):
+    import os
+
+    source = tmp_path / 'app.js'
+    source.write_text('function a() { b(); }\nfunction b() {}\n')
+    config = {'parse_cache_path': str(tmp_path / 'parse_cache.sqlite')}
+    first = JavaScriptParser(config).parse_file(str(source))
+
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+    parser = JavaScriptParser(config)
+
+    def fail_parse(source_code):
+        raise AssertionError('touched file was parsed again')
+
+    monkeypatch.setattr(parser, '_parse_source_code', fail_parse)
+    second = parser.parse_file(str(source))
+    assert second.errors == []
+    assert [e.id for e in second.entities] == [e.id for e in first.entities]
+    assert second.entities[0].metadata['modified_time'] == int(os.stat(source).st_mtime)
+
+    # The entry now matches the new modification time without hashing
+    monkeypatch.setattr(base_module, 'hash_content', fail_parse)
+    assert parser.parse_file(str(source)).file_hash == first.file_hash
+
+
+def test_cached_javascript_result_keeps_shortened_names(tmp_path):
+    chain = 'd3.select(x)' + ''.join(f'.attr("k{i}", {i})' for i in range(12))
+    source = tmp_path / 'chart.js'
+    source.write_text(f'function draw(x) {{ {chain}.remove(); }}\n')
+    config = {'parse_cache_path': str(tmp_path / 'parse_cache.sqlite')}
+
+    fresh = JavaScriptParser(config).parse_file(str(source))
+    names = sorted(r.unresolved_name for r in fresh.relationships if r.unresolved_name)
+    assert names and max(map(len, names)) <= JavaScriptParser.MAX_EXTERNAL_NAME_LENGTH + 20
+
+    # The extractor serves cache hits without going through parse_file
+    cached = JavaScriptParser(config).get_cached_result(str(source))
+    assert sorted(r.unresolved_name for r in cached.relationships if r.unresolved_name) == names
+
+
+def test_parse_cache_drops_tables_of_older_schema(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / 'parse_cache.sqlite')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE parse_cache (path TEXT PRIMARY KEY, result BLOB)")
+    conn.commit()
+    conn.close()
+
+    cache = ParseCache(path, 'v')
+    cache.put('a.js', 'JavaScriptParser', 'h', 1, 2, ['entity'], [])
+    assert cache.get('a.js', 'JavaScriptParser', 1, 2) == ('h', ['entity'], [])
+    assert cache.get('a.js', 'JavaScriptParser', 1, 3) is None
+
+
+def test_incremental_reparse_matches_fresh_parse():
+    parser = JavaScriptParser({})
+    source = 'function a() { b(); }\nfunction b() {}\n'
+    parser._parse_source_code(source, 'app.js')
+
+    edited = source.replace('b(); }', 'b(); c("é"); }') + 'const c = (x) => x;\n'
+    tree = parser._parse_source_code(edited, 'app.js')
+    assert tree.root_node.sexp() == JavaScriptParser({})._parse_source_code(edited).root_node.sexp()
+
+
+def test_worker_parsers_keep_no_syntax_trees():
+    import codebased.parsers.extractor as extractor_module
+
+    extractor_module._init_worker({})
+    parser = extractor_module._WORKER_PARSERS['javascript']
+    parser._parse_source_code('function a() {}\n', 'app.js')
+    assert not parser._tree_cache
+
+
+def test_extractor_parses_only_cache_misses(tmp_path, monkeypatch):
+    import codebased.parsers.extractor as extractor_module
+    from codebased.config import CodeBasedConfig
+    from codebased.parsers.extractor import EntityExtractor
+
+    config = CodeBasedConfig()
+    config.database.path = str(tmp_path / 'data' / 'graph.kuzu')
+    paths = []
+    for name in ('a', 'b', 'c', 'd', 'e'):
+        source = tmp_path / f'{name}.py'
+        source.write_text(f'def {name}():\n    pass\n')
+        paths.append(str(source))
+
+    extractor = EntityExtractor(config, None)
+    monkeypatch.setattr(extractor_module, 'MIN_FILES_FOR_PROCESS_POOL', 2)
+    first = extractor._extract_entities_parallel(paths[:4])
+
+    class FailPool:
+        def __init__(self, *args, **kwargs):
+            raise AssertionError('cached files were sent to worker processes')
+
+    monkeypatch.setattr(extractor_module, 'ProcessPoolExecutor', FailPool)
+    second = extractor._extract_entities_parallel(paths)
+    assert [r.file_path for r in second] == paths
+    assert [e.id for r in second[:4] for e in r.entities] == [e.id for r in first for e in r.entities]
+    assert 'e' in {e.name for e in second[4].entities}
@@ -183,6 +183,11 @@ class Cat(Animal):
                 inherits_relationships = [r for r in result.relationships if r.relationship_type == 'INHERITS']
                 self.assertEqual(len(inherits_relationships), 2)  # Dog and Cat inherit from Animal
                 
+                # Base classes are left unresolved for the second pass
+                for rel in inherits_relationships:
+                    self.assertIsNone(rel.to_id)
+                    self.assertEqual(rel.unresolved_name, 'Animal')
+                
             finally:
                 os.unlink(f.name)
                 
@@ -338,6 +343,28 @@ if __name__ == "__main__":
                 
             finally:
                 os.unlink(f.name)
+                
+    def test_parse_declared_source_encoding(self):
+        """Test that encoding declarations and BOMs are honoured."""
+        sources = [
+            '# -*- coding: latin-1 -*-\ndef caf\xe9():\n    return "\xe9"\n'.encode('latin-1'),
+            b'\xef\xbb\xbfdef f():\n    pass\n',
+        ]
+        
+        for source in sources:
+            with tempfile.NamedTemporaryFile(mode='wb', suffix='.py', delete=False) as f:
+                f.write(source)
+                f.flush()
+                
+                try:
+                    result = self.parser.parse_file(f.name)
+                    
+                    self.assertEqual(result.errors, [])
+                    functions = [e for e in result.entities if e.type == "Function"]
+                    self.assertEqual(len(functions), 1)
+                    
+                finally:
+                    os.unlink(f.name)
 
 
 if __name__ == '__main__':